@@ -1,6 +1,7 @@
 import os
 import json
 import pandas as pd
+from src.data.postprocessing import is_valid_result
 
 
 # Path to folder containing results
@@ -10,12 +11,6 @@ OUTPUT_FILE_JSON = "src/results/aggregated_results.jsonl"
 OUTPUT_FILE_XLSX = "src/results/aggregated_results.xlsx"
 INVALID_FILE_XLSX = "src/results/invalid_results.xlsx"
 
-REQUIRED_FIELDS = [
-    "Formulation", "MILP Objective", "Upper Bound", "Relative Gap",
-    "Time (s)", "MILP Status", "MILP Term. Condition", "LP Relaxation",
-    "Num. Binary Var.", "Total Num. Var.", "Num. Constraints"
-]
-
 # Initialize list of results
 valid_records = []
 invalid_records = []
@@ -35,20 +30,6 @@ def _is_result_file_json(filename: str) -> bool:
     return filename.endswith(".json")
 
 
-def _is_valid_record(record: dict) -> bool:
-    """
-    A record is valid if all required fields are not None.
-    
-    Args:
-        record (dict): dictionary with results from a run.
-        
-    Returns:
-        bool: True if the dictionary has no Null in the important fields.
-    """
-
-    return all(record.get(field) is not None for field in REQUIRED_FIELDS)
-
-
 # Step 1: Loops through each file in the results folder and add the content of json files to records 
 for filename in os.listdir(RESULTS_FOLDER):
     if not _is_result_file_json(filename):
@@ -63,7 +44,9 @@ for filename in os.listdir(RESULTS_FOLDER):
             if line.startswith("{") and line.endswith("}"):
                 try:
                     data = json.loads(line)
-                    if _is_valid_record(data):
+                    # Lists (e.g., the time of each window) are stored as text, one cell per record
+                    data = {key: ", ".join(map(str, value)) if isinstance(value, list) else value for key, value in data.items()}
+                    if is_valid_result(data):
                         instance_name = data["Instance"]
                         last_underscore_idx = instance_name.rfind('_')
                         data["Instance"] = data["Instance"][:last_underscore_idx]
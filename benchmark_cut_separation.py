@@ -0,0 +1,112 @@
+import io
+import argparse
+import contextlib
+import src.models.model_solve as model_solve
+import src.models.constraints_est as constraints_est
+from src.data.instance_generation import load_network
+from src.models.formulation_build import create_model_f1_base_formulation, create_model_f12_all
+from src.models.model_solve import define_solver, set_solver_backend, set_solver_options_milp, solve_model_record, relaxed_model_variables, SOLVER_SETTINGS
+from src.models.cut_separation import solve_and_analyze_model_cut_separation
+from src.models.solver_backends import SOLVER_BACKENDS, get_node_count
+from src.utils.utils import compute_num_variables_constraints
+
+
+# Instances used to compare the static formulation F12 with F12 with cut separation (see CUT_SEPARATION_FLAG)
+NETWORK = "network_4"
+PLANNING_HORIZONS = [30, 60]
+TAU_FACTOR = 1.2
+BETA_FACTOR = 0.8
+STARTUP_COST_FACTOR = 0
+TIME_LIMIT = 120  # Same time limit for every solve, so the number of nodes compares the node throughput
+
+
+def _solve_static(stn_data: dict, planning_horizon: int, create_model: callable) -> dict:
+    """
+    Builds a formulation with all its rows and solves its LP relaxation and then the MILP (in the order of solve_and_analyze_model_cut_separation).
+
+    Args:
+        - stn_data (dict): a dictionary with the state-task network instance data.
+        - planning_horizon (int): planning horizon.
+        - create_model (callable): one of the create_model_f* functions.
+
+    Returns:
+        dict: number of rows, LP relaxation, results of the MILP and number of nodes.
+    """
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        model, name = create_model(stn_data, planning_horizon)
+
+    solver = define_solver(persistent = True)
+    set_solver_options_milp(solver, 1)
+    solver.set_instance(model)
+
+    with relaxed_model_variables(model, solver = solver):
+        results_lp = solve_model_record(solver, model)
+
+    results_milp = solve_model_record(solver, model)
+
+    return {"name": name, "rows": compute_num_variables_constraints(model)[2], "lp": results_lp["objective"], "milp": results_milp,
+            "nodes": get_node_count(solver, SOLVER_SETTINGS["backend"]), "cuts": None}
+
+
+def _solve_separation(stn_data: dict, planning_horizon: int) -> dict:
+    """
+    Builds F12 with CUT_SEPARATION_FLAG set to True and solves it with cut separation (see solve_and_analyze_model_cut_separation).
+
+    Args:
+        - stn_data (dict): a dictionary with the state-task network instance data.
+        - planning_horizon (int): planning horizon.
+
+    Returns:
+        dict: number of rows (without the pool), LP relaxation after separation, results of the MILP, number of nodes and number of rows separated.
+    """
+
+    constraints_est.CUT_SEPARATION_FLAG = True
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            model, name = create_model_f12_all(stn_data, planning_horizon)
+    finally:
+        constraints_est.CUT_SEPARATION_FLAG = False
+
+    solver = define_solver(persistent = True)
+    results_milp, stats_milp, results_lp, num_cuts = solve_and_analyze_model_cut_separation(solver, model, planning_horizon, 1)
+
+    return {"name": f"{name}_Separation", "rows": stats_milp[2], "lp": results_lp["objective"], "milp": results_milp,
+            "nodes": get_node_count(solver, SOLVER_SETTINGS["backend"]), "cuts": num_cuts}
+
+
+def _format(value: float, digits: int = 2) -> str:
+    """
+    Formats a number for the table, or "-" if it is None.
+    """
+
+    return "-" if value is None else f"{value:.{digits}f}"
+
+
+# Step 1: Parse the solver backend (Gurobi by default; only Gurobi separates the rows at the nodes, the other backends at the root)
+parser = argparse.ArgumentParser()
+parser.add_argument("--solver", choices = list(SOLVER_BACKENDS), default = "gurobi", help = "solver backend.")
+args = parser.parse_args()
+
+set_solver_backend(args.solver)
+model_solve.TIME_LIMIT = TIME_LIMIT
+
+# Step 2: Solve F1, the static F12 and F12 with cut separation for each planning horizon, and report the node throughput
+print(f"Network: {NETWORK}. Solver: {args.solver}. Time limit: {TIME_LIMIT} s.")
+print(f"{'Horizon':>8} {'Formulation':>24} {'Rows':>8} {'Cuts':>6} {'LP':>10} {'Objective':>10} {'Bound':>10} {'Time (s)':>9} {'Nodes':>8} {'Nodes/s':>8}")
+
+for planning_horizon in PLANNING_HORIZONS:
+
+    stn_data = load_network(NETWORK, TAU_FACTOR, BETA_FACTOR, STARTUP_COST_FACTOR, planning_horizon)
+
+    for solve in (lambda: _solve_static(stn_data, planning_horizon, create_model_f1_base_formulation),
+                  lambda: _solve_static(stn_data, planning_horizon, create_model_f12_all),
+                  lambda: _solve_separation(stn_data, planning_horizon)):
+
+        run = solve()
+        milp = run["milp"]
+        nodes_per_second = run["nodes"] / milp["time"] if run["nodes"] is not None and milp["time"] > 0 else None
+
+        print(f"{planning_horizon:>8} {run['name']:>24} {run['rows']:>8} {run['cuts'] if run['cuts'] is not None else '-':>6} {_format(run['lp']):>10} "
+              f"{_format(milp['objective']):>10} {_format(milp['bound']):>10} {_format(milp['time']):>9} {run['nodes'] if run['nodes'] is not None else '-':>8} {_format(nodes_per_second, 1):>8}")
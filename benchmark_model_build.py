@@ -0,0 +1,95 @@
+import io
+import time
+import contextlib
+from pyomo.environ import *
+from src.data.instance_generation import load_network
+from src.models.base_model_build import load_model_sets_parameters_variables
+from src.models.constraints import material_mass_balance_eq3
+from src.models.formulation_build import create_model_f1_base_formulation
+from src.models.matrix_build import create_matrix_model
+
+
+# Instance used to measure build times
+NETWORK = "network_5"
+PLANNING_HORIZONS = [30, 60, 120, 240]
+TAU_FACTOR = 1.2
+BETA_FACTOR = 0.8
+STARTUP_COST_FACTOR = 0
+
+
+def _time_mass_balance(stn_data: dict, planning_horizon: int) -> tuple[float, int]:
+    """
+    Times the construction of the mass balance constraint (material_mass_balance_eq3) alone.
+
+    Args:
+        - stn_data (dict): a dictionary with the state-task network instance data.
+        - planning_horizon (int): planning horizon.
+
+    Returns:
+        tuple: build time in seconds and number of rows.
+    """
+
+    model = ConcreteModel()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        load_model_sets_parameters_variables(model, stn_data, planning_horizon)
+
+    start = time.perf_counter()
+    model.C_Material_Mass_Balance_Eq3 = Constraint(model.S_Materials, model.S_Time, rule = material_mass_balance_eq3)
+
+    return time.perf_counter() - start, len(model.C_Material_Mass_Balance_Eq3)
+
+
+def _time_base_formulation(stn_data: dict, planning_horizon: int) -> float:
+    """
+    Times the construction of the complete base formulation (F1).
+
+    Args:
+        - stn_data (dict): a dictionary with the state-task network instance data.
+        - planning_horizon (int): planning horizon.
+
+    Returns:
+        float: build time in seconds.
+    """
+
+    start = time.perf_counter()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        create_model_f1_base_formulation(stn_data, planning_horizon)
+
+    return time.perf_counter() - start
+
+
+def _time_base_formulation_matrix(stn_data: dict, planning_horizon: int) -> float:
+    """
+    Times the direct matrix assembly of the base formulation (F1), see create_matrix_model.
+
+    Args:
+        - stn_data (dict): a dictionary with the state-task network instance data.
+        - planning_horizon (int): planning horizon.
+
+    Returns:
+        float: build time in seconds.
+    """
+
+    start = time.perf_counter()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        create_matrix_model(stn_data, planning_horizon, 0)
+
+    return time.perf_counter() - start
+
+
+# Step 1: Build the model for each planning horizon and report build times
+print(f"Network: {NETWORK}")
+print(f"{'Horizon':>8} {'Eq3 Rows':>9} {'Eq3 Build (s)':>14} {'F1 Build (s)':>13} {'F1 Matrix (s)':>14}")
+
+for planning_horizon in PLANNING_HORIZONS:
+
+    stn_data = load_network(NETWORK, TAU_FACTOR, BETA_FACTOR, STARTUP_COST_FACTOR, planning_horizon)
+
+    time_eq3, rows_eq3 = _time_mass_balance(stn_data, planning_horizon)
+    time_f1 = _time_base_formulation(stn_data, planning_horizon)
+    time_f1_matrix = _time_base_formulation_matrix(stn_data, planning_horizon)
+
+    print(f"{planning_horizon:>8} {rows_eq3:>9} {time_eq3:>14.3f} {time_f1:>13.3f} {time_f1_matrix:>14.3f}")
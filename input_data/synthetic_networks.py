@@ -0,0 +1,139 @@
+import numpy as np
+from numpy import ceil
+
+
+################################################################################################################
+#This file constains a generator of synthetic systems, used to test how the formulations scale.                 #
+#The networks are built stage by stage from a seed, so the same parameters always give the same network.       #
+################################################################################################################
+
+
+def _stage_materials(stage: int, num_stages: int, num_materials: int) -> list[str]:
+    """
+    Returns the names of the materials produced by the tasks of a stage: intermediates, or final products in the last stage.
+    """
+
+    if stage == num_stages - 1:
+        return [f"P{m}" for m in range(num_materials)]
+
+    return [f"I{stage}_{m}" for m in range(num_materials)]
+
+
+def _select_materials(rng: np.random.Generator, materials: list[str], first: int, max_materials: int) -> list[str]:
+    """
+    Selects between 1 and max_materials materials: materials[first], so that every material of a stage is selected by some task, and distinct random others.
+    """
+
+    others = [k for index, k in enumerate(materials) if index != first]
+    num_others = min(int(rng.integers(0, max_materials)), len(others))
+
+    return [materials[first]] + [others[index] for index in sorted(rng.choice(len(others), size = num_others, replace = False))]
+
+
+def _add_arcs(stn: dict, task: str, inputs: list[str], outputs: list[str]) -> None:
+    """
+    Adds the ST_ARCS and TS_ARCS of a task, splitting its inputs and outputs equally so that a run consumes and produces one unit of material per unit of batch.
+    """
+
+    for k in inputs:
+        stn['ST_ARCS'][k, task] = {'rho': -1.0 / len(inputs), 'direction': -1}
+    for k in outputs:
+        stn['TS_ARCS'][task, k] = {'rho': 1.0 / len(outputs), 'direction': 1}
+
+
+def _add_transitions(stn: dict, rng: np.random.Generator, unit: str, tasks: list[str], arcs: dict, startup_cost_factor: int) -> None:
+    """
+    Adds a startup (I<task>) and a shutdown (<task>I) transition to every task of a unit, and a direct transition (D<task>_<task>) between every ordered pair of its tasks.
+    As in network_all_transitions, the transitions consume the inputs and produce the outputs of the task they lead to (or, for shutdowns, leave).
+    """
+
+    def add_transition(task: str, transition: str, direction: int, is_startup: bool, is_shutdown: bool, is_direct: bool, cost: int) -> None:
+        batch = int(rng.integers(1, 6))
+        stn['TASKS_TRANSITION_TASKS'][task, transition] = {'isSU': is_startup, 'isSD': is_shutdown, 'isDirect': is_direct, 'direction': direction}
+        stn['UNIT_TASKS'].setdefault((unit, transition), {'tau_min': 0, 'tau_max': 0, 'tau': int(rng.integers(1, 6)), 'Bmin': batch, 'Bmax': batch, 'Cost': cost, 'vCost': 1, 'sCost': 25 * startup_cost_factor, 'direction': direction,})
+
+    for task in tasks:
+        _add_arcs(stn, f"I{task}", *arcs[task])
+        add_transition(task, f"I{task}", 1, True, False, False, 6)
+        _add_arcs(stn, f"{task}I", *arcs[task])
+        add_transition(task, f"{task}I", -1, False, True, False, 3)
+
+    for task_from in tasks:
+        for task_to in tasks:
+            if task_from == task_to:
+                continue
+            transition = f"D{task_from}_{task_to}"
+            _add_arcs(stn, transition, *arcs[task_to])
+            add_transition(task_to, transition, 1, False, False, True, 6)
+            add_transition(task_from, transition, -1, False, False, True, 6)
+
+
+def define_stn_network_synthetic(tau_factor: int, beta_factor: int, startup_cost_factor: int, planning_horizon: int,
+                                 num_stages: int = 4, units_per_stage: int = 2, tasks_per_unit: int = 2, materials_per_stage: int = 2,
+                                 max_fan_in: int = 2, max_fan_out: int = 2, transition_density: float = 0.25,
+                                 tau_min_range: tuple[int, int] = (3, 7), bmax_range: tuple[int, int] = (10, 100), seed: int = 0) -> dict:
+    """
+    Create a synthetic network with num_stages stages of units_per_stage units, each executing tasks_per_unit tasks of its own.
+    The tasks of the first stage consume the raw material RM, the tasks of stage s consume the materials produced in stage s-1, and the tasks of the last stage produce the final products.
+    Each task consumes 1 to max_fan_in materials and produces 1 to max_fan_out materials, and every material is produced and consumed by at least one task.
+    A fraction transition_density of the units gets startup, shutdown and direct transitions between all its tasks.
+    The defaults give a network of the size of network_4. The network only depends on the arguments, so the same seed always gives the same network.
+
+    Args:
+        - tau_factor (int): multiplyer factor for tau parameters.
+        - beta_factor (int): multiplyer factor for beta parameters.
+        - startup_cost_factor (int): multiplyer factor for startup cost parameters.
+        - planning horizon (int): lenght of the planning horizon.
+        - num_stages (int): number of stages.
+        - units_per_stage (int): number of units in each stage.
+        - tasks_per_unit (int): number of production tasks of each unit.
+        - materials_per_stage (int): number of materials produced in each stage (at most the number of tasks of a stage).
+        - max_fan_in (int): maximum number of materials consumed by a task.
+        - max_fan_out (int): maximum number of materials produced by a task.
+        - transition_density (float): probability that a unit has transitions.
+        - tau_min_range (tuple[int, int]): range of tau_min of the production tasks (tau_max is tau_min times tau_factor, rounded up).
+        - bmax_range (tuple[int, int]): range of Bmax of the production tasks (Bmin is Bmax times beta_factor).
+        - seed (int): seed of the random number generator.
+
+    Returns:
+        dict: a dictionary defining the structure of the scheduling problem, including:
+              STATES, STATE-to-TASK arcs, TASK-to-STATE arcs, UNIT-TASK assignments, etc.
+    """
+
+    rng = np.random.default_rng(seed)
+    tasks_per_stage = units_per_stage * tasks_per_unit
+    num_materials = min(materials_per_stage, tasks_per_stage)
+
+    stn = {'STATES': {}, 'STATES_SHIPMENT': {}, 'ST_ARCS': {}, 'TS_ARCS': {}, 'TASKS_TRANSITION_TASKS': {}, 'UNIT_TASKS': {}}
+    stn['STATES']['RM'] = {'capacity': 10000 * units_per_stage, 'initial': 10000 * units_per_stage, 'price': 0, 'isRM': True, 'isIntermed': False, 'isProd': False, 'order': 1,}
+
+    inputs = ['RM']
+
+    for stage in range(num_stages):
+
+        outputs = _stage_materials(stage, num_stages, num_materials)
+        is_last_stage = stage == num_stages - 1
+        for k in outputs:
+            stn['STATES'][k] = {'capacity': 10000, 'initial': 0, 'price': 10 if is_last_stage else 0, 'isRM': False, 'isIntermed': not is_last_stage, 'isProd': is_last_stage, 'order': len(stn['STATES']) + 1,}
+
+        for u in range(units_per_stage):
+
+            unit = f"U{stage}_{u}"
+            tasks = [f"T{stage}_{u}_{t}" for t in range(tasks_per_unit)]
+            arcs = {}
+
+            for t, task in enumerate(tasks):
+                index = u * tasks_per_unit + t
+                arcs[task] = (_select_materials(rng, inputs, index % len(inputs), max_fan_in), _select_materials(rng, outputs, index % len(outputs), max_fan_out))
+                _add_arcs(stn, task, *arcs[task])
+
+                tau_min = int(rng.integers(tau_min_range[0], tau_min_range[1] + 1))
+                bmax = int(rng.integers(bmax_range[0], bmax_range[1] + 1))
+                stn['UNIT_TASKS'][unit, task] = {'tau_min': tau_min, 'tau_max': int(ceil(tau_min * tau_factor)), 'tau': 1, 'Bmin': bmax * beta_factor, 'Bmax': bmax, 'Cost': 4, 'vCost': 1, 'sCost': 25 * startup_cost_factor, 'direction': 1,}
+
+            if rng.random() < transition_density:
+                _add_transitions(stn, rng, unit, tasks, arcs, startup_cost_factor)
+
+        inputs = outputs
+
+    return stn
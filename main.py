@@ -1,7 +1,7 @@
 import pandas as pd
 import logging
 from itertools import product
-from src.models.model_solve import define_solver
+from src.models.model_solve import define_solver, set_solver_threads, set_solver_backend, solve_and_analyze_model_relaxation
 from src.models.formulation_build import (create_model_f1_base_formulation, 
                                           create_model_f2_X_YS_zero_est, 
                                           create_model_f3_ub_YS_task,
@@ -15,24 +15,32 @@ from src.models.formulation_build import (create_model_f1_base_formulation,
                                           create_model_f11_ub_X_YS_group_k,
                                           create_model_f12_all)
 from src.data.instance_generation import load_network
-from src.data.postprocessing import initialize_results_dict, create_dict_result
+from src.data.postprocessing import initialize_results_dict, create_dict_result, create_dict_result_relaxation
 from src.models.model_solve import solve_and_analyze_model 
-import sys
+from src.models.rolling_horizon import solve_and_analyze_model_rolling_horizon
+from src.models.relax_and_fix import solve_and_analyze_model_relax_and_fix
+from src.models.cut_separation import get_cut_pool, activate_cuts, solve_and_analyze_model_cut_separation
+from src.models.constraints_est import CUT_SEPARATION_FLAG
+from src.models.matrix_build import create_matrix_model
+from src.models.matrix_solve import solve_and_analyze_matrix_model, solve_and_analyze_matrix_model_relaxation
+from src.models.solver_backends import SOLVER_BACKENDS
+from src.utils.output_policy import OUTPUT_POLICIES, set_output_policy, wait_for_artifacts
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import argparse
+import time
 import json
-
-# Get the command line argument
-command_line_args = sys.argv[1:]
-assert len(command_line_args) == 1
-taskID = int(command_line_args[0])
+import os
 
 # Constant
 RESULTS_PATH = "src/results/model_results.xlsx"
+RESULTS_FOLDER = "src/results"
+RUN_MODES = ["milp", "lp", "root", "rolling", "relax_and_fix"]  # MILP and LP relaxation, LP relaxation only, LP relaxation and root node, LP relaxation and MILP with a rolling horizon or with relax-and-fix
 
 # Set up logging
 logging.basicConfig(level = logging.INFO, format = '%(asctime)s - %(levelname)s - %(message)s')
 
 
-def run_instance(network: str, startup_cost_factor: int, planning_horizon: int, tau_factor: int, beta_factor: int, formulation_number: str, taskID: int, mip_gap_multiplier: int) -> dict:
+def run_instance(network: str, startup_cost_factor: int, planning_horizon: int, tau_factor: int, beta_factor: int, formulation_number: str, taskID: int, mip_gap_multiplier: int, backend: str = "pyomo", mode: str = "milp") -> dict:
     """ 
     Builds, solves, and analyze one optimization instance.    
     
@@ -45,13 +53,16 @@ def run_instance(network: str, startup_cost_factor: int, planning_horizon: int,
         - formulation_number (str): name of the formulation.
         - taskID (int): id that identifies the data set. It is the number at the end of each json file.
         - mip_gap_multiplier (int): multiplier to increase the mip gap.
+        - backend (str): "pyomo" builds the model with Pyomo, "matrix" assembles the constraint matrix directly (see create_matrix_model).
+        - mode (str): one of RUN_MODES. In "lp" and "root" modes the MILP is not solved, only its LP relaxation (and root node). In "rolling" and "relax_and_fix" modes the MILP is solved with a rolling horizon (see solve_rolling_horizon) or with relax-and-fix (see solve_relax_and_fix).
     
     Returns:
         - dict: a dictionary of results for excel logging.
     """    
     
     # Step 0: Initialize results dict
-    result = initialize_results_dict(network, startup_cost_factor, planning_horizon, tau_factor, beta_factor, "", taskID, mip_gap_multiplier)
+    result = initialize_results_dict(network, startup_cost_factor, planning_horizon, tau_factor, beta_factor, "", taskID, mip_gap_multiplier, mode)
+    formulation_name = ""  # Set once the model is built, so errors before it (e.g., an unknown mode or backend) are logged by the handler below
     
     try:
         
@@ -60,10 +71,36 @@ def run_instance(network: str, startup_cost_factor: int, planning_horizon: int,
         # Step 1: Load network            
         stn_data = load_network(network, tau_factor, beta_factor, startup_cost_factor, planning_horizon)
         
-        # Step 2: Define the solver
-        solver = define_solver()
+        if mode not in RUN_MODES:
+            raise Exception(f"Mode {mode} is not recognized.")
+        
+        # Step 2: Build and solve the matrix model, skipping the Pyomo model entirely
+        if backend == "matrix" and mode in ("rolling", "relax_and_fix"):
+            raise Exception(f"Mode {mode} is only available with the pyomo backend.")
+        elif backend == "matrix" and CUT_SEPARATION_FLAG:
+            raise Exception("CUT_SEPARATION_FLAG is only available with the pyomo backend, the matrix backend builds all rows up front.")
+        elif backend == "matrix":
+            start = time.perf_counter()
+            matrix, formulation_name = create_matrix_model(stn_data, planning_horizon, formulation_number)
+            build_time = time.perf_counter() - start
+            if mode == "milp":
+                results_milp, stats_milp, results_lp = solve_and_analyze_matrix_model(matrix, mip_gap_multiplier)
+                result = create_dict_result(result, stats_milp, results_milp, results_lp, formulation_name, mip_gap_multiplier)
+            else:
+                results_lp, stats_milp, results_root, timings = solve_and_analyze_matrix_model_relaxation(matrix, mip_gap_multiplier, root_node = mode == "root")
+                root_bound = results_root['bound'] if results_root is not None else None
+                result = create_dict_result_relaxation(result, stats_milp, results_lp['objective'], root_bound, formulation_name, mip_gap_multiplier, timings)
+            result['Build Time (s)'] = round(build_time, 2)
+            logging.info(f"Models were solved. Formulation: {formulation_name}. MILP Objective: {result['MILP Objective']}. LP Relaxation: {result['LP Relaxation']}.")
+            return result
+        elif backend != "pyomo":
+            raise Exception(f"Backend {backend} is not recognized.")
+        
+        # Step 2: Define the solver (the rolling horizon fixes variables and deactivates constraints between solves, so the model is passed again in each solve; relax-and-fix pushes its changes to the persistent solver)
+        solver = define_solver(persistent = mode != "rolling")
         
         # Step 3: Build, configure and solve the MILP model  
+        start = time.perf_counter()
         if formulation_number == 0:      
             model_milp, formulation_name = create_model_f1_base_formulation(stn_data, planning_horizon)
         elif formulation_number == 1:
@@ -90,14 +127,46 @@ def run_instance(network: str, startup_cost_factor: int, planning_horizon: int,
             model_milp, formulation_name = create_model_f12_all(stn_data, planning_horizon)      
         else:
             raise Exception(f"Fomrulation number {formulation_number} is not recognized.")
+        build_time = time.perf_counter() - start
+        
+        # The rows deactivated by CUT_SEPARATION_FLAG are only separated in "milp" mode, the other modes solve the formulation with all its rows
+        cut_pool = get_cut_pool(model_milp)
+        if mode != "milp":
+            activate_cuts(cut_pool)
         
-        results_milp, stats_milp, results_lp = solve_and_analyze_model(solver, model_milp, planning_horizon, mip_gap_multiplier, stn_data)
+        # Step 3.1: The rolling horizon and relax-and-fix solve the MILP window by window (bucket by bucket), and report the LP relaxation as bound (the relative gap is the optimality loss)
+        if mode in ("rolling", "relax_and_fix"):
+            solve_and_analyze_heuristic = solve_and_analyze_model_rolling_horizon if mode == "rolling" else solve_and_analyze_model_relax_and_fix
+            results_heuristic, stats_milp, results_lp, results_windows = solve_and_analyze_heuristic(solver, model_milp, planning_horizon, mip_gap_multiplier)
+            result = create_dict_result(result, stats_milp, results_heuristic, results_lp, formulation_name, mip_gap_multiplier)
+            result['Build Time (s)'] = round(build_time, 2)
+            result['Num. Windows'] = len(results_windows)
+            result['Window Times (s)'] = [round(results_window['time'], 2) for results_window in results_windows]
+            logging.info(f"Models were solved. Formulation: {formulation_name}. Mode: {mode}. Objective: {result['MILP Objective']}. LP Relaxation: {result['LP Relaxation']}. Relative Gap: {result['Relative Gap']}.")
+            return result
+        
+        # Step 3.2: Screening modes only solve the LP relaxation (and the root node)
+        if mode != "milp":
+            results_lp, stats_milp, results_root, timings = solve_and_analyze_model_relaxation(solver, model_milp, mip_gap_multiplier, root_node = mode == "root")
+            root_bound = results_root['bound'] if results_root is not None else None
+            result = create_dict_result_relaxation(result, stats_milp, results_lp['objective'], root_bound, formulation_name, mip_gap_multiplier, timings)
+            result['Build Time (s)'] = round(build_time, 2)
+            logging.info(f"Models were solved. Formulation: {formulation_name}. LP Relaxation: {result['LP Relaxation']}. Root Bound: {result['Root Bound']}.")
+            return result
+        
+        if cut_pool:
+            results_milp, stats_milp, results_lp, num_cuts = solve_and_analyze_model_cut_separation(solver, model_milp, planning_horizon, mip_gap_multiplier)
+        else:
+            results_milp, stats_milp, results_lp = solve_and_analyze_model(solver, model_milp, planning_horizon, mip_gap_multiplier, stn_data)
         
         # Step 4: Create result dictionary
         result = create_dict_result(result, stats_milp, results_milp, results_lp, formulation_name, mip_gap_multiplier)
+        result['Build Time (s)'] = round(build_time, 2)
+        if cut_pool:
+            result['Num. Cuts'] = num_cuts
         
         logging.info(
-            f"Models were solved. Formulation: {formulation_name}. MILP Objective: {round(results_milp.problem.lower_bound, 2)}." 
+            f"Models were solved. Formulation: {formulation_name}. MILP Objective: {result['MILP Objective']}." 
         )                       
             
     except Exception as e:
@@ -110,11 +179,16 @@ def run_instance(network: str, startup_cost_factor: int, planning_horizon: int,
     return result
 
 
-def main(taskID: int) -> None:
+def main(taskID: int, mode: str = None, output_policy: str = "headless") -> None:
     """ 
     Main function to run multiple instances of the optimization problem.
     
     To solve a problem instance, the user needs to type in the command line: python main.py ID, where ID is the last part of the instance file run_ID.json (e.g., python main.py 1). 
+    To solve several instances in one process, give ranges or lists of IDs (e.g., python main.py 1-100 or python main.py 2,10,15), and --workers N to solve N at a time (see run_batch).
+    To only solve the LP relaxation (and the root node), add --mode lp (or --mode root), e.g., python main.py 1 --mode lp. Without it, the mode in run_ID.json is used.
+    To solve the MILP with a rolling horizon (see src/models/rolling_horizon.py), add --mode rolling, or --mode relax_and_fix to solve it with relax-and-fix (see src/models/relax_and_fix.py).
+    Runs are headless by default. Add --output verbose for debug prints and interactive Gantt charts, or --output artifacts to write the charts to src/results/artifacts.
+    Instances are solved with Gurobi by default. Add --solver highs (or cbc, glpk) to use another solver backend (see src/models/solver_backends.py).
     
     The result will be stored in file result_00001.json
     """
@@ -122,14 +196,158 @@ def main(taskID: int) -> None:
     with open(f"input_data/datasets/run_{taskID:05}.json", "r") as f:
         dct = json.load(f)    
     
+    solve_task(taskID, dct, mode, output_policy)
+
+
+def get_task_mode(dct: dict, mode: str = None) -> str:
+    """ 
+    Returns the mode a task is solved in: the given mode if it overrides the data set, otherwise the mode of the data set ("milp" if it has none).
+    
+    Args:
+        - dct (dict): parameters of the instance, as in run_ID.json (see enumerate_instance_grid).
+        - mode (str): overrides the mode of the data set (see RUN_MODES).
+    
+    Returns:
+        - str: the mode of the task.
+    """
+    
+    return mode if mode is not None else dct.get("mode", "milp")
+
+
+def solve_task(taskID: int, dct: dict, mode: str = None, output_policy: str = "headless") -> None:
+    """ 
+    Solves the instance with the given parameters and writes its result to src/results/result_ID.json.
+    
+    Args:
+        - taskID (int): id that identifies the data set.
+        - dct (dict): parameters of the instance, as in run_ID.json (see enumerate_instance_grid).
+        - mode (str): overrides the mode of the data set (see RUN_MODES).
+        - output_policy (str): output policy (see src/utils/output_policy.py).
+    """
+    
+    set_output_policy(output_policy, f"run_{taskID:05}")
+    
     formulation_number, network, startup_cost_factor, planning_horizon, tau_factor, beta_factor, mip_gap_multiplier = dct["formulation"], dct["network"], dct["startup_cost_factor"], dct["planning_horizon"], dct["tau_factor"], dct["beta_factor"], dct["mip_gap"]
+    backend = dct.get("backend", "pyomo")
+    mode = get_task_mode(dct, mode)
     
-    result = run_instance(network, startup_cost_factor, planning_horizon, tau_factor, beta_factor, formulation_number, taskID, mip_gap_multiplier)
+    result = run_instance(network, startup_cost_factor, planning_horizon, tau_factor, beta_factor, formulation_number, taskID, mip_gap_multiplier, backend, mode)
     
-    with open(f"src/results/result_{taskID:05}.json", "w") as f:
+    with open(f"{RESULTS_FOLDER}/result_{taskID:05}.json", "w") as f:
         json.dump(result, f)
+    
+    wait_for_artifacts()
+
+
+def parse_task_ids(task_id_args: list[str]) -> list[int]:
+    """ 
+    Parses task IDs given as single IDs (5), ranges (1-100) or comma separated lists (2,10,15), in any combination.
+    
+    Args:
+        - task_id_args (list[str]): task ID arguments from the command line.
+    
+    Returns:
+        - list[int]: task IDs in the given order, without repetitions.
+    """
+    
+    task_ids = []
+    
+    for arg in task_id_args:
+        for part in arg.split(","):
+            if "-" in part:
+                first, last = part.split("-")
+                task_ids.extend(range(int(first), int(last) + 1))
+            elif part:
+                task_ids.append(int(part))
+    
+    return list(dict.fromkeys(task_ids))
+
+
+def _init_worker(threads: int, solver_backend: str) -> None:
+    """ 
+    Sets the solver thread budget and the solver backend of a worker process.
+    """
+    
+    set_solver_threads(threads)
+    set_solver_backend(solver_backend)
+
+
+def _run_task(taskID: int, mode: str, output_policy: str) -> int:
+    """ 
+    Runs one task of a batch (see run_batch).
+    
+    Returns:
+        - int: the task ID.
+    """
+    
+    main(taskID, mode, output_policy)
+    
+    return taskID
+
+
+def run_batch(task_ids: list[int], workers: int = 1, threads: int = None, mode: str = None, output_policy: str = "headless", solver_backend: str = "gurobi") -> None:
+    """ 
+    Runs several tasks in one Python process, or in a pool of worker processes, so Python startup and imports are paid once per worker.
+    Each worker gets a budget of threads solver threads (bound preprocessing included), so that workers x threads <= cores by default.
+    Each result is written to src/results/result_ID.json as soon as its task finishes. A failing task is logged and does not stop the batch.
+    
+    Args:
+        - task_ids (list[int]): IDs of the data sets to solve.
+        - workers (int): number of worker processes. With 1, tasks run sequentially in this process.
+        - threads (int): number of solver threads per worker. If None, cores // workers.
+        - mode (str): overrides the mode of the data sets (see RUN_MODES).
+        - output_policy (str): output policy (see src/utils/output_policy.py).
+        - solver_backend (str): solver backend of this process and of the workers (see set_solver_backend).
+    """
+    
+    cores = os.cpu_count() or 1
+    threads = threads if threads is not None else max(1, cores // workers)
+    
+    if workers * threads > cores:
+        logging.warning(f"{workers} workers x {threads} threads exceed the {cores} cores.")
+    
+    _init_worker(threads, solver_backend)
+    os.makedirs(RESULTS_FOLDER, exist_ok = True)
+    start = time.perf_counter()
+    failed = []
+    
+    if workers == 1:
+        for taskID in task_ids:
+            try:
+                main(taskID, mode, output_policy)
+            except Exception as e:
+                logging.exception(e)
+                failed.append(taskID)
+    
+    else:
+        with ProcessPoolExecutor(max_workers = workers, initializer = _init_worker, initargs = (threads, solver_backend)) as executor:
+            futures = {executor.submit(_run_task, taskID, mode, output_policy): taskID for taskID in task_ids}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    logging.exception(e)
+                    failed.append(futures[future])
+    
+    logging.info(f"Batch finished: {len(task_ids) - len(failed)} of {len(task_ids)} tasks in {round(time.perf_counter() - start, 2)} s. Failed tasks: {sorted(failed)}")
                                 
     
 if __name__=="__main__":
     
-    main(taskID)      
\ No newline at end of file
+    # Get the command line arguments
+    parser = argparse.ArgumentParser(description = "Solves the instances in input_data/datasets/run_ID.json.")
+    parser.add_argument("taskIDs", nargs = "+", help = "ids of the data sets (the number at the end of the json file): single ids (5), ranges (1-100) or lists (2,10,15).")
+    parser.add_argument("--workers", type = int, default = 1, help = "number of worker processes solving tasks in parallel.")
+    parser.add_argument("--threads", type = int, default = None, help = "number of solver threads per worker (default: cores // workers).")
+    parser.add_argument("--mode", choices = RUN_MODES, default = None, help = "overrides the mode of the data set.")
+    parser.add_argument("--output", choices = OUTPUT_POLICIES, default = "headless", help = "output policy (see src/utils/output_policy.py).")
+    parser.add_argument("--solver", choices = list(SOLVER_BACKENDS), default = "gurobi", help = "solver backend (see src/models/solver_backends.py).")
+    args = parser.parse_args()
+    
+    task_ids = parse_task_ids(args.taskIDs)
+    
+    if len(task_ids) == 1:
+        _init_worker(args.threads, args.solver)
+        main(task_ids[0], args.mode, args.output)
+    else:
+        run_batch(task_ids, args.workers, args.threads, args.mode, args.output, args.solver)      
\ No newline at end of file
@@ -0,0 +1,154 @@
+import logging
+from src.data.instance_generation import enumerate_instance_grid, load_network
+from src.models.model_solve import set_solver_threads, set_solver_backend
+from src.models.solver_backends import SOLVER_BACKENDS
+from src.utils.output_policy import OUTPUT_POLICIES
+from src.data.postprocessing import is_valid_result
+from main import solve_task, get_task_mode, parse_task_ids, RESULTS_FOLDER, RUN_MODES
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import argparse
+import time
+import json
+import os
+
+
+def _network_size(network: str) -> int:
+    """
+    Computes the size of a network as its number of unit-task pairs, which sets the number of variables per time point.
+
+    Args:
+        - network (str): name of the network.
+
+    Returns:
+        - int: number of unit-task pairs.
+    """
+
+    return len(load_network(network, 1, 1, 0, 1)["UNIT_TASKS"])
+
+
+def order_longest_first(jobs: list[tuple[int, dict]]) -> list[tuple[int, dict]]:
+    """
+    Orders the jobs by expected run time, longest first, so that the longest jobs do not start last and leave the other workers idle.
+    The expected run time grows with the planning horizon and the network size (see _network_size). Ties keep the task ID order.
+
+    Args:
+        - jobs (list[tuple[int, dict]]): (task ID, parameters) of each job.
+
+    Returns:
+        - list[tuple[int, dict]]: the jobs, longest expected first.
+    """
+
+    network_sizes = {network: _network_size(network) for network in {params["network"] for _, params in jobs}}
+
+    return sorted(jobs, key = lambda job: (-job[1]["planning_horizon"] * network_sizes[job[1]["network"]], job[0]))
+
+
+def is_completed(taskID: int, mode: str) -> bool:
+    """
+    Checks if a task was completed in the given mode, i.e., its result file exists, was written by a run in this mode and is a valid result (see is_valid_result).
+    run_instance catches the errors of a run and solve_task still writes its placeholder result, so a failed task (e.g., a license, memory or build error) is not completed and is solved again.
+
+    Args:
+        - taskID (int): id of the task.
+        - mode (str): mode the task is solved in (see get_task_mode).
+
+    Returns:
+        - bool: True if the task can be skipped.
+    """
+
+    try:
+        with open(f"{RESULTS_FOLDER}/result_{taskID:05}.json", "r") as f:
+            record = json.load(f)
+    except (OSError, ValueError):
+        return False
+
+    return isinstance(record, dict) and record.get("Mode", "milp") == mode and is_valid_result(record)
+
+
+def _init_worker(threads: int, solver_backend: str) -> None:
+    """
+    Sets the solver thread budget and the solver backend of a worker process.
+    """
+
+    set_solver_threads(threads)
+    set_solver_backend(solver_backend)
+
+
+def _run_job(taskID: int, params: dict, mode: str, output_policy: str) -> int:
+    """
+    Runs one job of a sweep (see run_sweep).
+
+    Returns:
+        - int: the task ID.
+    """
+
+    solve_task(taskID, params, mode, output_policy)
+
+    return taskID
+
+
+def run_sweep(task_ids: list[int] = None, workers: int = None, threads: int = 1, mode: str = None, output_policy: str = "headless", solver_backend: str = "gurobi") -> None:
+    """
+    Solves the instance grid of instance_factors_network in a pool of worker processes.
+    Each worker gets a budget of threads solver threads, and by default there are as many workers as fit in the cores (workers x threads <= cores).
+    Jobs are submitted longest expected first (see order_longest_first), and tasks with a valid result in src/results for the same mode are skipped (see is_completed), so an interrupted sweep can be restarted.
+    A task fails if its result is not valid, since run_instance logs the errors of a run instead of raising them.
+    Task IDs are the same as in generate_datasets.py, but the parameters come from enumerate_instance_grid, so the json data sets are not needed.
+
+    Args:
+        - task_ids (list[int]): IDs of the grid to solve. All of them if None.
+        - workers (int): number of worker processes. If None, cores // threads.
+        - threads (int): number of solver threads per worker.
+        - mode (str): overrides the mode of the grid (see RUN_MODES).
+        - output_policy (str): output policy (see src/utils/output_policy.py).
+        - solver_backend (str): solver backend of the workers (see set_solver_backend).
+    """
+
+    cores = os.cpu_count() or 1
+    workers = workers if workers is not None else max(1, cores // threads)
+
+    if workers * threads > cores:
+        logging.warning(f"{workers} workers x {threads} threads exceed the {cores} cores.")
+
+    grid = enumerate_instance_grid()
+    task_ids = task_ids if task_ids is not None else range(1, len(grid) + 1)
+
+    if any(taskID < 1 or taskID > len(grid) for taskID in task_ids):
+        raise Exception(f"Task IDs must be between 1 and {len(grid)}.")
+
+    jobs = [(taskID, grid[taskID - 1]) for taskID in task_ids if not is_completed(taskID, get_task_mode(grid[taskID - 1], mode))]
+    jobs = order_longest_first(jobs)
+
+    logging.info(f"Sweep: {len(jobs)} tasks to solve, {len(task_ids) - len(jobs)} already completed. {workers} workers x {threads} threads.")
+
+    os.makedirs(RESULTS_FOLDER, exist_ok = True)
+    start = time.perf_counter()
+    failed = []
+
+    with ProcessPoolExecutor(max_workers = workers, initializer = _init_worker, initargs = (threads, solver_backend)) as executor:
+        futures = {executor.submit(_run_job, taskID, params, mode, output_policy): (taskID, params) for taskID, params in jobs}
+        for future in as_completed(futures):
+            taskID, params = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                logging.exception(e)
+            if not is_completed(taskID, get_task_mode(params, mode)):
+                failed.append(taskID)
+
+    logging.info(f"Sweep finished: {len(jobs) - len(failed)} of {len(jobs)} tasks in {round(time.perf_counter() - start, 2)} s. Failed tasks: {sorted(failed)}")
+
+
+if __name__=="__main__":
+
+    # Get the command line arguments
+    parser = argparse.ArgumentParser(description = "Solves the instance grid of instance_factors_network in parallel, skipping completed tasks.")
+    parser.add_argument("taskIDs", nargs = "*", help = "ids of the grid to solve: single ids (5), ranges (1-100) or lists (2,10,15). All of them if not given.")
+    parser.add_argument("--workers", type = int, default = None, help = "number of worker processes (default: cores // threads).")
+    parser.add_argument("--threads", type = int, default = 1, help = "number of solver threads per worker.")
+    parser.add_argument("--mode", choices = RUN_MODES, default = None, help = "overrides the mode of the grid.")
+    parser.add_argument("--output", choices = OUTPUT_POLICIES, default = "headless", help = "output policy (see src/utils/output_policy.py).")
+    parser.add_argument("--solver", choices = list(SOLVER_BACKENDS), default = "gurobi", help = "solver backend (see src/models/solver_backends.py).")
+    args = parser.parse_args()
+
+    run_sweep(parse_task_ids(args.taskIDs) if args.taskIDs else None, args.workers, args.threads, args.mode, args.output, args.solver)
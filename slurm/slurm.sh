@@ -20,4 +20,5 @@ conda activate myenv
 python main.py $SLURM_ARRAY_TASK_ID
 
 # HOW TO RUN: sbatch --array=1-100 slurm.sh. This will run instances with IDS from 1 to 100 in parallel.
-# HOW TO RUN: sbatch --array=2,10,15,67,98 slurm.sh. This will run run tasks with IDs [2, 10, 15, 67, 98] in parallel.
\ No newline at end of file
+# HOW TO RUN: sbatch --array=2,10,15,67,98 slurm.sh. This will run run tasks with IDs [2, 10, 15, 67, 98] in parallel.
+# HOW TO RUN: for many short instances, use slurm_batch.sh, which solves a chunk of instances per array task in one Python process.
@@ -0,0 +1,29 @@
+#!/bin/bash
+
+#SBATCH --job-name=PythonBatchJob                            	 # Job name
+#SBATCH --time=24:00:00                                     	 # Walltime
+#SBATCH --ntasks=1                                          	 # Number of tasks
+#SBATCH --cpus-per-task=8                                   	 # Number of processor cores (one worker per core)
+#SBATCH --nodes=1                                           	 # Number of nodes
+#SBATCH --mem-per-cpu=6144M                                 	 # Memory per CPU core
+#SBATCH --output=logs/PythonBatchJob%A_%a.slurm     		 # Standard output
+#SBATCH --error=logs/PythonBatchJob%A_%a.err        		 # Standard error
+#SBATCH --constraint=cascade                                	 # CPU type constraint
+
+# Number of instances solved by each array task
+CHUNK_SIZE=${CHUNK_SIZE:-50}
+
+# Load necessary modules
+module load anaconda3/2023.3
+module load gurobi/12.0.0
+
+# Activate Conda environment
+conda activate myenv
+
+# Run python script with the chunk of task IDs of this array task, solving one instance per core at a time with one solver thread each
+FIRST_ID=$(( (SLURM_ARRAY_TASK_ID - 1) * CHUNK_SIZE + 1 ))
+LAST_ID=$(( SLURM_ARRAY_TASK_ID * CHUNK_SIZE ))
+python main.py $FIRST_ID-$LAST_ID --workers $SLURM_CPUS_PER_TASK --threads 1
+
+# HOW TO RUN: sbatch --array=1-20 slurm_batch.sh. This will run instances with IDs from 1 to 1000 in 20 jobs of 50 instances (8 at a time per job).
+# HOW TO RUN: CHUNK_SIZE=10 sbatch --array=1-5 slurm_batch.sh. This will run instances with IDs from 1 to 50 in 5 jobs of 10 instances.
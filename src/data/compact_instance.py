@@ -0,0 +1,108 @@
+import numpy as np
+
+
+# Fields of UNIT_TASKS read by the sets, stored as integer arrays with one entry per unit-task pair (the other fields are only read by the parameters, from stn_data)
+UNIT_TASK_FIELDS = ['tau', 'direction']
+
+
+def _csr(rows: np.ndarray, num_rows: int) -> dict:
+    """
+    Groups the entries of an arc list by row (CSR layout): the entries of row r are order[indptr[r]:indptr[r+1]], in their original order.
+    """
+
+    indptr = np.zeros(num_rows + 1, dtype = np.int64)
+    np.cumsum(np.bincount(rows, minlength = num_rows), out = indptr[1:])
+
+    return {'indptr': indptr, 'order': np.argsort(rows, kind = 'stable')}
+
+
+def csr_row(csr: dict, row: int) -> np.ndarray:
+    """
+    Returns the entries of row row of a CSR adjacency (see _csr).
+
+    Args:
+        - csr (dict): CSR adjacency of the compact instance (e.g., instance['units_of_task']).
+        - row (int): row ID (e.g., task ID).
+
+    Returns:
+        - np.ndarray: indices of the entries in the arc arrays (e.g., unit-task pairs).
+    """
+
+    return csr['order'][csr['indptr'][row]:csr['indptr'][row + 1]]
+
+
+def create_compact_instance(stn_data: dict) -> dict:
+    """
+    Builds an integer-indexed, array-backed representation of the network, in one pass over each dictionary of stn_data.
+    Tasks, units and materials get IDs in order of first appearance (tasks and units in UNIT_TASKS, materials in STATES).
+    Arcs are stored as ID arrays, with CSR adjacencies to visit them by task, unit or material without scanning the dictionaries again.
+    The sets of the Pyomo models are views over it (see create_main_sets_parameters).
+
+    Args:
+        - stn_data (dict): a dictionary with the state-task network instance data.
+
+    Returns:
+        - dict: the compact instance.
+            - 'tasks', 'units', 'materials' (list): names by ID, and 'task_ids', 'unit_ids', 'material_ids' (dict): IDs by name.
+            - 'pair_task', 'pair_unit' (np.ndarray): task and unit IDs of each unit-task pair, in the order of UNIT_TASKS, and one array per UNIT_TASK_FIELDS entry.
+            - 'units_of_task', 'tasks_of_unit' (dict): CSR adjacencies of the pairs by task and by unit.
+            - 'consumed_material', 'consuming_task' (np.ndarray): ST_ARCS, and 'consumers' (dict): their CSR adjacency by material.
+            - 'producing_task', 'produced_material' (np.ndarray): TS_ARCS, and 'producers' (dict): their CSR adjacency by material.
+            - 'transition_task', 'transition_subtask', 'transition_direction', 'is_direct', 'is_startup', 'is_shutdown' (np.ndarray): TASKS_TRANSITION_TASKS.
+            - 'is_raw_material', 'is_final_product', 'is_intermediate' (np.ndarray): material flags.
+    """
+
+    states = stn_data['STATES']
+    unit_tasks = stn_data['UNIT_TASKS']
+
+    task_ids, unit_ids = {}, {}
+    pair_task, pair_unit = [], []
+    fields = {field: [] for field in UNIT_TASK_FIELDS}
+
+    for (j,i), data in unit_tasks.items():
+        pair_task.append(task_ids.setdefault(i, len(task_ids)))
+        pair_unit.append(unit_ids.setdefault(j, len(unit_ids)))
+        for field in UNIT_TASK_FIELDS:
+            fields[field].append(data[field])
+
+    material_ids = {k: index for index, k in enumerate(states)}
+
+    instance = {
+        'tasks': list(task_ids),
+        'units': list(unit_ids),
+        'materials': list(material_ids),
+        'task_ids': task_ids,
+        'unit_ids': unit_ids,
+        'material_ids': material_ids,
+        'pair_task': np.array(pair_task, dtype = np.int64),
+        'pair_unit': np.array(pair_unit, dtype = np.int64),
+        'is_raw_material': np.array([states[k]['isRM'] for k in states], dtype = bool),
+        'is_final_product': np.array([states[k]['isProd'] for k in states], dtype = bool),
+        'is_intermediate': np.array([states[k]['isIntermed'] for k in states], dtype = bool),
+    }
+    instance.update({field: np.array(values, dtype = np.int64) for field, values in fields.items()})
+    instance['units_of_task'] = _csr(instance['pair_task'], len(task_ids))
+    instance['tasks_of_unit'] = _csr(instance['pair_unit'], len(unit_ids))
+
+    # Material arcs of tasks in UNIT_TASKS
+    st_arcs = [(material_ids[k], task_ids[i]) for (k,i) in stn_data['ST_ARCS'] if i in task_ids]
+    ts_arcs = [(task_ids[i], material_ids[k]) for (i,k) in stn_data['TS_ARCS'] if i in task_ids]
+
+    instance['consumed_material'] = np.array([k for k, _ in st_arcs], dtype = np.int64)
+    instance['consuming_task'] = np.array([i for _, i in st_arcs], dtype = np.int64)
+    instance['consumers'] = _csr(instance['consumed_material'], len(material_ids))
+    instance['producing_task'] = np.array([i for i, _ in ts_arcs], dtype = np.int64)
+    instance['produced_material'] = np.array([k for _, k in ts_arcs], dtype = np.int64)
+    instance['producers'] = _csr(instance['produced_material'], len(material_ids))
+
+    # Transitions between tasks in UNIT_TASKS
+    transitions = [(task_ids[i], task_ids[ii], data) for (i,ii), data in stn_data['TASKS_TRANSITION_TASKS'].items() if i in task_ids and ii in task_ids]
+
+    instance['transition_task'] = np.array([i for i, _, _ in transitions], dtype = np.int64)
+    instance['transition_subtask'] = np.array([ii for _, ii, _ in transitions], dtype = np.int64)
+    instance['transition_direction'] = np.array([data['direction'] for _, _, data in transitions], dtype = np.int64)
+    instance['is_direct'] = np.array([data['isDirect'] for _, _, data in transitions], dtype = bool)
+    instance['is_startup'] = np.array([data['isSU'] for _, _, data in transitions], dtype = bool)
+    instance['is_shutdown'] = np.array([data['isSD'] for _, _, data in transitions], dtype = bool)
+
+    return instance
@@ -11,6 +11,37 @@ from input_data.networks import (define_stn_network_1,
                                  define_stn_network_all_transitions,
                                  define_stn_network_est_test,
                                  define_stn_network_est_indirect_transitions)
+from input_data.synthetic_networks import define_stn_network_synthetic
+from functools import partial
+from itertools import product
+
+
+# Networks by name. Each entry maps to a function of (tau_factor, beta_factor, startup_cost_factor, planning_horizon) returning the network data
+NETWORK_DEFINITIONS = {
+    # network_1 where tasks/units have the same tau/beta in a stage
+    "network_1": define_stn_network_1,
+    # network_2 where tasks/units are different at each stage and tasks TB1 and TB3 have to wait for materials to accumulate before they can start
+    "network_2": define_stn_network_2,
+    # network_3 where tasks/units are different at each stage, tasks TB1 and TB3 have to wait for materials to accumulate, TC% and TC^ are used to test bounds for X
+    "network_3": define_stn_network_3,
+    # network_4 where tasks/units are different at each stage, tasks TB1 and TB3 have to wait for materials to accumulate, TC5 and TC6 are used to test bounds for X and there is one more stage
+    "network_4": define_stn_network_4,
+    # network_5. Same as network_3 plus transitions in some of the tasks
+    "network_5": define_stn_network_5,
+    # network_6 where each stage has 1 unit with 3 tasks each
+    "network_6": define_stn_network_6,
+    "network_competing_tasks": define_stn_network_tasks_competing,
+    "network_upper_bound_YS": define_stn_network_upper_bound_YS,
+    "network_upper_bound_X": define_stn_network_upper_bound_X,
+    "network_indirect_transitions": define_stn_network_indirect_transitions,
+    "network_all_transitions": define_stn_network_all_transitions,
+    "network_est_test": define_stn_network_est_test,
+    "network_est_indirect_transitions_test": define_stn_network_est_indirect_transitions,
+    # Synthetic networks (see define_stn_network_synthetic) of the size of network_4, and about 10 and 100 times larger
+    "network_synthetic": define_stn_network_synthetic,
+    "network_synthetic_10x": partial(define_stn_network_synthetic, num_stages = 8, units_per_stage = 5, tasks_per_unit = 4, materials_per_stage = 10),
+    "network_synthetic_100x": partial(define_stn_network_synthetic, num_stages = 16, units_per_stage = 25, tasks_per_unit = 4, materials_per_stage = 50),
+}
 
 
 def load_network(network_name: str, tau_factor: int, beta_factor: int, startup_cost_factor: int, planning_horizon: int) -> dict:
@@ -18,7 +49,7 @@ def load_network(network_name: str, tau_factor: int, beta_factor: int, startup_c
     Loads and returns a dictionary of network data.
     
     Args:
-        - network_name (str): identifier of the network.
+        - network_name (str): identifier of the network (a key of NETWORK_DEFINITIONS).
         - tau_factor (int): multiplyer factor for tau parameters.
         - beta_factor (int): multiplyer factor for beta parameters.
         - startup_cost_factor (int): multiplyer factor for startup cost parameters.
@@ -28,54 +59,11 @@ def load_network(network_name: str, tau_factor: int, beta_factor: int, startup_c
         dict: a dictionary containing the network data. 
     """
     
-    # Create network_1 where tasks/units have the same tau/beta in a stage
-    if network_name == "network_1":
-        return define_stn_network_1(tau_factor, beta_factor, startup_cost_factor, planning_horizon)
-    
-    # Create network_2 where tasks/units are different at each stage and tasks TB1 and TB3 have to wait for materials to accumulate before they can start
-    elif network_name == "network_2":
-        return define_stn_network_2(tau_factor, beta_factor, startup_cost_factor, planning_horizon)
-    
-    # Create network_3 where tasks/units are different at each stage, tasks TB1 and TB3 have to wait for materials to accumulate, TC% and TC^ are used to test bounds for X
-    elif network_name == "network_3":
-        return define_stn_network_3(tau_factor, beta_factor, startup_cost_factor, planning_horizon)
-    
-    # Create network_4 where tasks/units are different at each stage, tasks TB1 and TB3 have to wait for materials to accumulate, TC5 and TC6 are used to test bounds for X and there is one more stage
-    elif network_name == "network_4":
-        return define_stn_network_4(tau_factor, beta_factor, startup_cost_factor, planning_horizon)
-    
-    # Create network_5. Same as network_3 plus transitions in some of the tasks. 
-    elif network_name == "network_5":
-        return define_stn_network_5(tau_factor, beta_factor, startup_cost_factor, planning_horizon)
-    
-    # Create network_6 where each stage has 1 unit with 3 tasks each. 
-    elif network_name == "network_6":
-        return define_stn_network_6(tau_factor, beta_factor, startup_cost_factor, planning_horizon)
-    
-    elif network_name == "network_competing_tasks":
-        return define_stn_network_tasks_competing(tau_factor, beta_factor, startup_cost_factor, planning_horizon)
-    
-    elif network_name == "network_upper_bound_YS":
-        return define_stn_network_upper_bound_YS(tau_factor, beta_factor, startup_cost_factor, planning_horizon)
-    
-    elif network_name == "network_upper_bound_X":
-        return define_stn_network_upper_bound_X(tau_factor, beta_factor, startup_cost_factor, planning_horizon)
-    
-    elif network_name == "network_indirect_transitions":
-        return define_stn_network_indirect_transitions(tau_factor, beta_factor, startup_cost_factor, planning_horizon)
-    
-    elif network_name == "network_all_transitions":
-        return define_stn_network_all_transitions(tau_factor, beta_factor, startup_cost_factor, planning_horizon)
-    
-    elif network_name == "network_est_test":
-        return define_stn_network_est_test(tau_factor, beta_factor, startup_cost_factor, planning_horizon)
-    
-    elif network_name == "network_est_indirect_transitions_test":
-        return define_stn_network_est_indirect_transitions(tau_factor, beta_factor, startup_cost_factor, planning_horizon)
-    
-    else:
+    if network_name not in NETWORK_DEFINITIONS:
         raise ValueError(f"Unsupported network name: {network_name}") 
     
+    return NETWORK_DEFINITIONS[network_name](tau_factor, beta_factor, startup_cost_factor, planning_horizon)
+    
 
 def instance_factors_network() -> tuple[list[str], list[str], list[int], int, int]:
     """ 
@@ -99,4 +87,57 @@ def instance_factors_network() -> tuple[list[str], list[str], list[int], int, in
     MIP_GAPS = [10, 100]
     
         
-    return FORMULATIONS, NETWORKS, PLANNING_HORIZONS, TAU_FACTORS, BETA_FACTORS, STARTUP_COST_FACTORS, MIP_GAPS 
+    return FORMULATIONS, NETWORKS, PLANNING_HORIZONS, TAU_FACTORS, BETA_FACTORS, STARTUP_COST_FACTORS, MIP_GAPS
+
+
+def init_based_parameters() -> dict:
+    """ 
+    Initialize an empty dictionary to store the parameters for each instance.
+    
+    Returns:
+        dict: an empty dictionary.
+    """
+    
+    return {
+            "formulation": 0,
+            "network": "",
+            "startup_cost_factor": 0,
+            "planning_horizon": 0,
+            "tau_factor": 0,
+            "beta_factor": 0,
+            "mip_gap": 0,
+            "backend": "pyomo",
+            "mode": "milp"
+            }
+
+
+def enumerate_instance_grid() -> list[dict]:
+    """ 
+    Enumerates the parameters of every instance of the grid defined in instance_factors_network.
+    The task ID of an instance is its position in the list plus one (run_00001.json is the first one), so generate_datasets.py and run_sweep.py agree on the IDs.
+    
+    Returns:
+        list[dict]: parameters of each instance, in task ID order.
+    """
+    
+    formulations, networks, planning_horizons, tau_factors, beta_factors, startup_cost_factors, mip_gap_multipliers = instance_factors_network()
+    
+    grid = []
+    
+    for formulation_num, net, horizon, tau, beta, sucost, gap in product(range(formulations), networks, planning_horizons, tau_factors, beta_factors, startup_cost_factors, mip_gap_multipliers):
+        
+        params = init_based_parameters()
+        
+        params.update({
+            "formulation": formulation_num,
+            "network": net,
+            "startup_cost_factor": sucost,
+            "planning_horizon": horizon,
+            "tau_factor": tau,
+            "beta_factor": beta,
+            "mip_gap": gap,
+        })
+        
+        grid.append(params)
+    
+    return grid
@@ -1,7 +1,40 @@
 from pyomo.environ import *
+import math
 
 
-def initialize_results_dict(network: str, startup_cost_factor: int, planning_horizon: int, tau_factor: int, beta_factor: int, formulation_name: str, taskID: int, mip_gap_multiplier: int) -> dict[str, Any]:
+# Fields that must not be None for a result to be valid (see is_valid_result)
+REQUIRED_FIELDS = [
+    "Formulation", "MILP Objective", "Upper Bound", "Relative Gap",
+    "Time (s)", "MILP Status", "MILP Term. Condition", "LP Relaxation",
+    "Num. Binary Var.", "Total Num. Var.", "Num. Constraints"
+]
+
+# Runs in "lp" and "root" mode do not solve the MILP
+RELAXATION_MODES = ["lp", "root"]
+REQUIRED_FIELDS_RELAXATION = [
+    "Formulation", "LP Relaxation", "LP Time (s)",
+    "Num. Binary Var.", "Total Num. Var.", "Num. Constraints"
+]
+
+
+def is_valid_result(record: dict) -> bool:
+    """
+    A result is valid if all required fields (for the mode of the run) are not None.
+    Failed runs keep the placeholders of initialize_results_dict, so their results are not valid.
+
+    Args:
+        - record (dict): dictionary with results from a run.
+
+    Returns:
+        - bool: True if the dictionary has no None in the required fields.
+    """
+
+    required_fields = REQUIRED_FIELDS_RELAXATION if record.get("Mode", "milp") in RELAXATION_MODES else REQUIRED_FIELDS
+
+    return all(record.get(field) is not None for field in required_fields)
+
+
+def initialize_results_dict(network: str, startup_cost_factor: int, planning_horizon: int, tau_factor: int, beta_factor: int, formulation_name: str, taskID: int, mip_gap_multiplier: int, mode: str = "milp") -> dict[str, Any]:
     """
     Initializes a dictionary to store results from a single optimization instance.
 
@@ -14,6 +47,7 @@ def initialize_results_dict(network: str, startup_cost_factor: int, planning_hor
         - formulation_name (str): name of the model formulation.
         - taskID (int): id that identifies the data set. It is the number at the end of each json file.
         - mip_gap_multiplier (int): multiplier to increase the mip gap.
+        - mode (str): "milp" solves the MILP and its LP relaxation, "lp" only the LP relaxation, "root" the LP relaxation and the root node, "rolling" and "relax_and_fix" the LP relaxation and the MILP with a rolling horizon or with relax-and-fix.
 
     Returns:
         dict[str, Any]: Initialized dictionary with placeholders for results.
@@ -34,37 +68,77 @@ def initialize_results_dict(network: str, startup_cost_factor: int, planning_hor
             "LP Relaxation": None,
             "Num. Binary Var.": None,
             "Total Num. Var.": None,
-            "Num. Constraints": None,}
+            "Num. Constraints": None,
+            "Mode": mode,
+            "Build Time (s)": None,
+            "LP Time (s)": None,
+            "Root Bound": None,
+            "Root Time (s)": None,
+            "Num. Windows": None,
+            "Window Times (s)": None,
+            "Num. Cuts": None,}
     
     
-def create_dict_result(result: dict, model_analytics_milp: list, results_milp: Any, results_lp: ConcreteModel, formulation_name: str, mip_gap_multiplier: int) -> dict[str, Any]:
+def create_dict_result(result: dict, model_analytics_milp: list, results_milp: dict, results_lp: dict, formulation_name: str, mip_gap_multiplier: int) -> dict[str, Any]:
+    """
+    Updates the result dictionary with values from the MILP and LP results if the MILP has a solution.
+    The results are the records of solve_model_record (Pyomo) or _solve_matrix_model (matrix backend), so they do not depend on the backend or the solver.
+
+    Args:
+        - result (dict[str, Any]): initialized result dictionary.
+        - model_analytics_milp (list): [total vars, binary vars, constraints].
+        - results_milp (dict): results from solving the MILP.
+        - results_lp (dict): results from solving the LP relaxation.
+        - formulation_name (str): Name of the model formulation.
+
+    Returns:
+        dict[str, Any]: Updated dictionary with extracted results.
+    """
+    
+    if results_milp['objective'] is not None:
+    
+        result["Formulation"] = formulation_name
+        result['MILP Objective'] = round(results_milp['objective'], 2)
+        result['Upper Bound'] = round(results_milp['bound'], 2) if results_milp['bound'] is not None else None
+        result['Relative Gap'] = round( abs((round(results_milp['bound'], 6) - round(results_milp['objective'], 6))) / abs(round(results_milp['objective'], 2)), 6) if results_milp['bound'] is not None else None
+        result['Time (s)'] = round(results_milp['time'], 2)
+        result['MILP Status'] = results_milp['status']
+        result['MILP Term. Condition'] = results_milp['termination_condition']
+        result['MIP Gap Mult.'] = mip_gap_multiplier
+        result['LP Relaxation'] = round(results_lp['objective'], 2) if results_lp['objective'] is not None else None
+        result['Num. Binary Var.'] = model_analytics_milp[1]
+        result['Total Num. Var.'] = model_analytics_milp[0]
+        result['Num. Constraints'] = model_analytics_milp[2]
+    
+    return result
+
+
+def create_dict_result_relaxation(result: dict, model_analytics_milp: list, lp_relaxation: float, root_bound: float, formulation_name: str, mip_gap_multiplier: int, timings: dict) -> dict[str, Any]:
     """
-    Updates the result dictionary with actual values from MILP and LP results if results are feasible.
+    Updates the result dictionary of a run in "lp" or "root" mode, where the MILP is not solved.
 
     Args:
         - result (dict[str, Any]): initialized result dictionary.
         - model_analytics_milp (list): [total vars, binary vars, constraints].
-        - results_milp (Any): Pyomo solver results object for the MILP model.
-        - results_lp (Any): Pyomo solver results object for the LP relaxation.
+        - lp_relaxation (float): objective of the LP relaxation (None if it was not solved to optimality).
+        - root_bound (float): bound at the end of the root node (None if the root node was not solved).
         - formulation_name (str): Name of the model formulation.
+        - timings (dict): solve times in seconds {"LP": ..., "Root": ...}.
 
     Returns:
         dict[str, Any]: Updated dictionary with extracted results.
     """
     
-    if results_milp.solver.termination_condition != TerminationCondition.infeasible:  
+    if lp_relaxation is not None:
     
         result["Formulation"] = formulation_name
-        result['MILP Objective'] = round(results_milp.problem.lower_bound, 2)
-        result['Upper Bound'] = round(results_milp.problem.upper_bound, 2)
-        result['Relative Gap'] = round( abs((round(results_milp.problem.upper_bound, 6) - round(results_milp.problem.lower_bound, 6))) / abs(round(results_milp.problem.lower_bound, 2)), 6)
-        result['Time (s)'] = round(results_milp.solver.time, 2)
-        result['MILP Status'] = str(results_milp.solver.status)
-        result['MILP Term. Condition'] = str(results_milp.solver.termination_condition)
         result['MIP Gap Mult.'] = mip_gap_multiplier
-        result['LP Relaxation'] = round(results_lp.problem.lower_bound, 2)
+        result['LP Relaxation'] = round(lp_relaxation, 2)
+        result['LP Time (s)'] = round(timings["LP"], 2)
+        result['Root Bound'] = round(root_bound, 2) if root_bound is not None and math.isfinite(root_bound) else None
+        result['Root Time (s)'] = round(timings["Root"], 2) if timings["Root"] is not None else None
         result['Num. Binary Var.'] = model_analytics_milp[1]
         result['Total Num. Var.'] = model_analytics_milp[0]
         result['Num. Constraints'] = model_analytics_milp[2]
     
-    return result
\ No newline at end of file
+    return result
@@ -1,22 +1,95 @@
 from pyomo.environ import *
-from itertools import product
 from numpy import ceil
-from collections import defaultdict
+from collections import defaultdict, deque
+from src.utils.output_policy import is_verbose
+from src.utils.preprocessing_cache import load_cached_results, store_cached_results
 
 
 INITIAL_SHIFT = 1  # Initial shift of a consuming task in case the methods calculates that it should start before the start of the producing task
 SHIFT_TO_END_RUN = 1  # Shift to reach the end of a consuming task run
 
 
-def _materials_to_be_explored(stn_data: dict) -> list:
+def _build_task_graph(stn_data: dict) -> dict:
     """ 
-    Returns an ordered list of materials to be explored.
+    Builds the task-material graph of the network from ST_ARCS and TS_ARCS, restricted to intermediate materials.
+    Transition tasks (startups, shutdowns and direct transitions) run next to the production tasks they belong to, so they are replaced by them in the task predecessors.
+    
+    Returns:
+        - dict: {"production_tasks": list, "owners": transition task -> production tasks, "units": task -> units,
+                 "inputs": task -> intermediate materials consumed, "producers": intermediate material -> producing tasks, "predecessors": production task -> production tasks}.
     """
     
     states = stn_data['STATES']
-    intermediate_materials = {k: v for k, v in states.items() if v['isIntermed']}
-        
-    return sorted(intermediate_materials.keys(), key=lambda k: intermediate_materials[k]['order'])
+    transition_tasks = {ii for (i,ii) in stn_data['TASKS_TRANSITION_TASKS']}
+    
+    units = defaultdict(list)
+    for (j,i) in stn_data['UNIT_TASKS']:
+        units[i].append(j)
+    
+    owners = defaultdict(list)
+    for (i,ii) in stn_data['TASKS_TRANSITION_TASKS']:
+        owners[ii].append(i)
+    
+    inputs = defaultdict(list)
+    for (k,i) in stn_data['ST_ARCS']:
+        if states[k]['isIntermed']:
+            inputs[i].append(k)
+    
+    producers = defaultdict(list)
+    for (i,k) in stn_data['TS_ARCS']:
+        if states[k]['isIntermed']:
+            producers[k].append(i)
+    
+    production_tasks = [i for i in units if i not in transition_tasks]
+    predecessors = {ii: set(i_owner for k in inputs[ii] for i in producers[k] for i_owner in owners.get(i, [i])) for ii in production_tasks}
+    
+    return {"production_tasks": production_tasks, "owners": owners, "units": units, "inputs": inputs, "producers": producers, "predecessors": predecessors}
+
+
+def _topological_order(graph: dict) -> tuple[list, bool]:
+    """ 
+    Orders the production tasks so that each task comes after the tasks producing its inputs (Kahn's algorithm).
+    Tasks in recycle loops, and the tasks after them, cannot be ordered and are appended at the end.
+    
+    Returns:
+        Tuple[list: production tasks, bool: True if the network has no recycle loops]
+    """
+    
+    tasks = graph["production_tasks"]
+    indegree = {i: len(graph["predecessors"][i]) for i in tasks}
+    successors = defaultdict(list)
+    for ii in tasks:
+        for i in graph["predecessors"][ii]:
+            successors[i].append(ii)
+    
+    queue = deque(i for i in tasks if indegree[i] == 0)
+    order = []
+    
+    while queue:
+        i = queue.popleft()
+        order.append(i)
+        for ii in successors[i]:
+            indegree[ii] -= 1
+            if indegree[ii] == 0:
+                queue.append(ii)
+    
+    is_acyclic = len(order) == len(tasks)
+    ordered = set(order)
+    
+    return order + [i for i in tasks if i not in ordered], is_acyclic
+
+
+def _materials_to_be_explored(stn_data: dict) -> list:
+    """ 
+    Returns the intermediate materials in the topological order of their producing tasks (see _topological_order).
+    """
+    
+    graph = _build_task_graph(stn_data)
+    order, _ = _topological_order(graph)
+    rank = {i: r for r, i in enumerate(order)}
+    intermediate_materials = [k for k, v in stn_data['STATES'].items() if v['isIntermed']]
+    
+    return sorted(intermediate_materials, key=lambda k: min((rank[i] for i_producing in graph["producers"][k] for i in graph["owners"].get(i_producing, [i_producing])), default=len(order)))
 
 
 def _get_production_relationship(model: ConcreteModel, i_producing: Any, j_producing: Any, ii_consuming: Any, jj_consuming: Any, intermedMaterial: Any) -> int:
@@ -54,40 +127,96 @@ def _get_est(model: ConcreteModel, i_producing: Any, j_producing: Any, ii_consum
     return max(est_prod_task + INITIAL_SHIFT, est_prod_task + num_periods + SHIFT_TO_END_RUN - tau_min_consuming_task)
 
 
+def _get_est_transition_task(model: ConcreteModel, i_transition: Any, j: Any, graph: dict, est_task: dict) -> int:
+    """ 
+    Computes the est of transition task i_transition in unit j from the est of the production tasks it belongs to, which it precedes by at most tau time points.
+    """
+    
+    est_production_task = min(est_task[j,i] for i in graph["owners"][i_transition] if (j,i) in est_task)
+    
+    return max(0, est_production_task - model.P_Tau[i_transition,j])
+
+
+def _get_est_consuming_task(model: ConcreteModel, ii_consuming: Any, jj_consuming: Any, graph: dict, est_task: dict, production_relationship: dict, number_periods: dict) -> int:
+    """ 
+    Computes the est of consuming task ii_consuming in unit jj_consuming as the latest time its inputs are available.
+    An input is available at 0 if its initial inventory is enough for a run of ii_consuming, and otherwise at the earliest est given by any of its producing tasks and units (see _get_est).
+    Materials produced by a transition task are available one time point after the transition can start (see _get_est_transition_task).
+    """
+    
+    est_consuming_task = 0
+    
+    for k in graph["inputs"][ii_consuming]:
+        
+        if model.P_Init_Inventory_Material[k] >= abs(model.P_Rho_Minus[ii_consuming,k]) * model.P_Tau_Min[ii_consuming,jj_consuming] * model.P_Beta_Min[ii_consuming,jj_consuming]:
+            continue
+        
+        est_material = []
+        
+        for i_producing in graph["producers"][k]:
+            for j_producing in graph["units"][i_producing]:
+                
+                if i_producing in graph["owners"]:
+                    est_material.append(_get_est_transition_task(model, i_producing, j_producing, graph, est_task) + INITIAL_SHIFT)
+                    continue
+                
+                key = (i_producing, j_producing, ii_consuming, jj_consuming)
+                if key not in number_periods:
+                    if is_verbose():
+                        print(f"Pair of Tasks:{i_producing}-{ii_consuming}")
+                    production_relationship[key] = _get_production_relationship(model, *key, k)
+                    number_periods[key] = _get_number_periods(model, *key, production_relationship)
+                est_material.append(_get_est(model, *key, number_periods, est_task))
+        
+        est_consuming_task = max(est_consuming_task, min(est_material, default = 0))
+    
+    return est_consuming_task
+
+
 def compute_est_subsequent_tasks(model: ConcreteModel, stn_data: dict) -> None:
     """ 
-    Computes the est for all tasks in the stn_data network.
-    The while loop goes through the ordered set of intermediate materials and computes the est of the consuming task, assuming as 0 the est of tasks connected to raw materials. 
-    Updates the stn_data dictionary with 'EST_ST', a mapping of (j,i) -> est value.
+    Computes the est for all production tasks in the stn_data network, in all units executing them.
+    The tasks are visited in topological order of the task-material graph built from ST_ARCS and TS_ARCS (see _build_task_graph), so the est of the producing tasks is known when a consuming task is visited,
+    assuming as 0 the est of tasks connected to raw materials. Without recycle loops, this is a single pass.
+    With recycle loops, the passes are repeated until the est no longer changes (a fixed point), with the est capped at planning_horizon + 1.
+    The est of transition tasks is left as 0.
+    Updates the stn_data dictionary with 'EST', a mapping of (j,i) -> est value.
+    The result is reused from the preprocessing cache when the same instance was already computed (see src/utils/preprocessing_cache.py).
     """
     
+    planning_horizon = int(max(model.S_Time))
+    
+    if load_cached_results(stn_data, planning_horizon, ['EST']):
+        return
+    
     unit_task = stn_data['UNIT_TASKS']
-    materials_to_explore = _materials_to_be_explored(stn_data)
+    graph = _build_task_graph(stn_data)
+    order, is_acyclic = _topological_order(graph)
     
     production_relationship = {}
     number_periods = {}
     est_task = {(j,i): 0 for (j,i) in unit_task} 
+    is_changed = True
     
-    while materials_to_explore:
+    while is_changed:
         
-        first_material_list = materials_to_explore.pop(0)
-               
-        for i_producing, ii_consuming in product(model.S_I_Producing_K[first_material_list], model.S_I_Consuming_K[first_material_list]):
+        is_changed = False
         
-            j_producing = next(iter(model.S_J_Executing_I[i_producing]))
-            jj_consuming = next(iter(model.S_J_Executing_I[ii_consuming]))
+        for ii_consuming in order:
+            for jj_consuming in graph["units"][ii_consuming]:
                 
-            print(f"Pair of Tasks:{i_producing}-{ii_consuming}")
-        
-            if model.P_Init_Inventory_Material[first_material_list] >= abs(model.P_Rho_Minus[ii_consuming,first_material_list]) * model.P_Tau_Min[ii_consuming,jj_consuming] * model.P_Beta_Min[ii_consuming,jj_consuming]:
+                est = _get_est_consuming_task(model, ii_consuming, jj_consuming, graph, est_task, production_relationship, number_periods)
                 
-                est_task[jj_consuming, ii_consuming] = 0
-            
-            else:        
+                # In recycle loops without enough initial inventory the est grows at every pass, so it is capped at a task that cannot start in the planning horizon
+                if not is_acyclic:
+                    est = min(est, planning_horizon + 1)
                 
-                key = (i_producing, j_producing, ii_consuming, jj_consuming)                    
-                production_relationship[key] = _get_production_relationship(model, *key, first_material_list)
-                number_periods[key] = _get_number_periods(model, *key, production_relationship) 
-                est_task[jj_consuming, ii_consuming] = _get_est(model, *key, number_periods, est_task)  
+                if est != est_task[jj_consuming, ii_consuming]:
+                    is_changed = True
+                    est_task[jj_consuming, ii_consuming] = est
+        
+        if is_acyclic:
+            break
         
-    stn_data['EST'] = est_task
\ No newline at end of file
+    stn_data['EST'] = est_task
+    store_cached_results(stn_data, planning_horizon, ['EST'])
@@ -3,6 +3,7 @@ from itertools import product
 from numpy import ceil
 from collections import defaultdict
 from src.methods.est import _materials_to_be_explored, INITIAL_SHIFT, SHIFT_TO_END_RUN
+from src.utils.preprocessing_cache import load_cached_results, store_cached_results
 
 
 def _return_set_of_units_consuming_material(model: ConcreteModel, material: Any) -> int:
@@ -67,8 +68,14 @@ def compute_est_group_tasks(model: ConcreteModel, stn: dict) -> None:
     Firt, it identifies groups of tasks consuming material k where all of them are in different units. 
     Then, it computes the groups's est where tasks can operate simultaneously.
     Finally, it stores the value in stn['EST_GROUP'].
+    The result is reused from the preprocessing cache when the same instance was already computed.
     
     """
+    
+    planning_horizon = int(max(model.S_Time))
+    
+    if load_cached_results(stn, planning_horizon, ['EST_GROUP']):
+        return
         
     unit_task = stn['UNIT_TASKS']
     states = stn['STATES']
@@ -103,4 +110,5 @@ def compute_est_group_tasks(model: ConcreteModel, stn: dict) -> None:
             
             est_group[first_material_list] = dict(max_est_group)[first_material_list]
     
-    stn['EST_GROUP'] = est_group 
\ No newline at end of file
+    stn['EST_GROUP'] = est_group
+    store_cached_results(stn, planning_horizon, ['EST_GROUP'])
\ No newline at end of file
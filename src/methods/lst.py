@@ -0,0 +1,120 @@
+from pyomo.environ import *
+from src.methods.est import _build_task_graph, _topological_order
+from src.models.variables import RUNS_NEED_TO_FINISH_FLAG
+from src.utils.preprocessing_cache import load_cached_results, store_cached_results
+
+
+# If True, the formulations with est constraints (F2-F12) also set YS and X to 0 after the lst of each task (see compute_lst_tasks)
+LST_FLAG = False
+
+NOT_USEFUL = -1  # lst of a task whose production can never be used
+
+
+def _get_last_time_point(model: ConcreteModel, i: Any, j: Any, planning_horizon: int) -> int:
+    """
+    Returns the last time point where X[i,j,n] is not fixed to 0 by init_variables.
+    """
+
+    return planning_horizon - model.P_Tau[i,j] if RUNS_NEED_TO_FINISH_FLAG else planning_horizon
+
+
+def _get_last_demand(stn_data: dict, planning_horizon: int) -> dict:
+    """
+    Returns the last shipment time point of each material with a demand in the planning horizon.
+    """
+
+    last_demand = {}
+
+    for (k,n), shipment in stn_data['STATES_SHIPMENT'].items():
+        if shipment['demand'] > 0 and n <= planning_horizon:
+            last_demand[k] = max(last_demand.get(k, n), n)
+
+    return last_demand
+
+
+def _get_last_consumption(model: ConcreteModel, ii_consuming: Any, jj_consuming: Any, lst_task: dict, pruned_tasks: set, planning_horizon: int) -> int:
+    """
+    Returns the last time point where task ii_consuming in unit jj_consuming can consume material: the end of a run of tau_max starting at its lst, or the planning horizon if the task is not pruned.
+    """
+
+    if ii_consuming not in pruned_tasks:
+        return planning_horizon
+
+    return min(lst_task[jj_consuming, ii_consuming] + model.P_Tau_Max[ii_consuming, jj_consuming] - 1, _get_last_time_point(model, ii_consuming, jj_consuming, planning_horizon))
+
+
+def _get_lst_producing_task(model: ConcreteModel, i_producing: Any, j_producing: Any, useful_materials: dict, lst_task: dict, pruned_tasks: set, planning_horizon: int) -> int:
+    """
+    Computes the lst of task i_producing in unit j_producing: the latest start such that one of its outputs, available tau time points later, is still useful.
+    Final products with a price are useful at any time point, the other materials until their last demand or the last time point where a consuming task can consume them (see _get_last_consumption).
+    """
+
+    last_time_point = _get_last_time_point(model, i_producing, j_producing, planning_horizon)
+    lst = NOT_USEFUL
+
+    for k in model.S_K_Produced_I[i_producing]:
+
+        if useful_materials["sold"].get(k, False):
+            return last_time_point
+
+        last_useful = useful_materials["last_demand"].get(k, NOT_USEFUL)
+
+        for ii_consuming in model.S_I_Consuming_K[k]:
+            for jj_consuming in model.S_J_Executing_I[ii_consuming]:
+                last_useful = max(last_useful, _get_last_consumption(model, ii_consuming, jj_consuming, lst_task, pruned_tasks, planning_horizon))
+
+        lst = max(lst, last_useful - model.P_Tau[i_producing, j_producing])
+
+    return max(min(lst, last_time_point), NOT_USEFUL)
+
+
+def compute_lst_tasks(model: ConcreteModel, stn_data: dict) -> None:
+    """
+    Computes the latest start time (lst) of the production tasks without transitions, in all units executing them: a run starting after the lst only produces materials that can no longer be used.
+    Mirrors compute_est_subsequent_tasks backwards: the tasks are visited in reverse topological order (see _topological_order), so the lst of the consuming tasks is known when a producing task is visited.
+    Without recycle loops, this is a single pass. With recycle loops, the passes are repeated until the lst no longer changes.
+    Materials are useful until the planning horizon if they are final products with a price, and otherwise until their last demand in STATES_SHIPMENT or their last consumption.
+    Tasks with transitions, and the transition tasks, keep their last time point (see _get_last_time_point), as their runs cannot be removed independently of the other tasks of the unit.
+    Removing the runs starting after the lst does not decrease the profit and keeps a solution feasible, provided that the storage capacities do not force the consumption of materials.
+    Updates the stn_data dictionary with 'LST', a mapping of (j,i) -> lst value.
+    The result is reused from the preprocessing cache when the same instance was already computed (see src/utils/preprocessing_cache.py).
+    """
+
+    planning_horizon = int(max(model.S_Time))
+
+    if load_cached_results(stn_data, planning_horizon, ['LST']):
+        return
+
+    unit_task = stn_data['UNIT_TASKS']
+    states = stn_data['STATES']
+    graph = _build_task_graph(stn_data)
+    order, is_acyclic = _topological_order(graph)
+
+    useful_materials = {
+        "sold": {k: states[k]['isProd'] and states[k]['price'] > 0 for k in states},
+        "last_demand": _get_last_demand(stn_data, planning_horizon),
+    }
+    pruned_tasks = set(order) - set(model.S_I_Production_Tasks_With_Transition)
+    lst_task = {(j,i): _get_last_time_point(model, i, j, planning_horizon) for (j,i) in unit_task}
+    is_changed = True
+
+    while is_changed:
+
+        is_changed = False
+
+        for i_producing in reversed(order):
+            if i_producing not in pruned_tasks:
+                continue
+            for j_producing in graph["units"][i_producing]:
+
+                lst = _get_lst_producing_task(model, i_producing, j_producing, useful_materials, lst_task, pruned_tasks, planning_horizon)
+
+                if lst != lst_task[j_producing, i_producing]:
+                    is_changed = True
+                    lst_task[j_producing, i_producing] = lst
+
+        if is_acyclic:
+            break
+
+    stn_data['LST'] = lst_task
+    store_cached_results(stn_data, planning_horizon, ['LST'])
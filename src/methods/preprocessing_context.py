@@ -0,0 +1,37 @@
+from pyomo.environ import *
+from src.models.sets import create_main_sets_parameters
+from src.models.parameters import create_basic_parameters
+from src.models.base_model_build import load_model_sets_parameters_variables
+from src.methods.est import compute_est_subsequent_tasks
+from src.methods.lst import compute_lst_tasks, LST_FLAG
+
+
+def create_preprocessing_context(stn_data: dict, planning_horizon: int, variables: bool = True) -> dict:
+    """
+    Builds the sets, parameters (and variables) of the base model and computes the EST (and, if LST_FLAG is True, the LST) of all tasks once, so that the bound methods
+    (compute_upper_bound_x_task, compute_upper_bound_x_unit, compute_upper_bound_y_unit) and the formulation share them instead of building them again.
+    The bound methods only read the model, so the formulation adds its constraints to the same model afterwards.
+
+    Args:
+        - stn_data (dict): a dictionary with the state-task network instance data. stn_data['EST'] (and stn_data['LST']) is updated.
+        - planning_horizon (int): planning horizon.
+        - variables (bool): if False, variables are not created (e.g., for the matrix backend, see create_matrix_model).
+
+    Returns:
+        - dict: {"model": ConcreteModel with the sets, parameters and variables, "stn_data": dict, "planning_horizon": int}.
+    """
+
+    model = ConcreteModel()
+
+    if variables:
+        load_model_sets_parameters_variables(model, stn_data, planning_horizon)
+    else:
+        create_main_sets_parameters(model, stn_data, planning_horizon)
+        create_basic_parameters(model, stn_data, planning_horizon)
+
+    compute_est_subsequent_tasks(model, stn_data)
+    
+    if LST_FLAG:
+        compute_lst_tasks(model, stn_data)
+
+    return {"model": model, "stn_data": stn_data, "planning_horizon": planning_horizon}
@@ -1,12 +1,16 @@
 from pyomo.environ import *
 from numpy import floor
+import numpy as np
 from src.models.model_solve import define_solver
-from src.models.base_model_build import load_model_sets_parameters_variables
-from src.methods.est import compute_est_subsequent_tasks
+from src.methods.preprocessing_context import create_preprocessing_context
 from src.models.variables import RUNS_NEED_TO_FINISH_FLAG
+from src.utils.output_policy import is_verbose
+from src.utils.preprocessing_cache import load_cached_results, store_cached_results
 
 
 ADD_TIME_POINT = 1  # Used for computing the number of time periods
+KNAPSACK_DP_FLAG = True  # If True, the run length knapsacks are solved by dynamic programming, otherwise by the MILP in _solve_run_length_knapsack_milp
+KNAPSACK_CROSS_VALIDATION_FLAG = False  # If True, the knapsacks are solved by both methods and an exception is raised if the bounds differ
 
 
 def knapsack_constraint(model_max_production_time_points: ConcreteModel, number_time_points_for_x: int, tau_startup: int, tau_shutdown: int) -> Constraint:
@@ -38,22 +42,123 @@ def define_objective(model_max_production_time_points: ConcreteModel) -> Objecti
     return sum((run_length) * model_max_production_time_points.V_Number_Runs[run_length] for run_length in model_max_production_time_points.S_Run_Lenghts)
 
 
-def compute_upper_bound_x_task(stn_data: dict, planning_horizon: int) -> None:
+def _solve_run_length_knapsack_milp(number_time_points_for_x: int, tau_min: int, tau_max: int, tau_startup: int, tau_shutdown: int) -> tuple[float, float]:
+    """
+    Solves the run length knapsack of one task-unit pair with a MILP: maximizes the production time points of runs with length tau_min to tau_max, 
+    where each run also takes tau_startup + tau_shutdown time points, within number_time_points_for_x time points.
+    
+    Returns:
+        Tuple[float: production time points, float: number of runs]
+    """
+    
+    model_max_production_time_points = ConcreteModel()        
+    
+    model_max_production_time_points.S_Run_Lenghts = RangeSet(tau_min, tau_max)
+    model_max_production_time_points.V_Number_Runs = Var(model_max_production_time_points.S_Run_Lenghts, domain = NonNegativeIntegers)
+    model_max_production_time_points.C_Knapsack_Constraint = Constraint(rule = knapsack_constraint(model_max_production_time_points, number_time_points_for_x, tau_startup, tau_shutdown))
+    model_max_production_time_points.C_Objective = Objective(expr = define_objective(model_max_production_time_points), sense = maximize)
+    
+    solver = define_solver()
+    solver.solve(model_max_production_time_points, tee = False)
+    
+    if is_verbose():
+        model_max_production_time_points.V_Number_Runs.display() 
+    
+    production_time_points = sum(run_length * model_max_production_time_points.V_Number_Runs[run_length].value for run_length in model_max_production_time_points.S_Run_Lenghts)
+    number_runs = sum(model_max_production_time_points.V_Number_Runs[run_length].value for run_length in model_max_production_time_points.S_Run_Lenghts)
+    
+    return production_time_points, number_runs
+
+
+def _solve_run_length_knapsacks_dp(knapsacks: dict) -> tuple[dict, dict]:
+    """
+    Solves the run length knapsacks of all task-unit pairs at once by dynamic programming over the available time points, vectorized over pairs and run lengths.
+    A solution is scored as production * M - runs, with M larger than any number of runs, so the best score has the maximum production and, among the optima, the fewest runs (the MILP may return any of them).
+    
+    Args:
+        - knapsacks (dict): (j,i) -> (number_time_points_for_x, tau_min, tau_max, tau_startup, tau_shutdown).
+    
+    Returns:
+        Tuple[dict: (j,i) -> production time points, dict: (j,i) -> number of runs]
+    """
+    
+    data = np.array(list(knapsacks.values()), dtype = float)
+    capacity = np.maximum(np.floor(data[:,0]), 0).astype(np.int64)
+    tau_min, tau_max, tau_transition = data[:,1].astype(np.int64), data[:,2].astype(np.int64), (data[:,3] + data[:,4]).astype(np.int64)
+    pairs = np.arange(len(knapsacks))[:,None]
+    
+    run_lengths = np.arange(tau_min.min(), tau_max.max() + 1)
+    weight = run_lengths + tau_transition[:,None]
+    is_run_length = (tau_min[:,None] <= run_lengths) & (run_lengths <= tau_max[:,None])
+    M = capacity.max() + 1
+    
+    # score[p,c]: best score of pair p within c time points
+    score = np.zeros((len(knapsacks), capacity.max() + 1), dtype = np.int64)
+    
+    for c in range(1, capacity.max() + 1):
+        previous = c - weight
+        new_score = np.where(is_run_length & (previous >= 0), score[pairs, np.maximum(previous, 0)] + run_lengths * M - 1, -1)
+        score[:,c] = np.maximum(score[:,c-1], new_score.max(axis = 1))
+    
+    best_score = score[pairs[:,0], capacity]
+    number_runs = -best_score % M
+    production = (best_score + number_runs) // M
+    
+    return (
+        {key: float(value) for key, value in zip(knapsacks, production)},
+        {key: float(value) for key, value in zip(knapsacks, number_runs)},
+    )
+
+
+def solve_run_length_knapsacks(knapsacks: dict) -> tuple[dict, dict]:
+    """
+    Solves the run length knapsacks of all task-unit pairs, by dynamic programming if KNAPSACK_DP_FLAG is True and by one MILP per pair otherwise.
+    If KNAPSACK_CROSS_VALIDATION_FLAG is True, both methods are used and an exception is raised if the bounds differ.
+    
+    Args:
+        - knapsacks (dict): (j,i) -> (number_time_points_for_x, tau_min, tau_max, tau_startup, tau_shutdown).
+    
+    Returns:
+        Tuple[dict: (j,i) -> production time points, dict: (j,i) -> number of runs]
+    """
+    
+    if not knapsacks:
+        return {}, {}
+    
+    if KNAPSACK_DP_FLAG or KNAPSACK_CROSS_VALIDATION_FLAG:
+        production_dp, runs_dp = _solve_run_length_knapsacks_dp(knapsacks)
+    
+    if not KNAPSACK_DP_FLAG or KNAPSACK_CROSS_VALIDATION_FLAG:
+        production_milp, runs_milp = {}, {}
+        for key, knapsack in knapsacks.items():
+            production_milp[key], runs_milp[key] = _solve_run_length_knapsack_milp(*knapsack)
+    
+    if KNAPSACK_CROSS_VALIDATION_FLAG:
+        for key in knapsacks:
+            if abs(production_dp[key] - production_milp[key]) > 1e-6:
+                raise Exception(f"Run length knapsack of {key}: dynamic programming = {production_dp[key]}, MILP = {production_milp[key]}.")
+    
+    return (production_dp, runs_dp) if KNAPSACK_DP_FLAG else (production_milp, runs_milp)
+
+
+def compute_upper_bound_x_task(stn_data: dict, planning_horizon: int, context: dict = None) -> None:
     """ 
     The optimization problem defines the combination of different run lenghts that maximizes the number of production time points for each task.
-    Result is saved in stn['UPPER_BOUND_X'].
+    Result is saved in stn['UPPER_BOUND_X'], together with stn['EST']. Both are reused from the preprocessing cache when the same instance was already computed.
     
     Args:
-        - model_init_max_production_task (ConcreteModel): Pyomo model instance.
         - stn_data (dict): a dictionary containing the network data.
+        - planning_horizon (int): planning horizon.
+        - context (dict): shared sets, parameters and EST (see create_preprocessing_context). Created here if None.
     
     Returns: none.
     """
     
-    model_init_max_production_task = ConcreteModel()
+    if load_cached_results(stn_data, planning_horizon, ['EST', 'UPPER_BOUND_X_TASK']):
+        return
     
-    load_model_sets_parameters_variables(model_init_max_production_task, stn_data, planning_horizon)
-    compute_est_subsequent_tasks(model_init_max_production_task, stn_data)
+    context = context if context is not None else create_preprocessing_context(stn_data, planning_horizon, variables = False)
+    model_init_max_production_task = context["model"]
         
     est = stn_data['EST']
     num_periods = max(model_init_max_production_task.S_Time)    
@@ -62,6 +167,7 @@ def compute_upper_bound_x_task(stn_data: dict, planning_horizon: int) -> None:
     time_points_complete_runs = {}
     remaining_time_points_x = {}
     remaining_time_points = {}
+    knapsacks = {}
     
     for (i,j) in model_init_max_production_task.P_Task_Unit_Network:
         
@@ -91,7 +197,8 @@ def compute_upper_bound_x_task(stn_data: dict, planning_horizon: int) -> None:
             ):
                 tau_shutdown = model_init_max_production_task.P_Tau[ii,j]
         
-        print(f"Production task = {i}, tau_startup = {tau_startup}, tau_shutdown = {tau_shutdown}")
+        if is_verbose():
+            print(f"Production task = {i}, tau_startup = {tau_startup}, tau_shutdown = {tau_shutdown}")
         
         #############################################################################################################
         # UB ON X FOR TASKS WITHOUT TRANSITION                                                                      #
@@ -100,23 +207,9 @@ def compute_upper_bound_x_task(stn_data: dict, planning_horizon: int) -> None:
         if (
             RUNS_NEED_TO_FINISH_FLAG == True
         ):
-        
-            model_max_production_time_points = ConcreteModel()        
             
-            model_max_production_time_points.S_Run_Lenghts = RangeSet(tau_min, tau_max)
-            model_max_production_time_points.V_Number_Runs = Var(model_max_production_time_points.S_Run_Lenghts, domain = NonNegativeIntegers)
-            model_max_production_time_points.C_Knapsack_Constraint = Constraint(rule = knapsack_constraint(model_max_production_time_points, number_time_points_for_x, tau_startup, tau_shutdown))
-            model_max_production_time_points.C_Objective = Objective(expr = define_objective(model_max_production_time_points), sense = maximize)
-            
-            solver = define_solver()
-            solver.solve(model_max_production_time_points, tee = False)
-            
-            upper_bound_x_task[j,i] = sum(run_length * model_max_production_time_points.V_Number_Runs[run_length].value for run_length in model_max_production_time_points.S_Run_Lenghts)
-            number_runs[j,i] = sum(model_max_production_time_points.V_Number_Runs[run_length].value for run_length in model_max_production_time_points.S_Run_Lenghts)
-            remaining_time_points[j,i] = number_time_points_for_x - upper_bound_x_task[j,i] - (tau_startup + tau_shutdown) * number_runs[j,i]
-            
-            print(f'Unit: {j}, Task: {i}, Available Time Points = {number_time_points_for_x}, Time Points for X = {upper_bound_x_task[j,i]}, Number of Complete Runs = {number_runs[j,i]}, Remaining Time Points = {remaining_time_points[j,i]}')
-            model_max_production_time_points.V_Number_Runs.display() 
+            # The knapsacks of all pairs are solved together after the loop
+            knapsacks[j,i] = (number_time_points_for_x, tau_min, tau_max, tau_startup, tau_shutdown)
             
         elif (
             RUNS_NEED_TO_FINISH_FLAG == False
@@ -126,6 +219,17 @@ def compute_upper_bound_x_task(stn_data: dict, planning_horizon: int) -> None:
             remaining_time_points_x[j,i] = number_time_points_for_x - time_points_complete_runs[j,i]
             upper_bound_x_task[j,i] = tau_max * number_runs[j,i] + max(remaining_time_points_x[j,i] - tau_startup, 0) 
             remaining_time_points[j,i] = number_time_points_for_x - time_points_complete_runs[j,i] - remaining_time_points_x[j,i]
-            print(f'Unit: {j}, Task: {i}, Available Time Points = {number_time_points_for_x}, Time Points for X = {upper_bound_x_task[j,i]}, Number of Complete Runs = {number_runs[j,i]}, Remaining Time Points = {remaining_time_points[j,i]}')
+            if is_verbose():
+                print(f'Unit: {j}, Task: {i}, Available Time Points = {number_time_points_for_x}, Time Points for X = {upper_bound_x_task[j,i]}, Number of Complete Runs = {number_runs[j,i]}, Remaining Time Points = {remaining_time_points[j,i]}')
+    
+    if knapsacks:
+        
+        upper_bound_x_task, number_runs = solve_run_length_knapsacks(knapsacks)
+        
+        for (j,i), (number_time_points_for_x, tau_min, tau_max, tau_startup, tau_shutdown) in knapsacks.items():
+            remaining_time_points[j,i] = number_time_points_for_x - upper_bound_x_task[j,i] - (tau_startup + tau_shutdown) * number_runs[j,i]
+            if is_verbose():
+                print(f'Unit: {j}, Task: {i}, Available Time Points = {number_time_points_for_x}, Time Points for X = {upper_bound_x_task[j,i]}, Number of Complete Runs = {number_runs[j,i]}, Remaining Time Points = {remaining_time_points[j,i]}')
                 
-    stn_data['UPPER_BOUND_X_TASK'] = upper_bound_x_task
\ No newline at end of file
+    stn_data['UPPER_BOUND_X_TASK'] = upper_bound_x_task
+    store_cached_results(stn_data, planning_horizon, ['UPPER_BOUND_X_TASK'])
\ No newline at end of file
@@ -1,72 +1,189 @@
 from pyomo.environ import *
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from src.models.constraints_est import load_constraint_set_to_zero_x_est, load_constraint_set_to_zero_ys_est
 from src.models.parameters import create_parameters_tightening_constraints
 from src.visualization.plot_results import plot_gantt_chart
-from src.models.model_solve import solve_model, define_solver
+from src.models.model_solve import solve_model, define_solver, set_solver_backend, SOLVER_SETTINGS
+from src.models.variables import RUNS_NEED_TO_FINISH_FLAG
 from src.models.base_model_build import load_model_sets_parameters_variables, load_basic_model_constraints_objective
-from src.methods.est import compute_est_subsequent_tasks
+from src.methods.preprocessing_context import create_preprocessing_context
+from src.methods.upper_bound_x_task_opt import solve_run_length_knapsacks
+from src.utils.output_policy import is_verbose
+from src.utils.preprocessing_cache import load_cached_results, store_cached_results
 
-def compute_upper_bound_x_unit(stn_data: dict, planning_horizon: int) -> None:
+
+UNIT_BOUND_WORKERS = 1  # Number of processes solving the per-unit MILPs in parallel (1: one after the other in this process)
+UNIT_BOUND_DP_FLAG = True  # If True (and RUNS_NEED_TO_FINISH_FLAG is True), units with a single production task and no transitions are bounded by dynamic programming instead of a MILP
+
+
+def _unit_stn_data(stn_data: dict, unit: str) -> dict:
+    """
+    Restricts the network data to the tasks of one unit, which is the subproblem of the unit bounds once material constraints are dropped.
+    All states are kept, so the material sets are the same as in the full network.
+    """
+
+    unit_tasks = {(j,i): data for (j,i), data in stn_data['UNIT_TASKS'].items() if j == unit}
+    tasks = {i for (j,i) in unit_tasks}
+
+    return {
+        'STATES': stn_data['STATES'],
+        'STATES_SHIPMENT': stn_data['STATES_SHIPMENT'],
+        'ST_ARCS': {(k,i): data for (k,i), data in stn_data['ST_ARCS'].items() if i in tasks},
+        'TS_ARCS': {(i,k): data for (i,k), data in stn_data['TS_ARCS'].items() if i in tasks},
+        'TASKS_TRANSITION_TASKS': {(i,ii): data for (i,ii), data in stn_data['TASKS_TRANSITION_TASKS'].items() if i in tasks and ii in tasks},
+        'UNIT_TASKS': unit_tasks,
+        'EST': {(j,i): est for (j,i), est in stn_data['EST'].items() if j == unit},
+    }
+
+
+def _unit_knapsack(stn_data: dict, unit: str, planning_horizon: int, model_type: str) -> tuple:
+    """
+    Defines the run length knapsack (see solve_run_length_knapsacks) equivalent to the bound subproblem of a unit with a single production task, no transitions and tau = 1.
+    Runs are separated by one idle time point and the last time point is reserved for the end of the last run, so each run of length r takes r + 1 of the planning_horizon + 1 - est time points.
+    The maximum number of startups is the maximum production when all runs have length tau_min.
+    The knapsack assumes that runs finish inside the planning horizon, so it is only used if RUNS_NEED_TO_FINISH_FLAG is True (otherwise the MILP of the unit is solved, as in compute_upper_bound_x_task).
+
+    Returns:
+        - tuple: (number_time_points_for_x, tau_min, tau_max, tau_startup, tau_shutdown), or None if the unit is not of this kind.
+    """
+
+    tasks = [(i, data) for (j,i), data in stn_data['UNIT_TASKS'].items() if j == unit]
+    is_transition = any(i in pair for i, _ in tasks for pair in stn_data['TASKS_TRANSITION_TASKS'])
+
+    if len(tasks) != 1 or is_transition or tasks[0][1]['tau'] != 1:
+        return None
+
+    i, data = tasks[0]
+    number_time_points = planning_horizon + 1 - stn_data['EST'][unit,i]
+
+    if model_type == 'bound_production_operations_x_unit':
+        return (number_time_points, data['tau_min'], data['tau_max'], 0, 1)
+
+    return (number_time_points, data['tau_min'], data['tau_min'], 0, 1)
+
+
+def _solve_unit_bound_milp(unit_stn_data: dict, planning_horizon: int, model_type: str) -> float:
+    """
+    Solves the bound subproblem of one unit with the basic formulation restricted to its tasks (see _unit_stn_data).
+
+    Returns:
+        - float: production time points (bound_production_operations_x_unit) or startups (bound_startups_ys_unit) of the production tasks of the unit.
+    """
+
+    model = ConcreteModel()
+
+    load_model_sets_parameters_variables(model, unit_stn_data, planning_horizon)
+    load_basic_model_constraints_objective(model, unit_stn_data, planning_horizon, model_type)
+    create_parameters_tightening_constraints(model, unit_stn_data, "")
+    load_constraint_set_to_zero_x_est(model)
+    load_constraint_set_to_zero_ys_est(model)
+
+    solver = define_solver()
+    solve_model(solver, model)
+
+    variable = model.V_X if model_type == 'bound_production_operations_x_unit' else model.V_Y_Start
+
+    return sum(variable[i,j,n].value for i in model.S_I_Production_Tasks for j in model.S_Units for n in model.S_Time if (i,j) in model.P_Task_Unit_Network)
+
+
+def compute_unit_bounds(stn_data: dict, planning_horizon: int, model_type: str) -> dict:
+    """
+    Computes the bounds of all units. Without material constraints, the bound model decomposes into one independent subproblem per unit:
+    units with a single production task and no transitions are solved together by dynamic programming (if UNIT_BOUND_DP_FLAG and RUNS_NEED_TO_FINISH_FLAG are True), and each other unit by its own MILP,
+    in UNIT_BOUND_WORKERS processes.
+
+    Args:
+        - stn_data (dict): a dictionary with the state-task network instance data, including 'EST'.
+        - planning_horizon (int): planning horizon.
+        - model_type (str): 'bound_production_operations_x_unit' or 'bound_startups_ys_unit'.
+
+    Returns:
+        - dict: unit -> bound.
+    """
+
+    units = list(dict.fromkeys(j for (j,i) in stn_data['UNIT_TASKS']))
+    knapsacks = {}
+    subproblems = []
+
+    for j in units:
+        knapsack = _unit_knapsack(stn_data, j, planning_horizon, model_type) if UNIT_BOUND_DP_FLAG and RUNS_NEED_TO_FINISH_FLAG else None
+        if knapsack is not None:
+            knapsacks[j] = knapsack
+        else:
+            subproblems.append(j)
+
+    production, number_runs = solve_run_length_knapsacks(knapsacks)
+    bounds = production if model_type == 'bound_production_operations_x_unit' else number_runs
+
+    unit_stn_data = [_unit_stn_data(stn_data, j) for j in subproblems]
+
+    if UNIT_BOUND_WORKERS > 1 and len(subproblems) > 1:
+        with ProcessPoolExecutor(max_workers = min(UNIT_BOUND_WORKERS, len(subproblems)), initializer = set_solver_backend, initargs = (SOLVER_SETTINGS["backend"],)) as executor:
+            bounds.update(zip(subproblems, executor.map(_solve_unit_bound_milp, unit_stn_data, repeat(planning_horizon), repeat(model_type))))
+    else:
+        bounds.update(zip(subproblems, map(_solve_unit_bound_milp, unit_stn_data, repeat(planning_horizon), repeat(model_type))))
+
+    return {j: bounds[j] for j in units}
+
+
+def compute_upper_bound_x_unit(stn_data: dict, planning_horizon: int, context: dict = None) -> None:
     """
     From the basic formulation, creates a model considering only constraints for tasks and units, and without material constraints. Here, the objective is to maximize production operations.
-    
+    The model is solved as one subproblem per unit (see compute_unit_bounds).
+    The bounds (and stn_data['EST']) are reused from the preprocessing cache when the same instance was already computed.
+
     Args:
         - stn_data (dict): a dictionary with the state-task network instance data.
         - planning_horizon (int): planning horizon.
+        - context (dict): shared sets, parameters and EST (see create_preprocessing_context). Created here if None.
 
     Returns:
         - upper_bound_x_unit (dict): a dictionary with upper bounds on X for each unit.
     """
-    
-    model_init_max_production_unit = ConcreteModel()
-    
-    load_model_sets_parameters_variables(model_init_max_production_unit, stn_data, planning_horizon)
-    compute_est_subsequent_tasks(model_init_max_production_unit, stn_data)   
-    load_basic_model_constraints_objective(model_init_max_production_unit, stn_data, planning_horizon, 'bound_production_operations_x_unit')    
-    create_parameters_tightening_constraints(model_init_max_production_unit, stn_data, "")
-    load_constraint_set_to_zero_x_est(model_init_max_production_unit)
-    load_constraint_set_to_zero_ys_est(model_init_max_production_unit)
-    
-    solver = define_solver()
-    solve_model(solver, model_init_max_production_unit)
-    upper_bound_x_unit = {}
-    
-    for j in model_init_max_production_unit.S_Units:
-        upper_bound_x_unit[j] = sum(model_init_max_production_unit.V_X[i,j,n].value for i in model_init_max_production_unit.S_I_Production_Tasks for n in model_init_max_production_unit.S_Time if (i,j) in model_init_max_production_unit.P_Task_Unit_Network)
-        print(f'Unit: {j}, Used Time Points = {upper_bound_x_unit[j]}')
-    
-    stn_data['UPPER_BOUND_X_UNIT'] = upper_bound_x_unit    
-    #plot_gantt_chart(planning_horizon, model_init_max_production_unit, "X")
-
-
-def compute_upper_bound_y_unit(stn_data: dict, planning_horizon: int) -> None:
+
+    if load_cached_results(stn_data, planning_horizon, ['EST', 'UPPER_BOUND_X_UNIT']):
+        return
+
+    context = context if context is not None else create_preprocessing_context(stn_data, planning_horizon, variables = False)
+
+    upper_bound_x_unit = compute_unit_bounds(stn_data, planning_horizon, 'bound_production_operations_x_unit')
+
+    if is_verbose():
+        for j in upper_bound_x_unit:
+            print(f'Unit: {j}, Used Time Points = {upper_bound_x_unit[j]}')
+
+    stn_data['UPPER_BOUND_X_UNIT'] = upper_bound_x_unit
+    store_cached_results(stn_data, planning_horizon, ['UPPER_BOUND_X_UNIT'])
+    #plot_gantt_chart(planning_horizon, context["model"], "X")
+
+
+def compute_upper_bound_y_unit(stn_data: dict, planning_horizon: int, context: dict = None) -> None:
     """
     From the basic formulation, creates a model considering only constraints for tasks and units, and without material constraints. Here, the objective is to maximize startups.
-    
+    The model is solved as one subproblem per unit (see compute_unit_bounds).
+    The bounds (and stn_data['EST']) are reused from the preprocessing cache when the same instance was already computed.
+
     Args:
         - stn_data (dict): a dictionary with the state-task network instance data.
         - planning_horizon (int): planning horizon.
+        - context (dict): shared sets, parameters and EST (see create_preprocessing_context). Created here if None.
 
     Returns:
         - upper_bound_y_unit (dict): a dictionary with upper bounds on Y_Start for each unit.
     """
-    
-    model_init_max_startups_unit = ConcreteModel()
-        
-    load_model_sets_parameters_variables(model_init_max_startups_unit, stn_data, planning_horizon)
-    compute_est_subsequent_tasks(model_init_max_startups_unit, stn_data)
-    load_basic_model_constraints_objective(model_init_max_startups_unit, stn_data, planning_horizon, 'bound_startups_ys_unit')    
-    create_parameters_tightening_constraints(model_init_max_startups_unit, stn_data, "")
-    load_constraint_set_to_zero_x_est(model_init_max_startups_unit)
-    load_constraint_set_to_zero_ys_est(model_init_max_startups_unit)    
-    
-    solver = define_solver()
-    solve_model(solver, model_init_max_startups_unit)
-    upper_bound_y_unit = {}
-    
-    for j in model_init_max_startups_unit.S_Units:
-        upper_bound_y_unit[j] = sum(model_init_max_startups_unit.V_Y_Start[i,j,n].value for i in model_init_max_startups_unit.S_I_Production_Tasks for n in model_init_max_startups_unit.S_Time if (i,j) in model_init_max_startups_unit.P_Task_Unit_Network)
-        print(f'Unit: {j}, Number of Startups = {upper_bound_y_unit[j]}')
-    
-    stn_data['UPPER_BOUND_Y_UNIT'] = upper_bound_y_unit           
-    #plot_gantt_chart(planning_horizon, model_init_max_startups_unit, "Y")  
\ No newline at end of file
+
+    if load_cached_results(stn_data, planning_horizon, ['EST', 'UPPER_BOUND_Y_UNIT']):
+        return
+
+    context = context if context is not None else create_preprocessing_context(stn_data, planning_horizon, variables = False)
+
+    upper_bound_y_unit = compute_unit_bounds(stn_data, planning_horizon, 'bound_startups_ys_unit')
+
+    if is_verbose():
+        for j in upper_bound_y_unit:
+            print(f'Unit: {j}, Number of Startups = {upper_bound_y_unit[j]}')
+
+    stn_data['UPPER_BOUND_Y_UNIT'] = upper_bound_y_unit
+    store_cached_results(stn_data, planning_horizon, ['UPPER_BOUND_Y_UNIT'])
+    #plot_gantt_chart(planning_horizon, context["model"], "Y")
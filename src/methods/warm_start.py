@@ -0,0 +1,367 @@
+from pyomo.environ import *
+import numpy as np
+from src.methods.est import _build_task_graph, _topological_order
+from src.utils.output_policy import is_verbose
+
+
+# If True, the MILP solves start from the schedule of the greedy heuristic (see load_warm_start), for the solver backends that accept a MIP start
+WARM_START_FLAG = False
+
+FEASIBILITY_TOLERANCE = 1e-6  # Tolerance on the constraints when the heuristic schedule is checked
+
+
+def _get_inventory(model: ConcreteModel) -> dict:
+    """
+    Returns the inventory profile of the materials with a mass balance (all except raw materials) when no task runs: the initial inventory minus the cumulative demand.
+    """
+
+    time_points = list(model.S_Time)
+
+    return {k: model.P_Init_Inventory_Material[k] - np.cumsum([model.P_Material_Demand[k,n] for n in time_points], dtype = float)
+            for k in model.S_Materials if k not in model.S_Raw_Materials}
+
+
+def _get_start_window(model: ConcreteModel, i: Any, j: Any, planning_horizon: int) -> tuple[int, int]:
+    """
+    Returns the first and the last time point where a run of task i in unit j can start: its est and lst, if the formulation has them.
+    """
+
+    first_start = model.P_EST_Task[i,j] if hasattr(model, 'P_EST_Task') else 0
+    last_start = model.P_LST_Task[i,j] if hasattr(model, 'P_LST_Task') else planning_horizon
+
+    return int(first_start), int(last_start)
+
+
+def _get_max_batch(model: ConcreteModel, inventory: dict, i: Any, j: Any, n: int, planning_horizon: int) -> float:
+    """
+    Returns the largest batch of task i in unit j at time point n that keeps the inventory of its inputs non-negative and the inventory of its outputs within the storage limits in all subsequent time points.
+    """
+
+    batch = model.P_Beta_Max[i,j]
+
+    for k in model.S_K_Consumed_I[i]:
+        if k in inventory:
+            batch = min(batch, inventory[k][n:].min() / -model.P_Rho_Minus[i,k])
+
+    if n + model.P_Tau[i,j] <= planning_horizon:
+        for k in model.S_K_Produced_I[i]:
+            if k in inventory:
+                batch = min(batch, (model.P_Chi[k] - inventory[k][n + model.P_Tau[i,j]:].max()) / model.P_Rho_Plus[i,k])
+
+    return batch
+
+
+def _add_batch(model: ConcreteModel, inventory: dict, i: Any, j: Any, n: int, batch: float, planning_horizon: int) -> None:
+    """
+    Updates the inventory profiles with the consumption of a batch of task i in unit j at time point n and its production tau time points later (a negative batch removes it).
+    """
+
+    for k in model.S_K_Consumed_I[i]:
+        if k in inventory:
+            inventory[k][n:] += model.P_Rho_Minus[i,k] * batch
+
+    if n + model.P_Tau[i,j] <= planning_horizon:
+        for k in model.S_K_Produced_I[i]:
+            if k in inventory:
+                inventory[k][n + model.P_Tau[i,j]:] += model.P_Rho_Plus[i,k] * batch
+
+
+def _is_unit_free(busy: np.ndarray, n: int) -> bool:
+    """
+    Checks if a run can be executed at time point n in a unit: the unit is idle at n and at n+1, so that the end of the run at n+1 does not coincide with the start of another run.
+    """
+
+    return not busy[n] and not busy[n+1]
+
+
+def _dispatch_runs(model: ConcreteModel, inventory: dict, busy: np.ndarray, i: Any, j: Any, planning_horizon: int) -> list:
+    """
+    Dispatches runs of task i in unit j from its est: each run is extended up to tau_max with the largest feasible batches (see _get_max_batch), and kept if it lasts at least tau_min.
+    Runs are separated by at least one idle time point, so that the end of a run never coincides with a start in the unit.
+
+    Returns:
+        - list: runs as (start time point, [batch of each time point of the run]).
+    """
+
+    first_start, last_start = _get_start_window(model, i, j, planning_horizon)
+    last_time_point = planning_horizon - model.P_Tau[i,j]
+    runs = []
+    n = first_start
+
+    while n <= min(last_start, last_time_point - model.P_Tau_Min[i,j] + 1):
+
+        if n >= 1 and busy[n-1]:
+            n += 1
+            continue
+
+        batches = []
+        while len(batches) < model.P_Tau_Max[i,j] and n + len(batches) <= last_time_point and _is_unit_free(busy, n + len(batches)):
+            batch = _get_max_batch(model, inventory, i, j, n + len(batches), planning_horizon)
+            if batch < model.P_Beta_Min[i,j] - FEASIBILITY_TOLERANCE:
+                break
+            batch = max(batch, model.P_Beta_Min[i,j])
+            _add_batch(model, inventory, i, j, n + len(batches), batch, planning_horizon)
+            batches.append(batch)
+
+        if len(batches) >= model.P_Tau_Min[i,j]:
+            busy[n:n + len(batches)] = True
+            runs.append((n, batches))
+            n += len(batches) + 1
+        else:
+            for t, batch in enumerate(batches):
+                _add_batch(model, inventory, i, j, n + t, -batch, planning_horizon)
+            n += 1
+
+    return runs
+
+
+def _get_margin(model: ConcreteModel, stn_data: dict, i: Any, j: Any) -> float:
+    """
+    Returns the profit of one unit of batch of task i in unit j in the objective: the price of the final products it produces minus its variable cost.
+    """
+
+    price = sum(stn_data['STATES'][k]['price'] for k in model.S_K_Produced_I[i] if k in model.S_Final_Products)
+
+    return price - stn_data['UNIT_TASKS'][j,i]['vCost']
+
+
+def _is_inventory_feasible(inventory: dict) -> bool:
+    """
+    Checks that no inventory profile is negative.
+    """
+
+    return all(profile.min() >= -FEASIBILITY_TOLERANCE for profile in inventory.values())
+
+
+def _try_remove_batches(model: ConcreteModel, inventory: dict, i: Any, j: Any, batches: list, planning_horizon: int) -> bool:
+    """
+    Removes the batches [(time point, batch)] of task i in unit j from the inventory profiles if they stay feasible without them, and restores them otherwise.
+    """
+
+    for n, batch in batches:
+        _add_batch(model, inventory, i, j, n, -batch, planning_horizon)
+
+    if _is_inventory_feasible(inventory):
+        return True
+
+    for n, batch in batches:
+        _add_batch(model, inventory, i, j, n, batch, planning_horizon)
+
+    return False
+
+
+def _get_run_profit(model: ConcreteModel, stn_data: dict, i: Any, j: Any, batches: list) -> float:
+    """
+    Returns the contribution of a run of task i in unit j to the objective: revenue minus fixed, variable and startup costs.
+    """
+
+    return _get_margin(model, stn_data, i, j) * sum(batches) - stn_data['UNIT_TASKS'][j,i]['Cost'] * len(batches) - model.P_StartUp_Cost[j,i]
+
+
+def _prune_runs(model: ConcreteModel, stn_data: dict, inventory: dict, schedule: dict, order: list, planning_horizon: int) -> None:
+    """
+    Improves the dispatched schedule in reverse topological order, so that the consuming tasks are pruned before the tasks producing their inputs.
+    Each change is only kept if the inventories stay feasible:
+        - runs with a negative profit are removed.
+        - time points at the end and at the start of a run are removed while they do not pay their fixed and variable costs and the run lasts more than tau_min.
+        - the batches of tasks without margin are reduced to what the subsequent time points need, and at least to Bmin.
+    """
+
+    for i in reversed(order):
+        for j in model.S_J_Executing_I[i]:
+
+            if (i,j) not in schedule:
+                continue
+
+            margin = _get_margin(model, stn_data, i, j)
+            cost = stn_data['UNIT_TASKS'][j,i]['Cost']
+            _, last_start = _get_start_window(model, i, j, planning_horizon)
+            runs = []
+
+            for n, batches in reversed(schedule[i,j]):
+
+                if (_get_run_profit(model, stn_data, i, j, batches) < 0 and 
+                    _try_remove_batches(model, inventory, i, j, [(n + t, batch) for t, batch in enumerate(batches)], planning_horizon)):
+                    continue
+
+                while (len(batches) > model.P_Tau_Min[i,j] and margin * batches[-1] < cost and
+                       _try_remove_batches(model, inventory, i, j, [(n + len(batches) - 1, batches[-1])], planning_horizon)):
+                    batches = batches[:-1]
+
+                while (len(batches) > model.P_Tau_Min[i,j] and n < last_start and margin * batches[0] < cost and
+                       _try_remove_batches(model, inventory, i, j, [(n, batches[0])], planning_horizon)):
+                    n, batches = n + 1, batches[1:]
+
+                if margin <= 0:
+                    for t, batch in enumerate(batches):
+                        _add_batch(model, inventory, i, j, n + t, -batch, planning_horizon)
+                        needed = [-inventory[k][n + t + model.P_Tau[i,j]:].min() / model.P_Rho_Plus[i,k]
+                                  for k in model.S_K_Produced_I[i] if k in inventory and n + t + model.P_Tau[i,j] <= planning_horizon]
+                        batches[t] = min(batch, max([model.P_Beta_Min[i,j]] + needed))
+                        _add_batch(model, inventory, i, j, n + t, batches[t], planning_horizon)
+
+                runs.insert(0, (n, batches))
+
+            schedule[i,j] = runs
+
+
+def _get_dispatch_orders(model: ConcreteModel, graph: dict) -> list:
+    """
+    Returns the orders in which the production tasks are dispatched: the topological order (see _topological_order) and, stage by stage, the tasks with the smallest
+    minimum run (Bmin times tau_min) first, so that tasks sharing an input or a unit with a larger task are not starved by it.
+    """
+
+    order, _ = _topological_order(graph)
+    stage = {}
+
+    for i in order:
+        stage[i] = 1 + max((stage[ii] for ii in graph["predecessors"][i] if ii in stage), default = 0)
+
+    min_run = {i: min(model.P_Beta_Min[i,j] * model.P_Tau_Min[i,j] for j in model.S_J_Executing_I[i]) for i in order}
+
+    return [order, sorted(order, key = lambda i: (stage[i], min_run[i]))]
+
+
+def _dispatch_schedule(model: ConcreteModel, stn_data: dict, order: list, planning_horizon: int) -> tuple[dict, dict, float]:
+    """
+    Dispatches the runs of the production tasks in the given order (see _dispatch_runs) and prunes them (see _prune_runs).
+    The runs of the consuming tasks free storage for the tasks producing their inputs, so the passes are repeated until no run is added.
+
+    Returns:
+        Tuple[dict: runs of each task-unit pair, dict: inventory profile of each material, float: profit of the schedule]
+    """
+
+    inventory = _get_inventory(model)
+    busy = {j: np.zeros(planning_horizon + 2, dtype = bool) for j in model.S_Units}
+    pairs = [(i,j) for i in order for j in model.S_J_Executing_I[i] if j in model.S_J_Units_Without_Transition_Tasks]
+    schedule = {(i,j): [] for (i,j) in pairs}
+    is_dispatching = True
+
+    while is_dispatching:
+        is_dispatching = False
+        for (i,j) in pairs:
+            runs = _dispatch_runs(model, inventory, busy[j], i, j, planning_horizon)
+            if runs:
+                schedule[i,j] = sorted(schedule[i,j] + runs)
+                is_dispatching = True
+
+    _prune_runs(model, stn_data, inventory, schedule, order, planning_horizon)
+
+    profit = sum(_get_run_profit(model, stn_data, i, j, batches) for (i,j), runs in schedule.items() for _, batches in runs)
+
+    return schedule, inventory, profit
+
+
+def compute_greedy_schedule(model: ConcreteModel, stn_data: dict) -> tuple[dict, dict]:
+    """
+    Constructs a feasible schedule with a greedy stage-by-stage dispatch: the production tasks are visited in topological order, so the inputs of a task are produced before
+    it is dispatched, and runs of maximum length and batch are dispatched in each of its units (see _dispatch_runs) from its est to its lst (if the model has them).
+    The passes are repeated while they add runs in the time points left idle, and runs are then pruned to improve the profit (see _prune_runs).
+    The schedule with the largest profit over the dispatch orders (see _get_dispatch_orders) is kept. If its profit is negative, and the demands allow it, all units stay idle instead.
+    Units with transitions stay idle, as their runs would need startups, shutdowns and direct transitions.
+
+    Args:
+        - model (ConcreteModel): a Pyomo model instance with sets and parameters (and, for F2-F12, the est of the tasks).
+        - stn_data (dict): a dictionary with the state-task network instance data.
+
+    Returns:
+        Tuple[
+            dict: runs of each task-unit pair, {(i,j): [(start time point, [batch of each time point of the run])]},
+            dict: inventory profile of each material, {k: np.ndarray}
+        ]
+    """
+
+    planning_horizon = max(model.S_Time)
+    best_schedule, best_inventory, best_profit = {}, _get_inventory(model), 0
+
+    if not _is_inventory_feasible(best_inventory):
+        best_profit = -float('inf')
+
+    for order in _get_dispatch_orders(model, _build_task_graph(stn_data)):
+        schedule, inventory, profit = _dispatch_schedule(model, stn_data, order, planning_horizon)
+        if profit > best_profit:
+            best_schedule, best_inventory, best_profit = schedule, inventory, profit
+
+    return best_schedule, best_inventory
+
+
+def _set_start_value(vardata: Any, value: float) -> bool:
+    """
+    Sets the value of a variable, unless it is fixed (e.g., by init_variables or EST_VARIABLE_ELIMINATION_FLAG) to another value.
+    """
+
+    if vardata.fixed:
+        return abs(vardata.value - value) <= FEASIBILITY_TOLERANCE
+
+    vardata.set_value(value, skip_validation = True)
+
+    return True
+
+
+def _get_violated_constraints(model: ConcreteModel) -> list:
+    """
+    Returns the names of the active constraints that the current values of the variables violate.
+    """
+
+    violated = []
+
+    for constraint in model.component_data_objects(Constraint, active = True):
+        body = value(constraint.body, exception = False)
+        if (body is None
+            or (constraint.has_lb() and body < value(constraint.lower) - FEASIBILITY_TOLERANCE)
+            or (constraint.has_ub() and body > value(constraint.upper) + FEASIBILITY_TOLERANCE)):
+            violated.append(constraint.name)
+
+    return violated
+
+
+def load_warm_start(model: ConcreteModel, stn_data: dict) -> float:
+    """
+    Loads the schedule of the greedy heuristic (see compute_greedy_schedule) as the values of V_X, V_Y_Start, V_Y_End, V_B, V_S and V_X_Hat_Idle, to be used as a MIP start.
+    The schedule is checked against all active constraints of the model (e.g., the est and upper bound constraints of F2-F12), and it is not used if one of them is violated.
+
+    Args:
+        - model (ConcreteModel): a Pyomo model instance of any formulation.
+        - stn_data (dict): a dictionary with the state-task network instance data.
+
+    Returns:
+        - float: profit of the schedule, or None if the schedule is not feasible for the model.
+    """
+
+    schedule, inventory = compute_greedy_schedule(model, stn_data)
+    planning_horizon = max(model.S_Time)
+    is_loaded = True
+
+    for (i,j,n) in model.S_Task_Unit_Time:
+        for variable in (model.V_X, model.V_Y_Start, model.V_Y_End, model.V_B):
+            is_loaded &= _set_start_value(variable[i,j,n], 0)
+
+    for (i,j), runs in schedule.items():
+        for n, batches in runs:
+            is_loaded &= _set_start_value(model.V_Y_Start[i,j,n], 1)
+            is_loaded &= _set_start_value(model.V_Y_End[i,j,n + len(batches)], 1)
+            for t, batch in enumerate(batches):
+                is_loaded &= _set_start_value(model.V_X[i,j,n + t], 1)
+                is_loaded &= _set_start_value(model.V_B[i,j,n + t], batch)
+
+    for k in model.S_Materials:
+        for n in model.S_Time:
+            is_loaded &= _set_start_value(model.V_S[k,n], max(inventory[k][n], 0) if k in inventory else 0)
+
+    for j in model.S_Units:
+        for n in model.S_Time:
+            is_loaded &= _set_start_value(model.V_X_Hat_Idle[j,n], 0 if j in model.S_J_Units_Without_Transition_Tasks else 1)
+
+    violated = _get_violated_constraints(model) if is_loaded else ["fixed variables"]
+
+    if violated:
+        if is_verbose():
+            print(f"The heuristic schedule is not used as a MIP start: it violates {violated[:5]}.")
+        return None
+
+    profit = value(model.C_Objective)
+
+    if is_verbose():
+        print(f"Heuristic schedule: {sum(len(runs) for runs in schedule.values())} runs, profit {profit:.2f}, planning horizon {planning_horizon}.")
+
+    return profit
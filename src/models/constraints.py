@@ -49,6 +49,7 @@ def unit_capacity_ub_eq2(model: ConcreteModel, task, unit, time_point) -> Constr
 def material_mass_balance_eq3(model, k, n):
     """ 
     Mass balance of material k (except raw material which are considered to be always available). Consider the initial inventory, the inventory in the previou time point, what is consumed, what is produced by production tasks and what is produced by transition tasks.        
+    The (i,j,tau) producer and consumer sets of material k are precomputed, so each row only visits the terms that appear in it.
     
     Input: set of material and time points.
     
@@ -63,21 +64,15 @@ def material_mass_balance_eq3(model, k, n):
                                     if n == 0 else 0)
                                 
                                 + sum(model.P_Rho_Minus[i,k]*model.V_B[i,j,n] 
-                                    for i in model.S_I_Consuming_K[k] 
-                                    for j in model.S_J_Executing_I[i])    
+                                    for (i,j,tau) in model.S_IJ_Consuming_K[k])    
                                                                                         
-                                + sum(model.P_Rho_Plus[i,k]*model.V_B[i,j,n-model.P_Tau[i,j]]
-                                    if n >= model.P_Tau[i,j] else 0 
-                                    for i in model.S_I_Producing_K[k] 
-                                    for j in model.S_J_Executing_I[i] 
-                                    if i in model.S_I_Production_Tasks)
+                                + sum(model.P_Rho_Plus[i,k]*model.V_B[i,j,n-tau]
+                                    for (i,j,tau) in model.S_IJ_Production_Producing_K[k] 
+                                    if n >= tau)
                                 
                                 + sum(model.P_Rho_Plus[i,k]*model.V_B[i,j,t] 
-                                    for t in model.S_Time 
-                                    for i in model.S_I_Producing_K[k] 
-                                    for j in model.S_J_Executing_I[i] 
-                                    if i in model.S_I_All_Transition_Tasks
-                                    if (t >= n - model.P_Tau[i,j] and t <= n - 1))
+                                    for (i,j,tau) in model.S_IJ_Transition_Producing_K[k] 
+                                    for t in range(max(n - tau, 0), n))
                                 
                                 - model.P_Material_Demand[k,n])
     else:
@@ -113,14 +108,14 @@ def track_indirect_transitions_unit_eq12(model, i, j, n):
                     + (model.V_X[i,j,n-1] if n >= 1 else 0)                                         
                     + sum(
                         model.V_X[ii,j,n-model.P_Tau[ii,j]] 
-                        for ii in model.S_I_Startup_Tasks
+                        for ii in model.S_I_In_J[j] if ii in model.S_I_Startup_Tasks
                         if (j,i,ii) in model.P_Task_Transitions_Unit 
                         if model.P_Task_Transitions_Unit[j,i,ii] == 1
                         if n - model.P_Tau[ii,j] >= 0) 
                     - model.V_X[i,j,n]                                
                     - sum(
                         model.V_X[ii,j,n] 
-                        for ii in model.S_I_Shutdown_Tasks
+                        for ii in model.S_I_In_J[j] if ii in model.S_I_Shutdown_Tasks
                         if (j,i,ii) in model.P_Task_Transitions_Unit 
                         if model.P_Task_Transitions_Unit[j,i,ii] == -1))                                          
     else:
@@ -145,15 +140,15 @@ def track_idle_unit_eq13(model, j, n):
                                       + (model.P_Unit_Initialization[j] if n == 0 else 0)  
                                       + sum(
                                           model.V_X[ii,j,n-model.P_Tau[ii,j]] 
-                                          for i in model.S_I_Production_Tasks_With_Indirect_Transition
-                                          for ii in model.S_I_Shutdown_Tasks
+                                          for i in model.S_I_In_J[j] if i in model.S_I_Production_Tasks_With_Indirect_Transition
+                                          for ii in model.S_I_In_J[j] if ii in model.S_I_Shutdown_Tasks
                                           if (j,i,ii) in model.P_Task_Transitions_Unit
                                           if model.P_Task_Transitions_Unit[j,i,ii] == -1
                                           if n-model.P_Tau[ii,j] >= 0)
                                       - sum(
                                           model.V_X[ii,j,n] 
-                                          for i in model.S_I_Production_Tasks_With_Indirect_Transition
-                                          for ii in model.S_I_Startup_Tasks
+                                          for i in model.S_I_In_J[j] if i in model.S_I_Production_Tasks_With_Indirect_Transition
+                                          for ii in model.S_I_In_J[j] if ii in model.S_I_Startup_Tasks
                                           if (j,i,ii) in model.P_Task_Transitions_Unit
                                           if model.P_Task_Transitions_Unit[j,i,ii] == 1))                                         
     else:
@@ -177,14 +172,14 @@ def track_direct_transitions_eq14(model, i, j, n):
                       (model.V_X[i,j,n-1] if n >= 1 else 0)
                     + sum(
                         model.V_X[ii,j,n-model.P_Tau[ii,j]] 
-                        for ii in model.S_I_Direct_Transition_Tasks 
+                        for ii in model.S_I_In_J[j] if ii in model.S_I_Direct_Transition_Tasks
                         if (j,i,ii) in model.P_Task_Transitions_Unit 
                         if model.P_Task_Transitions_Unit[j,i,ii] == 1
                         if n - model.P_Tau[ii,j] >= 0)
                     - model.V_X[i,j,n]
                     - sum(
                         model.V_X[ii,j,n] 
-                        for ii in model.S_I_Direct_Transition_Tasks
+                        for ii in model.S_I_In_J[j] if ii in model.S_I_Direct_Transition_Tasks
                         if (j,i,ii) in model.P_Task_Transitions_Unit 
                         if model.P_Task_Transitions_Unit[j,i,ii] == -1))
     else:
@@ -208,25 +203,25 @@ def track_direct_indirect_transitions_eq15(model, i, j, n):
                       (model.V_X[i,j,n-1] if n >= 1 else 0)
                     + sum(
                         model.V_X[ii,j,n-model.P_Tau[ii,j]] 
-                        for ii in model.S_I_Startup_Tasks
+                        for ii in model.S_I_In_J[j] if ii in model.S_I_Startup_Tasks
                         if (j,i,ii) in model.P_Task_Transitions_Unit 
                         if model.P_Task_Transitions_Unit[j,i,ii] == 1
                         if n >= model.P_Tau[ii,j])
                     + sum(
                         model.V_X[ii,j,n-model.P_Tau[ii,j]] 
-                        for ii in model.S_I_Direct_Transition_Tasks
+                        for ii in model.S_I_In_J[j] if ii in model.S_I_Direct_Transition_Tasks
                         if (j,i,ii) in model.P_Task_Transitions_Unit 
                         if model.P_Task_Transitions_Unit[j,i,ii] == 1
                         if n >= model.P_Tau[ii,j])                                      
                     - model.V_X[i,j,n]
                     - sum(
                         model.V_X[ii,j,n] 
-                        for ii in model.S_I_Shutdown_Tasks
+                        for ii in model.S_I_In_J[j] if ii in model.S_I_Shutdown_Tasks
                         if (j,i,ii) in model.P_Task_Transitions_Unit 
                         if model.P_Task_Transitions_Unit[j,i,ii] == -1)
                     - sum(
                         model.V_X[ii,j,n] 
-                        for ii in model.S_I_Direct_Transition_Tasks
+                        for ii in model.S_I_In_J[j] if ii in model.S_I_Direct_Transition_Tasks
                         if (j,i,ii) in model.P_Task_Transitions_Unit 
                         if model.P_Task_Transitions_Unit[j,i,ii] == -1))                                         
     else:
@@ -272,7 +267,7 @@ def track_start_end_run_unit_eq22(model: ConcreteModel, j: Set, n: Set) -> Const
     Output: constraints to guarantee an interval between the run of different tasks in a unit.
     """
     
-    return sum(model.V_Y_Start[i,j,n] for i in model.S_I_Production_Tasks) + sum(model.V_Y_End[i,j,n] for i in model.S_I_Production_Tasks) <= 1 
+    return sum(model.V_Y_Start[i,j,n] for i in model.S_I_In_J[j] if i in model.S_I_Production_Tasks) + sum(model.V_Y_End[i,j,n] for i in model.S_I_In_J[j] if i in model.S_I_Production_Tasks) <= 1 
 
 
 def min_lenght_run_eq18(model, i, j, n):
@@ -286,8 +281,7 @@ def min_lenght_run_eq18(model, i, j, n):
     
     if (i,j) in model.P_Task_Unit_Network and i in model.S_I_Production_Tasks:
         return model.V_X[i,j,n] >= sum(model.V_Y_Start[i,j,nprime] 
-                                       for nprime in model.S_Time 
-                                       if (nprime >= n - model.P_Tau_Min[i,j] + 1 and nprime <= n))    
+                                       for nprime in range(max(n - model.P_Tau_Min[i,j] + 1, 0), n + 1))    
     else:
         return Constraint.Skip
 
@@ -303,8 +297,7 @@ def max_lenght_run_eq19(model, i, j, n):
     
     if (i,j) in model.P_Task_Unit_Network and i in model.S_I_Production_Tasks:
         return sum(model.V_X[i,j,nprime] 
-                   for nprime in model.S_Time 
-                   if (nprime >= n - model.P_Tau_Max[i,j] and nprime <= n)) <= model.P_Tau_Max[i,j] 
+                   for nprime in range(max(n - model.P_Tau_Max[i,j], 0), n + 1)) <= model.P_Tau_Max[i,j] 
     else:
         return Constraint.Skip
 
@@ -324,7 +317,7 @@ def track_start_production_task_after_transition_eq20(model, i, j, n):
     ):
         return model.V_X[i,j,n] >= sum(
                                     model.V_X[ii,j,n-model.P_Tau[ii,j]] 
-                                    for ii in model.S_I_All_Transition_Tasks 
+                                    for ii in model.S_I_In_J[j] if ii in model.S_I_All_Transition_Tasks
                                     if (i,ii) in model.P_Task_Transitions 
                                     if model.P_Task_Transitions_Unit[j,i,ii] == 1
                                     if n-model.P_Tau[ii,j] >= 0)
@@ -341,24 +334,17 @@ def unit_availability_eq21(model, j, n):
     Output: constraints that define the unit availability.
     """
     
+    operations = sum(
+        model.V_X[i,j,nprime] 
+        for i in model.S_I_In_J[j]
+        for nprime in range(max(n - model.P_Tau[i,j] + 1, 0), n + 1))
+    
     if (
         j in model.S_J_Units_Without_Transition_Tasks
     ):
-        return sum(
-            model.V_X[i,j,nprime] 
-            for i in model.S_Tasks
-            if (i,j) in model.P_Task_Unit_Network 
-            for nprime in model.S_Time 
-            if ((nprime >= n - model.P_Tau[i,j] + 1) and (nprime <= n))) <= 1
+        return operations <= 1
     else:
-        return (sum(
-            model.V_X[i,j,nprime] 
-            for i in model.S_Tasks
-            if (i,j) in model.P_Task_Unit_Network 
-            for nprime in model.S_Time 
-            if ((nprime >= n - model.P_Tau[i,j] + 1) and (nprime <= n))) 
-        
-          + model.V_X_Hat_Idle[j,n] == 1)        
+        return operations + model.V_X_Hat_Idle[j,n] == 1        
     
             
     
@@ -371,23 +357,23 @@ def load_constraints_basic_model(model: ConcreteModel) -> None:
     """
     
     # Base constraints - material balance
-    model.C_Unit_Capacity_LB_Eq2 = Constraint(model.S_Tasks, model.S_Units, model.S_Time, rule = unit_capacity_lb_eq2)
-    model.C_Unit_Capacity_UB_Eq2 = Constraint(model.S_Tasks, model.S_Units, model.S_Time, rule = unit_capacity_ub_eq2)
+    model.C_Unit_Capacity_LB_Eq2 = Constraint(model.S_Task_Unit_Time, rule = unit_capacity_lb_eq2)
+    model.C_Unit_Capacity_UB_Eq2 = Constraint(model.S_Task_Unit_Time, rule = unit_capacity_ub_eq2)
     model.C_Material_Mass_Balance_Eq3 = Constraint(model.S_Materials, model.S_Time, rule = material_mass_balance_eq3)
     model.C_Material_Capacity_Eq4 = Constraint(model.S_Materials, model.S_Time, rule = material_capacity_eq4)
     
     # Base constraints - logic
-    model.C_Track_Start_End_Run_Task_Eq16 = Constraint(model.S_Tasks, model.S_Units, model.S_Time, rule = track_start_end_run_task_eq16)
-    model.C_Track_Start_End_Run_Task_Eq17 = Constraint(model.S_Tasks, model.S_Units, model.S_Time, rule = track_start_end_run_task_eq17)
+    model.C_Track_Start_End_Run_Task_Eq16 = Constraint(model.S_Task_Unit_Time, rule = track_start_end_run_task_eq16)
+    model.C_Track_Start_End_Run_Task_Eq17 = Constraint(model.S_Task_Unit_Time, rule = track_start_end_run_task_eq17)
     model.C_Track_Start_End_Run_Unit_Eq17 = Constraint(model.S_Units, model.S_Time, rule = track_start_end_run_unit_eq22)
-    model.C_Min_Lenght_Run_Eq18 = Constraint(model.S_Tasks, model.S_Units, model.S_Time, rule = min_lenght_run_eq18)
-    model.C_Max_Lenght_Run_Eq19 = Constraint(model.S_Tasks, model.S_Units, model.S_Time, rule = max_lenght_run_eq19)
+    model.C_Min_Lenght_Run_Eq18 = Constraint(model.S_Task_Unit_Time, rule = min_lenght_run_eq18)
+    model.C_Max_Lenght_Run_Eq19 = Constraint(model.S_Task_Unit_Time, rule = max_lenght_run_eq19)
     model.C_Unit_Availability_Eq21 = Constraint(model.S_Units, model.S_Time, rule = unit_availability_eq21)
     
     # Direct and indirect transition constraints
     model.C_Track_Idle_Unit_Eq13 = Constraint(model.S_Units, model.S_Time, rule = track_idle_unit_eq13)
-    model.C_Track_Indirect_Direct_Eq15 = Constraint(model.S_Tasks, model.S_Units, model.S_Time, rule = track_direct_indirect_transitions_eq15)
-    model.C_Track_Start_Production_Task_After_Transition_Eq20 = Constraint(model.S_Tasks, model.S_Units, model.S_Time, rule = track_start_production_task_after_transition_eq20)
+    model.C_Track_Indirect_Direct_Eq15 = Constraint(model.S_Task_Unit_Time, rule = track_direct_indirect_transitions_eq15)
+    model.C_Track_Start_Production_Task_After_Transition_Eq20 = Constraint(model.S_Task_Unit_Time, rule = track_start_production_task_after_transition_eq20)
         
 
 def load_constraints_basic_model_for_operations_x_y_unit(model: ConcreteModel) -> None:
@@ -398,15 +384,15 @@ def load_constraints_basic_model_for_operations_x_y_unit(model: ConcreteModel) -
         - model (ConcreteModel): a Pyomo model instance.
     """
     
-    model.C_Track_Start_End_Run_Task_Eq16 = Constraint(model.S_Tasks, model.S_Units, model.S_Time, rule = track_start_end_run_task_eq16)
-    model.C_Track_Start_End_Run_Task_Eq17 = Constraint(model.S_Tasks, model.S_Units, model.S_Time, rule = track_start_end_run_task_eq17)
+    model.C_Track_Start_End_Run_Task_Eq16 = Constraint(model.S_Task_Unit_Time, rule = track_start_end_run_task_eq16)
+    model.C_Track_Start_End_Run_Task_Eq17 = Constraint(model.S_Task_Unit_Time, rule = track_start_end_run_task_eq17)
     model.C_Track_Start_End_Run_Unit_Eq17 = Constraint(model.S_Units, model.S_Time, rule = track_start_end_run_unit_eq22)
-    model.C_Min_Lenght_Run_Eq18 = Constraint(model.S_Tasks, model.S_Units, model.S_Time, rule = min_lenght_run_eq18)
-    model.C_Max_Lenght_Run_Eq19 = Constraint(model.S_Tasks, model.S_Units, model.S_Time, rule = max_lenght_run_eq19)
+    model.C_Min_Lenght_Run_Eq18 = Constraint(model.S_Task_Unit_Time, rule = min_lenght_run_eq18)
+    model.C_Max_Lenght_Run_Eq19 = Constraint(model.S_Task_Unit_Time, rule = max_lenght_run_eq19)
     model.C_Unit_Availability_Eq21 = Constraint(model.S_Units, model.S_Time, rule = unit_availability_eq21)
     model.C_Track_Idle_Unit_Eq13 = Constraint(model.S_Units, model.S_Time, rule = track_idle_unit_eq13)
-    model.C_Track_Indirect_Direct_Eq15 = Constraint(model.S_Tasks, model.S_Units, model.S_Time, rule = track_direct_indirect_transitions_eq15)
-    model.C_Track_Start_Production_Task_After_Transition_Eq20 = Constraint(model.S_Tasks, model.S_Units, model.S_Time, rule = track_start_production_task_after_transition_eq20)
+    model.C_Track_Indirect_Direct_Eq15 = Constraint(model.S_Task_Unit_Time, rule = track_direct_indirect_transitions_eq15)
+    model.C_Track_Start_Production_Task_After_Transition_Eq20 = Constraint(model.S_Task_Unit_Time, rule = track_start_production_task_after_transition_eq20)
     
     
 def load_constraints_basic_model_for_operations_x_y_task(model: ConcreteModel) -> None:
@@ -417,9 +403,9 @@ def load_constraints_basic_model_for_operations_x_y_task(model: ConcreteModel) -
         - model (ConcreteModel): a Pyomo model instance.
     """
     
-    model.C_Track_Start_End_Run_Task_Eq16 = Constraint(model.S_Tasks, model.S_Units, model.S_Time, rule = track_start_end_run_task_eq16)
-    model.C_Track_Start_End_Run_Task_Eq17 = Constraint(model.S_Tasks, model.S_Units, model.S_Time, rule = track_start_end_run_task_eq17)
-    model.C_Min_Lenght_Run_Eq18 = Constraint(model.S_Tasks, model.S_Units, model.S_Time, rule = min_lenght_run_eq18)
-    model.C_Max_Lenght_Run_Eq19 = Constraint(model.S_Tasks, model.S_Units, model.S_Time, rule = max_lenght_run_eq19)
-    model.C_Track_Indirect_Direct_Eq15 = Constraint(model.S_Tasks, model.S_Units, model.S_Time, rule = track_direct_indirect_transitions_eq15)
-    model.C_Track_Start_Production_Task_After_Transition_Eq20 = Constraint(model.S_Tasks, model.S_Units, model.S_Time, rule = track_start_production_task_after_transition_eq20)
\ No newline at end of file
+    model.C_Track_Start_End_Run_Task_Eq16 = Constraint(model.S_Task_Unit_Time, rule = track_start_end_run_task_eq16)
+    model.C_Track_Start_End_Run_Task_Eq17 = Constraint(model.S_Task_Unit_Time, rule = track_start_end_run_task_eq17)
+    model.C_Min_Lenght_Run_Eq18 = Constraint(model.S_Task_Unit_Time, rule = min_lenght_run_eq18)
+    model.C_Max_Lenght_Run_Eq19 = Constraint(model.S_Task_Unit_Time, rule = max_lenght_run_eq19)
+    model.C_Track_Indirect_Direct_Eq15 = Constraint(model.S_Task_Unit_Time, rule = track_direct_indirect_transitions_eq15)
+    model.C_Track_Start_Production_Task_After_Transition_Eq20 = Constraint(model.S_Task_Unit_Time, rule = track_start_production_task_after_transition_eq20)
\ No newline at end of file
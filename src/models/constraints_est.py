@@ -1,6 +1,72 @@
 from pyomo.environ import *
 
 
+# If True, the variables set to 0 by the est and lst (X, B, YS and YE in the time points before the est or after the lst) are fixed instead of constrained by the C_Set_*_To_Zero constraints.
+# The writers substitute fixed variables by their value, so the model passed to the solver has neither these columns nor the equality rows.
+EST_VARIABLE_ELIMINATION_FLAG = False
+
+# If True, the upper bound and clique constraints (load_constraint_ub_* and load_constraint_clique_*) are built with their rows deactivated, so they are not passed to the solver up front.
+# The rows violated by the LP (and, with Gurobi, node) solutions are then added by separation (see solve_and_analyze_model_cut_separation in src/models/cut_separation.py).
+CUT_SEPARATION_FLAG = False
+
+
+def _is_production_pair(model: ConcreteModel, i: Any, j: Any) -> bool:
+    """
+    Checks if task i is a production task executed by unit j in the network.
+    """
+
+    return i in model.S_I_Production_Tasks and j in model.S_J_Executing_I[i] and (i,j) in model.P_Task_Unit_Network
+
+
+def _time_points_before_est(model: ConcreteModel, i: Any, j: Any) -> list:
+    """
+    Returns the time points from n = 0 to n = est[i,j] - 1, or an empty list if conditions are not met.
+    """
+
+    if (
+        _is_production_pair(model, i, j) and 
+        model.P_EST_Task[i,j] > 0 and
+        model.P_EST_Task[i,j] <= len(model.S_Time)
+    ):
+        return [n for n in model.S_Time if 0 <= n <= (model.P_EST_Task[i,j] - 1)]
+    
+    return []
+
+
+def _time_points_after_lst(model: ConcreteModel, i: Any, j: Any, shift: int) -> list:
+    """
+    Returns the time points from n = lst[i,j] + shift to the end of the planning horizon, or an empty list if conditions are not met.
+    """
+
+    if (
+        _is_production_pair(model, i, j) and 
+        model.P_LST_Task[i,j] + shift <= max(model.S_Time)
+    ):
+        return [n for n in model.S_Time if n >= model.P_LST_Task[i,j] + shift]
+    
+    return []
+
+
+def _fix_variables_to_zero(variables: list, i: Any, j: Any, time_points: list) -> None:
+    """
+    Fixes to 0 variables[i,j,n] for the time points n (see EST_VARIABLE_ELIMINATION_FLAG).
+    """
+
+    for variable in variables:
+        for n in time_points:
+            variable[i,j,n].fix(0)
+
+
+def _deactivate_for_separation(constraint: Constraint) -> None:
+    """
+    Deactivates the rows of the constraint if CUT_SEPARATION_FLAG is True, so they are only added when separated (see get_cut_pool).
+    """
+
+    if CUT_SEPARATION_FLAG:
+        for row in constraint.values():
+            row.deactivate()
+
+
 def _constraint_set_x_to_zero_based_on_est(model: ConcreteModel, i: Any, j: Any) -> Constraint:
     """
     Sets to 0 variable X from n = 0 to n = est[i,j] - 1.
@@ -14,18 +80,10 @@ def _constraint_set_x_to_zero_based_on_est(model: ConcreteModel, i: Any, j: Any)
         Constraint: a constraint enforcing X = 0 for time points before est[i,j} or Constraint.Skip if conditions are not met.
     """
     
-    if (
-        i in model.S_I_Production_Tasks and 
-        j in model.S_J_Executing_I[i] and 
-        (i,j) in model.P_Task_Unit_Network and 
-        model.P_EST_Task[i,j] > 0 and
-        model.P_EST_Task[i,j] <= len(model.S_Time)
-    ):
-        return sum(
-            model.V_X[i,j,n] 
-            for n in model.S_Time 
-            if 0 <= n <= (model.P_EST_Task[i,j] - 1)
-        ) == 0
+    time_points = _time_points_before_est(model, i, j)
+
+    if time_points:
+        return sum(model.V_X[i,j,n] for n in time_points) == 0
     else:
         return Constraint.Skip
 
@@ -43,18 +101,52 @@ def _constraint_set_ys_to_zero_based_on_est(model: ConcreteModel, i: Any, j: Any
         Constraint: a constraint enforcing YS = 0 for time points before est[i,j} or Constraint.Skip if conditions are not met.
     """
     
-    if (
-        i in model.S_I_Production_Tasks and 
-        j in model.S_J_Executing_I[i] and 
-        (i,j) in model.P_Task_Unit_Network and 
-        model.P_EST_Task[i,j] > 0 and
-        model.P_EST_Task[i,j] <= len(model.S_Time)
-    ):
-        return sum(
-            model.V_Y_Start[i,j,n] 
-            for n in model.S_Time 
-            if 0 <= n <= (model.P_EST_Task[i,j] - 1)
-        ) == 0
+    time_points = _time_points_before_est(model, i, j)
+
+    if time_points:
+        return sum(model.V_Y_Start[i,j,n] for n in time_points) == 0
+    else:
+        return Constraint.Skip
+
+
+def _constraint_set_x_to_zero_based_on_lst(model: ConcreteModel, i: Any, j: Any) -> Constraint:
+    """
+    Sets to 0 variable X from n = lst[i,j] + tau_max[i,j] to the end of the planning horizon, after the end of the last run that can start at lst[i,j].
+
+    Args:
+        - model (ConcreteModel): a Pyomo model instance.
+        - i (Any): task index (should belong to production tasks set).
+        - j (Any): unit index (should be capable of executing task i).
+
+    Returns:
+        Constraint: a constraint enforcing X = 0 for time points after lst[i,j] + tau_max[i,j] - 1 or Constraint.Skip if conditions are not met.
+    """
+    
+    time_points = _time_points_after_lst(model, i, j, model.P_Tau_Max[i,j]) if _is_production_pair(model, i, j) else []
+
+    if time_points:
+        return sum(model.V_X[i,j,n] for n in time_points) == 0
+    else:
+        return Constraint.Skip
+
+
+def _constraint_set_ys_to_zero_based_on_lst(model: ConcreteModel, i: Any, j: Any) -> Constraint:
+    """
+    Sets to 0 variable YS from n = lst[i,j] + 1 to the end of the planning horizon.
+
+    Args:
+        - model (ConcreteModel): a Pyomo model instance.
+        - i (Any): task index (should belong to production tasks set).
+        - j (Any): unit index (should be capable of executing task i).
+
+    Returns:
+        Constraint: a constraint enforcing YS = 0 for time points after lst[i,j] or Constraint.Skip if conditions are not met.
+    """
+    
+    time_points = _time_points_after_lst(model, i, j, 1)
+
+    if time_points:
+        return sum(model.V_Y_Start[i,j,n] for n in time_points) == 0
     else:
         return Constraint.Skip
 
@@ -232,86 +324,124 @@ def _constraint_clique_ys_group_ppc(model: ConcreteModel, k: Any, n: Any) -> Con
 def load_constraint_set_to_zero_x_est(model: ConcreteModel) -> None:
    """
     Appends to the model a constraint to set to 0 variable X from 0 to est[i,j] - 1 periods.
+    If EST_VARIABLE_ELIMINATION_FLAG is True, X and B (which is 0 when X is 0) are fixed to 0 in these periods instead.
     
     Args:
         model (ConcreteModel): a Pyomo model instance.
    """    
    
-   model.C_Set_X_To_Zero_Based_On_Est = Constraint(model.S_Tasks, model.S_Units, rule = _constraint_set_x_to_zero_based_on_est)
+   if EST_VARIABLE_ELIMINATION_FLAG:
+       for (i,j) in model.P_Task_Unit_Network:
+           _fix_variables_to_zero([model.V_X, model.V_B], i, j, _time_points_before_est(model, i, j))
+       return
+
+   model.C_Set_X_To_Zero_Based_On_Est = Constraint(model.S_Task_Unit_Network, rule = _constraint_set_x_to_zero_based_on_est)
     
 
 def load_constraint_set_to_zero_ys_est(model: ConcreteModel) -> None:
    """
     Appends to the model a constraint to set to 0 variable YS from 0 to est[i,j] - 1 periods.
+    If EST_VARIABLE_ELIMINATION_FLAG is True, YS and YE are fixed to 0 in these periods instead (YE is 0 by eq16 when YS and X, see load_constraint_set_to_zero_x_est, are 0).
+    
+    Args:
+        model (ConcreteModel): a Pyomo model instance.
+   """    
+   
+   if EST_VARIABLE_ELIMINATION_FLAG:
+       for (i,j) in model.P_Task_Unit_Network:
+           _fix_variables_to_zero([model.V_Y_Start, model.V_Y_End], i, j, _time_points_before_est(model, i, j))
+       return
+
+   model.C_Set_YS_To_Zero_Based_On_Est = Constraint(model.S_Task_Unit_Network, rule = _constraint_set_ys_to_zero_based_on_est)
+
+
+def load_constraint_set_to_zero_x_ys_lst(model: ConcreteModel) -> None:
+   """
+    Appends to the model the constraints to set to 0 variables X and YS after the lst[i,j] (see compute_lst_tasks), if the lst was computed (LST_FLAG).
+    If EST_VARIABLE_ELIMINATION_FLAG is True, X and B from lst[i,j] + tau_max[i,j], YS from lst[i,j] + 1 and YE from lst[i,j] + tau_max[i,j] + 1 are fixed to 0 instead.
     
     Args:
         model (ConcreteModel): a Pyomo model instance.
    """    
    
-   model.C_Set_YS_To_Zero_Based_On_Est = Constraint(model.S_Tasks, model.S_Units, rule = _constraint_set_ys_to_zero_based_on_est)
+   if hasattr(model, 'P_LST_Task') and EST_VARIABLE_ELIMINATION_FLAG:
+       for (i,j) in model.P_Task_Unit_Network:
+           if _is_production_pair(model, i, j):
+               _fix_variables_to_zero([model.V_X, model.V_B], i, j, _time_points_after_lst(model, i, j, model.P_Tau_Max[i,j]))
+               _fix_variables_to_zero([model.V_Y_Start], i, j, _time_points_after_lst(model, i, j, 1))
+               _fix_variables_to_zero([model.V_Y_End], i, j, _time_points_after_lst(model, i, j, model.P_Tau_Max[i,j] + 1))
+   elif hasattr(model, 'P_LST_Task'):
+       model.C_Set_X_To_Zero_Based_On_Lst = Constraint(model.S_Task_Unit_Network, rule = _constraint_set_x_to_zero_based_on_lst)
+       model.C_Set_YS_To_Zero_Based_On_Lst = Constraint(model.S_Task_Unit_Network, rule = _constraint_set_ys_to_zero_based_on_lst)
 
 
 def load_constraint_ub_ys_task(model: ConcreteModel) -> None:
    """
-    Appends to the model a constraint to define an upper bound on YS for each task.
+    Appends to the model a constraint to define an upper bound on YS for each task (deactivated if CUT_SEPARATION_FLAG is True).
     
     Args:
         model (ConcreteModel): a Pyomo model instance.
    """    
    
-   model.C_Upper_Bound_YS_Task_PPC = Constraint(model.S_Tasks, model.S_Units, rule = _constraint_ub_ys_task_ppc)
+   model.C_Upper_Bound_YS_Task_PPC = Constraint(model.S_Task_Unit_Network, rule = _constraint_ub_ys_task_ppc)
+   _deactivate_for_separation(model.C_Upper_Bound_YS_Task_PPC)
 
 
 def load_constraint_ub_ys_unit(model: ConcreteModel) -> None:
    """
-    Appends to the model a constraint to define an upper bound on YS for each unit.
+    Appends to the model a constraint to define an upper bound on YS for each unit (deactivated if CUT_SEPARATION_FLAG is True).
     
     Args:
         model (ConcreteModel): a Pyomo model instance.
    """    
    
    model.C_Upper_Bound_YS_Unit_OPT = Constraint(model.S_Units, rule = _constraint_ub_ys_unit_opt)
+   _deactivate_for_separation(model.C_Upper_Bound_YS_Unit_OPT)
    
    
 def load_constraint_ub_x_task(model: ConcreteModel) -> None:
    """
-    Appends to the model a constraint to define an upper bound on X for each task.
+    Appends to the model a constraint to define an upper bound on X for each task (deactivated if CUT_SEPARATION_FLAG is True).
     
     Args:
         model (ConcreteModel): a Pyomo model instance.
    """    
    
-   model.C_Upper_Bound_X_Task_OPT = Constraint(model.S_Tasks, model.S_Units, rule = _constraint_ub_x_task_opt)
+   model.C_Upper_Bound_X_Task_OPT = Constraint(model.S_Task_Unit_Network, rule = _constraint_ub_x_task_opt)
+   _deactivate_for_separation(model.C_Upper_Bound_X_Task_OPT)
 
 
 def load_constraint_ub_x_unit(model: ConcreteModel) -> None:
    """
-    Appends to the model a constraint to define an upper bound on X for each unit.
+    Appends to the model a constraint to define an upper bound on X for each unit (deactivated if CUT_SEPARATION_FLAG is True).
     
     Args:
         model (ConcreteModel): a Pyomo model instance.
    """    
    
-   model.C_Upper_Bound_X_Unit_OPT = Constraint(model.S_Units, rule = _constraint_ub_x_unit_opt)   
+   model.C_Upper_Bound_X_Unit_OPT = Constraint(model.S_Units, rule = _constraint_ub_x_unit_opt)
+   _deactivate_for_separation(model.C_Upper_Bound_X_Unit_OPT)
    
    
 def load_constraint_clique_X_group_k(model: ConcreteModel) -> None:
     """
-    Appends to the model a constraint to bound variable X when tasks in different units compete for material k.
+    Appends to the model a constraint to bound variable X when tasks in different units compete for material k (deactivated if CUT_SEPARATION_FLAG is True).
     
     Args:
         model (ConcreteModel): a Pyomo model instance.
     """   
     
     model.C_Limit_X_Group_PPC = Constraint(model.S_Materials, model.S_Time, rule = _constraint_clique_x_group_ppc)
+    _deactivate_for_separation(model.C_Limit_X_Group_PPC)
     
     
 def load_constraint_clique_Y_group_k(model: ConcreteModel) -> None:
     """
-    Appends to the model a constraint to bound variable YS when tasks in different units compete for material k.
+    Appends to the model a constraint to bound variable YS when tasks in different units compete for material k (deactivated if CUT_SEPARATION_FLAG is True).
     
     Args:
         model (ConcreteModel): a Pyomo model instance.
     """   
     
-    model.C_Limit_YS_Group_PPC = Constraint(model.S_Materials, model.S_Time, rule = _constraint_clique_ys_group_ppc)   
\ No newline at end of file
+    model.C_Limit_YS_Group_PPC = Constraint(model.S_Materials, model.S_Time, rule = _constraint_clique_ys_group_ppc)
+    _deactivate_for_separation(model.C_Limit_YS_Group_PPC)
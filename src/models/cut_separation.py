@@ -0,0 +1,187 @@
+from pyomo.environ import *
+from pyomo.core.expr.visitor import identify_variables
+from pyomo.common.collections import ComponentSet
+from src.utils.utils import compute_num_variables_constraints
+from src.visualization.plot_results import render_gantt_charts
+from src.utils.output_policy import is_verbose
+from src.models.model_solve import set_solver_options_milp, is_persistent_solver, relaxed_model_variables, solve_model_record
+
+# Constraints built deactivated if CUT_SEPARATION_FLAG is True (see src/models/constraints_est.py): the upper bounds on X and YS and the clique constraints of the est groups
+CUT_CONSTRAINTS = [
+    "C_Upper_Bound_YS_Task_PPC",
+    "C_Upper_Bound_YS_Unit_OPT",
+    "C_Upper_Bound_X_Task_OPT",
+    "C_Upper_Bound_X_Unit_OPT",
+    "C_Limit_X_Group_PPC",
+    "C_Limit_YS_Group_PPC",
+]
+
+# Separation (see solve_and_analyze_model_cut_separation): maximum number of LP rounds at the root and minimum violation of a cut
+CUT_SEPARATION_MAX_ROUNDS = 50
+CUT_VIOLATION_TOLERANCE = 1e-6
+
+
+def get_cut_pool(model: ConcreteModel) -> list:
+    """
+    Returns the rows of CUT_CONSTRAINTS that are deactivated, i.e., not passed to the solver yet. Rows whose variables are all fixed (see EST_VARIABLE_ELIMINATION_FLAG) are left out.
+
+    Args:
+        - model (ConcreteModel): a Pyomo model instance.
+
+    Returns:
+        - list: the deactivated constraints (ConstraintData).
+    """
+
+    cut_pool = []
+
+    for name in CUT_CONSTRAINTS:
+        constraint = model.component(name)
+        if constraint is None:
+            continue
+        for cut in constraint.values():
+            if not cut.active and any(True for _ in identify_variables(cut.body, include_fixed = False)):
+                cut_pool.append(cut)
+
+    return cut_pool
+
+
+def separate_cuts(cut_pool: list, tolerance: float = CUT_VIOLATION_TOLERANCE) -> list:
+    """
+    Returns the rows of the pool that are deactivated and violated by the current values of the variables (e.g., the LP solution loaded in the model).
+
+    Args:
+        - cut_pool (list): the rows to check (see get_cut_pool).
+        - tolerance (float): minimum violation of a row.
+
+    Returns:
+        - list: the violated rows.
+    """
+
+    violated = []
+
+    for cut in cut_pool:
+        if cut.active:
+            continue
+        body = value(cut.body, exception = False)
+        if body is None:
+            continue
+        if (cut.has_ub() and body > value(cut.upper) + tolerance) or (cut.has_lb() and body < value(cut.lower) - tolerance):
+            violated.append(cut)
+
+    return violated
+
+
+def activate_cuts(cuts: list, solver: Any = None) -> None:
+    """
+    Activates the given rows, and adds them to the model loaded in the solver if it is persistent.
+    appsi solvers (e.g., appsi_highs) detect the activated rows by themselves on the next solve, so they are only added to gurobi_persistent and similar solvers.
+
+    Args:
+        - cuts (list): the rows to activate (ConstraintData).
+        - solver (Any): Pyomo solver instance holding the model, if it is persistent.
+
+    Returns:
+        - none.
+    """
+
+    for cut in cuts:
+        cut.activate()
+
+    if solver is not None and is_persistent_solver(solver) and hasattr(solver, 'add_constraint'):
+        for cut in cuts:
+            solver.add_constraint(cut)
+
+
+def _set_cut_callback(solver: Any, cut_pool: list) -> list:
+    """
+    Registers a callback that separates the rows of the pool at the nodes of the branch and bound and adds the violated ones as user cuts.
+    The user cuts only belong to the current solve, so their rows stay deactivated in the model (and out of the model loaded in the solver) and are recorded in the returned list.
+    Only gurobi_persistent supports callbacks, so nothing is done for the other solvers. gurobipy is only imported here.
+
+    Returns:
+        - list: the rows added as user cuts, filled during the solve (always empty for the other solvers).
+    """
+
+    user_cuts = []
+
+    if not hasattr(solver, 'set_callback'):
+        return user_cuts
+
+    from gurobipy import GRB
+
+    variables = list(ComponentSet(var for cut in cut_pool for var in identify_variables(cut.body, include_fixed = False)))
+    separated = ComponentSet()
+
+    def _callback(cb_model, cb_opt, cb_where):
+        if cb_where == GRB.Callback.MIPNODE and cb_opt.cbGet(GRB.Callback.MIPNODE_STATUS) == GRB.OPTIMAL:
+            cb_opt.cbGetNodeRel(variables)
+            for cut in separate_cuts(cut_pool):
+                if cut in separated:
+                    continue
+                cut.activate()  # cbCut only takes active rows
+                cb_opt.cbCut(cut)
+                cut.deactivate()
+                separated.add(cut)
+                user_cuts.append(cut)
+
+    solver.set_gurobi_param('PreCrush', 1)  # User cuts need presolve to keep the original variables
+    solver.set_callback(_callback)
+
+    return user_cuts
+
+
+def solve_and_analyze_model_cut_separation(solver: Any, model_milp: ConcreteModel, planning_horizon: int, mip_gap_multiplier: int) -> tuple[dict, list, dict, int]:
+    """
+    Solves the MILP and its LP relaxation with the rows of CUT_CONSTRAINTS added by separation (see CUT_SEPARATION_FLAG), instead of up front.
+    The LP relaxation is solved in rounds: the rows of the pool violated by the LP solution are activated and the LP is solved again, until no row is violated (or CUT_SEPARATION_MAX_ROUNDS).
+    Without a round limit, its objective is the LP relaxation of the formulation with all its rows, while the LP only has the rows that bind.
+    The MILP is then solved with the rows separated at the root. With gurobi_persistent, the rows violated at the other nodes are also added as user cuts (see _set_cut_callback).
+    The rows are valid inequalities, so a MILP solution is checked against the pool, and the MILP is solved again with the violated rows if there are any.
+    The rows added as user cuts in the previous solves are then added to the model loaded in the solver too, since user cuts do not carry over to the next solve.
+
+    Args:
+        - solver (Any): a Pyomo solver instance.
+        - model_milp (ConcreteModel): the MILP Pyomo model, built with CUT_SEPARATION_FLAG set to True.
+        - planning_horizon (int): size of the planning horizon.
+        - mip_gap_multiplier (int): multiplier to increase the mip gap.
+
+    Returns:
+        Tuple[
+            dict: results from solving the MILP (see solve_model_record),
+            list: model analytics (number of variables, constraints, etc.), with the rows of the formulation without the pool,
+            dict: results from solving the LP relaxation (last round),
+            int: number of rows added by the separation (at the root, as user cuts and after the MILP)
+        ]
+    """
+
+    set_solver_options_milp(solver, mip_gap_multiplier)
+
+    if is_persistent_solver(solver):
+        solver.set_instance(model_milp)
+
+    model_analytics_milp = compute_num_variables_constraints(model_milp)
+    cut_pool = get_cut_pool(model_milp)
+
+    with relaxed_model_variables(model_milp, solver = solver):
+        for separation_round in range(CUT_SEPARATION_MAX_ROUNDS):
+            results_lp = solve_model_record(solver, model_milp)
+            cuts = separate_cuts(cut_pool) if results_lp['objective'] is not None else []
+            if is_verbose():
+                print(f"Separation round {separation_round}: LP relaxation {results_lp['objective']}, {len(cuts)} violated rows.")
+            if not cuts:
+                break
+            activate_cuts(cuts, solver)
+
+    user_cuts = _set_cut_callback(solver, cut_pool)
+
+    while True:
+        results_milp = solve_model_record(solver, model_milp)
+        cuts = separate_cuts(cut_pool) if results_milp['objective'] is not None else []
+        if not cuts:
+            break
+        activate_cuts(ComponentSet(cuts + [cut for cut in user_cuts if not cut.active]), solver)
+
+    num_cuts = sum(1 for cut in cut_pool if cut.active) + sum(1 for cut in user_cuts if not cut.active)
+    render_gantt_charts(planning_horizon, model_milp, ["X", "Y", "B"], "milp")
+
+    return results_milp, model_analytics_milp, results_lp, num_cuts
@@ -3,13 +3,14 @@ from src.models.base_model_build import load_model_sets_parameters_variables, lo
 from src.models.parameters import create_parameters_tightening_constraints
 from src.models.constraints_est import (load_constraint_set_to_zero_x_est, 
                                         load_constraint_set_to_zero_ys_est,
+                                        load_constraint_set_to_zero_x_ys_lst,
                                         load_constraint_ub_ys_task,
                                         load_constraint_ub_ys_unit,
                                         load_constraint_ub_x_task,
                                         load_constraint_ub_x_unit,
                                         load_constraint_clique_X_group_k,
                                         load_constraint_clique_Y_group_k) 
-from src.methods.est import compute_est_subsequent_tasks
+from src.methods.preprocessing_context import create_preprocessing_context
 from src.methods.est_group import compute_est_group_tasks
 from src.methods.upper_bound_x_task_opt import compute_upper_bound_x_task
 from src.methods.upper_bound_ys_x_unit_opt import (compute_upper_bound_x_unit, 
@@ -50,14 +51,14 @@ def create_model_f2_X_YS_zero_est(stn_data: dict, planning_horizon: int) -> tupl
         - ConcreteModel: returns a Pyomo model.
     """
     
-    model = ConcreteModel()
+    context = create_preprocessing_context(stn_data, planning_horizon)
+    model = context["model"]
     
-    load_model_sets_parameters_variables(model, stn_data, planning_horizon)
     load_basic_model_constraints_objective(model, stn_data, planning_horizon, 'base_model')
-    compute_est_subsequent_tasks(model, stn_data)
     create_parameters_tightening_constraints(model, stn_data, "")
     load_constraint_set_to_zero_x_est(model)
     load_constraint_set_to_zero_ys_est(model)
+    load_constraint_set_to_zero_x_ys_lst(model)
     
     formulation_name = "F2_X_YS_0_EST"
     
@@ -76,14 +77,14 @@ def create_model_f3_ub_YS_task(stn_data: dict, planning_horizon: int) -> tuple[C
         - ConcreteModel: returns a Pyomo model.
     """
     
-    model = ConcreteModel()
+    context = create_preprocessing_context(stn_data, planning_horizon)
+    model = context["model"]
     
-    load_model_sets_parameters_variables(model, stn_data, planning_horizon)
     load_basic_model_constraints_objective(model, stn_data, planning_horizon, 'base_model')
-    compute_est_subsequent_tasks(model, stn_data)
     create_parameters_tightening_constraints(model, stn_data, "UB_YS_Task")
     load_constraint_set_to_zero_x_est(model)
     load_constraint_set_to_zero_ys_est(model)
+    load_constraint_set_to_zero_x_ys_lst(model)
     load_constraint_ub_ys_task(model)
     
     formulation_name = "F3_UB_YS_Task"
@@ -103,15 +104,15 @@ def create_model_f4_ub_YS_unit(stn_data: dict, planning_horizon: int) -> tuple[C
         - ConcreteModel: returns a Pyomo model.
     """
     
-    compute_upper_bound_y_unit(stn_data, planning_horizon)
+    context = create_preprocessing_context(stn_data, planning_horizon)
+    compute_upper_bound_y_unit(stn_data, planning_horizon, context)
+    model = context["model"]
     
-    model = ConcreteModel()
-    
-    load_model_sets_parameters_variables(model, stn_data, planning_horizon)
     load_basic_model_constraints_objective(model, stn_data, planning_horizon, 'base_model')       
     create_parameters_tightening_constraints(model, stn_data, "UB_YS_Unit")    
     load_constraint_set_to_zero_x_est(model)
     load_constraint_set_to_zero_ys_est(model)
+    load_constraint_set_to_zero_x_ys_lst(model)
     load_constraint_ub_ys_unit(model)
     
     formulation_name = "F4_UB_YS_Unit"
@@ -131,15 +132,15 @@ def create_model_f5_ub_X_task(stn_data: dict, planning_horizon: int) -> tuple[Co
         - ConcreteModel: returns a Pyomo model.
     """
     
-    compute_upper_bound_x_task(stn_data, planning_horizon)
+    context = create_preprocessing_context(stn_data, planning_horizon)
+    compute_upper_bound_x_task(stn_data, planning_horizon, context)
+    model = context["model"]
     
-    model = ConcreteModel()
-    
-    load_model_sets_parameters_variables(model, stn_data, planning_horizon)
     load_basic_model_constraints_objective(model, stn_data, planning_horizon, 'base_model')       
     create_parameters_tightening_constraints(model, stn_data, "UB_X_Task")    
     load_constraint_set_to_zero_x_est(model)
     load_constraint_set_to_zero_ys_est(model)
+    load_constraint_set_to_zero_x_ys_lst(model)
     load_constraint_ub_x_task(model)
     
     formulation_name = "F5_UB_X_Task"
@@ -159,15 +160,15 @@ def create_model_f6_ub_X_unit(stn_data: dict, planning_horizon: int) -> tuple[Co
         - ConcreteModel: returns a Pyomo model.
     """
     
-    compute_upper_bound_x_unit(stn_data, planning_horizon)
+    context = create_preprocessing_context(stn_data, planning_horizon)
+    compute_upper_bound_x_unit(stn_data, planning_horizon, context)
+    model = context["model"]
     
-    model = ConcreteModel()
-    
-    load_model_sets_parameters_variables(model, stn_data, planning_horizon)
     load_basic_model_constraints_objective(model, stn_data, planning_horizon, 'base_model')       
     create_parameters_tightening_constraints(model, stn_data, "UB_X_Unit") 
     load_constraint_set_to_zero_x_est(model)
     load_constraint_set_to_zero_ys_est(model)   
+    load_constraint_set_to_zero_x_ys_lst(model)
     load_constraint_ub_x_unit(model)
     
     formulation_name = "F6_UB_X_Unit"
@@ -187,15 +188,15 @@ def create_model_f7_ub_X_group_k(stn_data: dict, planning_horizon: int) -> tuple
         - ConcreteModel: returns a Pyomo model.
     """
     
-    model = ConcreteModel()
+    context = create_preprocessing_context(stn_data, planning_horizon)
+    model = context["model"]
     
-    load_model_sets_parameters_variables(model, stn_data, planning_horizon)
     load_basic_model_constraints_objective(model, stn_data, planning_horizon, 'base_model') 
-    compute_est_subsequent_tasks(model, stn_data)
     compute_est_group_tasks(model, stn_data)         
     create_parameters_tightening_constraints(model, stn_data, "EST_Group_K")    
     load_constraint_set_to_zero_x_est(model)
     load_constraint_set_to_zero_ys_est(model)
+    load_constraint_set_to_zero_x_ys_lst(model)
     load_constraint_clique_X_group_k(model)
     
     formulation_name = "F7_UB_X_Group_K"
@@ -215,15 +216,15 @@ def create_model_f8_ub_YS_group_k(stn_data: dict, planning_horizon: int) -> tupl
         - ConcreteModel: returns a Pyomo model.
     """
     
-    model = ConcreteModel()
+    context = create_preprocessing_context(stn_data, planning_horizon)
+    model = context["model"]
     
-    load_model_sets_parameters_variables(model, stn_data, planning_horizon)
     load_basic_model_constraints_objective(model, stn_data, planning_horizon, 'base_model') 
-    compute_est_subsequent_tasks(model, stn_data)
     compute_est_group_tasks(model, stn_data)         
     create_parameters_tightening_constraints(model, stn_data, "EST_Group_K")    
     load_constraint_set_to_zero_x_est(model)
     load_constraint_set_to_zero_ys_est(model)
+    load_constraint_set_to_zero_x_ys_lst(model)
     load_constraint_clique_Y_group_k(model)
     
     formulation_name = "F8_UB_YS_Group_K"
@@ -243,16 +244,16 @@ def create_model_f9_ub_YS_task_unit(stn_data: dict, planning_horizon: int) -> tu
         - ConcreteModel: returns a Pyomo model.
     """
     
-    compute_upper_bound_y_unit(stn_data, planning_horizon)
+    context = create_preprocessing_context(stn_data, planning_horizon)
+    compute_upper_bound_y_unit(stn_data, planning_horizon, context)
+    model = context["model"]
     
-    model = ConcreteModel()
-    
-    load_model_sets_parameters_variables(model, stn_data, planning_horizon)
     load_basic_model_constraints_objective(model, stn_data, planning_horizon, 'base_model')       
     create_parameters_tightening_constraints(model, stn_data, "UB_YS_Task")
     create_parameters_tightening_constraints(model, stn_data, "UB_YS_Unit")
     load_constraint_set_to_zero_x_est(model)
     load_constraint_set_to_zero_ys_est(model)
+    load_constraint_set_to_zero_x_ys_lst(model)
     load_constraint_ub_ys_task(model)
     load_constraint_ub_ys_unit(model)
     
@@ -273,17 +274,17 @@ def create_model_f10_ub_X_task_unit(stn_data: dict, planning_horizon: int) -> tu
         - ConcreteModel: returns a Pyomo model.
     """
     
-    compute_upper_bound_x_task(stn_data, planning_horizon)
-    compute_upper_bound_x_unit(stn_data, planning_horizon)
-    
-    model = ConcreteModel()
+    context = create_preprocessing_context(stn_data, planning_horizon)
+    compute_upper_bound_x_task(stn_data, planning_horizon, context)
+    compute_upper_bound_x_unit(stn_data, planning_horizon, context)
+    model = context["model"]
     
-    load_model_sets_parameters_variables(model, stn_data, planning_horizon)
     load_basic_model_constraints_objective(model, stn_data, planning_horizon, 'base_model')       
     create_parameters_tightening_constraints(model, stn_data, "UB_X_Task")
     create_parameters_tightening_constraints(model, stn_data, "UB_X_Unit")
     load_constraint_set_to_zero_x_est(model)
     load_constraint_set_to_zero_ys_est(model)
+    load_constraint_set_to_zero_x_ys_lst(model)
     load_constraint_ub_x_task(model)
     load_constraint_ub_x_unit(model)
     
@@ -304,15 +305,15 @@ def create_model_f11_ub_X_YS_group_k(stn_data: dict, planning_horizon: int) -> t
         - ConcreteModel: returns a Pyomo model.
     """
     
-    model = ConcreteModel()
+    context = create_preprocessing_context(stn_data, planning_horizon)
+    model = context["model"]
     
-    load_model_sets_parameters_variables(model, stn_data, planning_horizon)
     load_basic_model_constraints_objective(model, stn_data, planning_horizon, 'base_model') 
-    compute_est_subsequent_tasks(model, stn_data)
     compute_est_group_tasks(model, stn_data)         
     create_parameters_tightening_constraints(model, stn_data, "EST_Group_K")
     load_constraint_set_to_zero_x_est(model)
     load_constraint_set_to_zero_ys_est(model)    
+    load_constraint_set_to_zero_x_ys_lst(model)
     load_constraint_clique_X_group_k(model)
     load_constraint_clique_Y_group_k(model)
     
@@ -333,18 +334,18 @@ def create_model_f12_all(stn_data: dict, planning_horizon: int) -> tuple[Concret
         - ConcreteModel: returns a Pyomo model.
     """
     
-    compute_upper_bound_x_task(stn_data, planning_horizon)    
-    compute_upper_bound_x_unit(stn_data, planning_horizon)
-    compute_upper_bound_y_unit(stn_data, planning_horizon)
+    context = create_preprocessing_context(stn_data, planning_horizon)
+    compute_upper_bound_x_task(stn_data, planning_horizon, context)
+    compute_upper_bound_x_unit(stn_data, planning_horizon, context)
+    compute_upper_bound_y_unit(stn_data, planning_horizon, context)
+    model = context["model"]
     
-    model = ConcreteModel()
-    
-    load_model_sets_parameters_variables(model, stn_data, planning_horizon)
     load_basic_model_constraints_objective(model, stn_data, planning_horizon, 'base_model')       
     compute_est_group_tasks(model, stn_data)                
     create_parameters_tightening_constraints(model, stn_data, "All")    
     load_constraint_set_to_zero_x_est(model) 
     load_constraint_set_to_zero_ys_est(model)
+    load_constraint_set_to_zero_x_ys_lst(model)
     load_constraint_ub_ys_task(model)
     load_constraint_ub_ys_unit(model)
     load_constraint_ub_x_task(model)
@@ -0,0 +1,528 @@
+from pyomo.environ import *
+import numpy as np
+from src.models.sets import create_main_sets_parameters
+from src.models.parameters import create_basic_parameters, create_parameters_tightening_constraints
+from src.models.variables import RUNS_NEED_TO_FINISH_FLAG
+from src.models.constraints_est import EST_VARIABLE_ELIMINATION_FLAG
+from src.methods.preprocessing_context import create_preprocessing_context
+from src.methods.est_group import compute_est_group_tasks
+from src.methods.upper_bound_x_task_opt import compute_upper_bound_x_task
+from src.methods.upper_bound_ys_x_unit_opt import (compute_upper_bound_x_unit,
+                                                   compute_upper_bound_y_unit)
+
+
+#######################################################################################################
+# Assembles the F1-F12 formulations directly as sparse COO arrays, without Pyomo Var/Constraint      #
+# objects. Columns are laid out in blocks of len(S_Time) consecutive time points per variable index, #
+# so every constraint family is emitted with NumPy ranges instead of one expression per row.         #
+#######################################################################################################
+
+
+# Tightening constraint families appended to the base model by each formulation number (same numbering as main.py)
+MATRIX_FORMULATIONS = {
+    0: ("F1_Base_Model", []),
+    1: ("F2_X_YS_0_EST", ["X_YS_Zero_EST"]),
+    2: ("F3_UB_YS_Task", ["X_YS_Zero_EST", "UB_YS_Task"]),
+    3: ("F4_UB_YS_Unit", ["X_YS_Zero_EST", "UB_YS_Unit"]),
+    4: ("F5_UB_X_Task", ["X_YS_Zero_EST", "UB_X_Task"]),
+    5: ("F6_UB_X_Unit", ["X_YS_Zero_EST", "UB_X_Unit"]),
+    6: ("F7_UB_X_Group_K", ["X_YS_Zero_EST", "Clique_X_Group_K"]),
+    7: ("F8_UB_YS_Group_K", ["X_YS_Zero_EST", "Clique_YS_Group_K"]),
+    8: ("F9_UB_YS_Task_Unit", ["X_YS_Zero_EST", "UB_YS_Task", "UB_YS_Unit"]),
+    9: ("F10_UB_X_Task_Unit", ["X_YS_Zero_EST", "UB_X_Task", "UB_X_Unit"]),
+    10: ("F11_UB_X_YS_Group_K", ["X_YS_Zero_EST", "Clique_X_Group_K", "Clique_YS_Group_K"]),
+    11: ("F12_All", ["X_YS_Zero_EST", "UB_YS_Task", "UB_YS_Unit", "UB_X_Task", "UB_X_Unit", "Clique_X_Group_K", "Clique_YS_Group_K"]),
+}
+
+
+def _init_matrix(model: ConcreteModel) -> dict:
+    """
+    Creates an empty matrix model and the column blocks of every variable.
+    Columns of V_X, V_Y_End, V_Y_Start and V_B are only created for pairs (i,j) in P_Task_Unit_Network.
+    """
+
+    num_time_points = len(model.S_Time)
+
+    matrix = {
+        'num_time_points': num_time_points,
+        'columns': {},
+        'col_lb': [],
+        'col_ub': [],
+        'col_binary': [],
+        'num_cols': 0,
+        'rows': [],
+        'cols': [],
+        'vals': [],
+        'sense': [],
+        'rhs': [],
+        'row_blocks': {},
+        'num_rows': 0,
+    }
+
+    variable_blocks = [
+        ('V_X', list(model.P_Task_Unit_Network), True),
+        ('V_Y_End', list(model.P_Task_Unit_Network), True),
+        ('V_Y_Start', list(model.P_Task_Unit_Network), True),
+        ('V_B', list(model.P_Task_Unit_Network), False),
+        ('V_S', list(model.S_Materials), False),
+        ('V_X_Hat_Idle', list(model.S_Units), True),
+    ]
+
+    for var_name, keys, is_binary in variable_blocks:
+        matrix['columns'][var_name] = {}
+        for key in keys:
+            matrix['columns'][var_name][key] = matrix['num_cols']
+            matrix['col_lb'].append(np.zeros(num_time_points))
+            matrix['col_ub'].append(np.ones(num_time_points) if is_binary else np.full(num_time_points, np.inf))
+            matrix['col_binary'].append(np.full(num_time_points, is_binary))
+            matrix['num_cols'] += num_time_points
+
+    matrix['col_lb'] = np.concatenate(matrix['col_lb'])
+    matrix['col_ub'] = np.concatenate(matrix['col_ub'])
+    matrix['col_binary'] = np.concatenate(matrix['col_binary'])
+    matrix['objective'] = np.zeros(matrix['num_cols'])
+
+    return matrix
+
+
+def _col(matrix: dict, var_name: str, key: Any, time_points: Any) -> Any:
+    """
+    Returns the column(s) of variable var_name[key, time_points].
+    """
+
+    return matrix['columns'][var_name][key] + time_points
+
+
+def _add_rows(matrix: dict, name: str, keys: list, sense: str, rhs: Any) -> np.ndarray:
+    """
+    Appends len(keys) rows of constraint family name and returns their indices.
+    """
+
+    num_rows = len(keys)
+    rows = matrix['num_rows'] + np.arange(num_rows)
+
+    matrix['sense'].append(np.full(num_rows, sense))
+    matrix['rhs'].append(np.broadcast_to(np.asarray(rhs, dtype = float), (num_rows,)))
+    matrix['row_blocks'].setdefault(name, []).append((matrix['num_rows'], keys))
+    matrix['num_rows'] += num_rows
+
+    return rows
+
+
+def _add_terms(matrix: dict, rows: np.ndarray, cols: np.ndarray, coef: Any) -> None:
+    """
+    Appends the coefficients coef of columns cols in rows rows.
+    """
+
+    if len(rows) == 0 or np.all(np.asarray(coef) == 0):
+        return
+
+    matrix['rows'].append(rows)
+    matrix['cols'].append(cols)
+    matrix['vals'].append(np.broadcast_to(np.asarray(coef, dtype = float), (len(rows),)))
+
+
+def _time_keys(key: tuple, time_points: Any) -> list:
+    """
+    Returns the row keys key + (n,) of a time indexed constraint.
+    """
+
+    return [key + (int(n),) for n in time_points]
+
+
+def _fix_variables_end_of_horizon(model: ConcreteModel, matrix: dict, planning_horizon: int) -> None:
+    """
+    Mirrors init_variables: the last time points are reserved for Y_End = 1.
+    """
+
+    if RUNS_NEED_TO_FINISH_FLAG:
+        for i in (model.S_Tasks - model.S_I_Shutdown_Tasks):
+            for j in model.S_J_Executing_I[i]:
+                first_fixed = max(planning_horizon - model.P_Tau[i,j] + 1, 0)
+                cols = _col(matrix, 'V_X', (i,j), np.arange(first_fixed, matrix['num_time_points']))
+                matrix['col_ub'][cols] = 0
+
+
+def _build_objective(model: ConcreteModel, matrix: dict, stn_data: dict) -> None:
+    """
+    Mirrors _define_objective for model_type = 'base_model' (revenue - fix cost - variable cost - startup cost).
+    """
+
+    states = stn_data['STATES']
+    unit_tasks = stn_data['UNIT_TASKS']
+    time_points = np.arange(matrix['num_time_points'])
+
+    for (i,j) in model.P_Task_Unit_Network:
+        matrix['objective'][_col(matrix, 'V_X', (i,j), time_points)] -= unit_tasks[(j,i)]['Cost']
+        matrix['objective'][_col(matrix, 'V_B', (i,j), time_points)] -= unit_tasks[(j,i)]['vCost']
+        if i in model.S_I_Production_Tasks:
+            matrix['objective'][_col(matrix, 'V_Y_Start', (i,j), time_points)] -= model.P_StartUp_Cost[j,i]
+
+    for k in model.S_Final_Products:
+        for i in model.S_I_Producing_K[k]:
+            for j in model.S_J_Executing_I[i]:
+                matrix['objective'][_col(matrix, 'V_B', (i,j), time_points)] += states[k]['price']
+
+
+def _build_unit_capacity_eq2(model: ConcreteModel, matrix: dict) -> None:
+    """
+    Mirrors unit_capacity_lb_eq2 and unit_capacity_ub_eq2.
+    """
+
+    time_points = np.arange(matrix['num_time_points'])
+
+    for (i,j) in model.P_Task_Unit_Network:
+        rows = _add_rows(matrix, 'C_Unit_Capacity_LB_Eq2', _time_keys((i,j), time_points), '<', 0)
+        _add_terms(matrix, rows, _col(matrix, 'V_X', (i,j), time_points), model.P_Beta_Min[i,j])
+        _add_terms(matrix, rows, _col(matrix, 'V_B', (i,j), time_points), -1)
+
+    for (i,j) in model.P_Task_Unit_Network:
+        rows = _add_rows(matrix, 'C_Unit_Capacity_UB_Eq2', _time_keys((i,j), time_points), '<', 0)
+        _add_terms(matrix, rows, _col(matrix, 'V_B', (i,j), time_points), 1)
+        _add_terms(matrix, rows, _col(matrix, 'V_X', (i,j), time_points), -model.P_Beta_Max[i,j])
+
+
+def _build_material_eq3_eq4(model: ConcreteModel, matrix: dict) -> None:
+    """
+    Mirrors material_mass_balance_eq3 and material_capacity_eq4.
+    """
+
+    time_points = np.arange(matrix['num_time_points'])
+
+    for k in model.S_Materials:
+
+        if k in model.S_Raw_Materials:
+            continue
+
+        rhs = -np.array([model.P_Material_Demand[k,n] for n in model.S_Time], dtype = float)
+        rhs[0] += model.P_Init_Inventory_Material[k]
+        rows = _add_rows(matrix, 'C_Material_Mass_Balance_Eq3', _time_keys((k,), time_points), '=', rhs)
+
+        _add_terms(matrix, rows, _col(matrix, 'V_S', k, time_points), 1)
+        _add_terms(matrix, rows[1:], _col(matrix, 'V_S', k, time_points[:-1]), -1)
+
+        for (i,j,tau) in model.S_IJ_Consuming_K[k]:
+            _add_terms(matrix, rows, _col(matrix, 'V_B', (i,j), time_points), -model.P_Rho_Minus[i,k])
+
+        for (i,j,tau) in model.S_IJ_Production_Producing_K[k]:
+            _add_terms(matrix, rows[tau:], _col(matrix, 'V_B', (i,j), time_points[:len(time_points) - tau]), -model.P_Rho_Plus[i,k])
+
+        for (i,j,tau) in model.S_IJ_Transition_Producing_K[k]:
+            for offset in range(1, tau + 1):
+                _add_terms(matrix, rows[offset:], _col(matrix, 'V_B', (i,j), time_points[:len(time_points) - offset]), -model.P_Rho_Plus[i,k])
+
+    for k in model.S_Materials:
+        rows = _add_rows(matrix, 'C_Material_Capacity_Eq4', _time_keys((k,), time_points), '<', model.P_Chi[k])
+        _add_terms(matrix, rows, _col(matrix, 'V_S', k, time_points), 1)
+
+
+def _build_run_logic_eq16_eq22(model: ConcreteModel, matrix: dict) -> None:
+    """
+    Mirrors track_start_end_run_task_eq16, track_start_end_run_task_eq17 and track_start_end_run_unit_eq22.
+    """
+
+    time_points = np.arange(matrix['num_time_points'])
+    production_pairs = [(i,j) for i in model.S_I_Production_Tasks for j in model.S_J_Executing_I[i]]
+
+    for (i,j) in production_pairs:
+        rows = _add_rows(matrix, 'C_Track_Start_End_Run_Task_Eq16', _time_keys((i,j), time_points), '=', 0)
+        _add_terms(matrix, rows, _col(matrix, 'V_Y_Start', (i,j), time_points), 1)
+        _add_terms(matrix, rows, _col(matrix, 'V_X', (i,j), time_points), -1)
+        _add_terms(matrix, rows[1:], _col(matrix, 'V_X', (i,j), time_points[:-1]), 1)
+        _add_terms(matrix, rows, _col(matrix, 'V_Y_End', (i,j), time_points), -1)
+
+    for (i,j) in production_pairs:
+        rows = _add_rows(matrix, 'C_Track_Start_End_Run_Task_Eq17', _time_keys((i,j), time_points), '<', 1)
+        _add_terms(matrix, rows, _col(matrix, 'V_Y_Start', (i,j), time_points), 1)
+        _add_terms(matrix, rows, _col(matrix, 'V_Y_End', (i,j), time_points), 1)
+
+    for j in model.S_Units:
+        rows = _add_rows(matrix, 'C_Track_Start_End_Run_Unit_Eq17', _time_keys((j,), time_points), '<', 1)
+        for i in model.S_I_Production_Tasks:
+            if (i,j) in model.P_Task_Unit_Network:
+                _add_terms(matrix, rows, _col(matrix, 'V_Y_Start', (i,j), time_points), 1)
+                _add_terms(matrix, rows, _col(matrix, 'V_Y_End', (i,j), time_points), 1)
+
+
+def _build_run_length_eq18_eq19(model: ConcreteModel, matrix: dict) -> None:
+    """
+    Mirrors min_lenght_run_eq18 and max_lenght_run_eq19. Each window offset is emitted as one shifted diagonal.
+    """
+
+    time_points = np.arange(matrix['num_time_points'])
+    production_pairs = [(i,j) for (i,j) in model.P_Task_Unit_Network if i in model.S_I_Production_Tasks]
+
+    for (i,j) in production_pairs:
+        rows = _add_rows(matrix, 'C_Min_Lenght_Run_Eq18', _time_keys((i,j), time_points), '>', 0)
+        _add_terms(matrix, rows, _col(matrix, 'V_X', (i,j), time_points), 1)
+        for offset in range(0, model.P_Tau_Min[i,j]):
+            _add_terms(matrix, rows[offset:], _col(matrix, 'V_Y_Start', (i,j), time_points[:len(time_points) - offset]), -1)
+
+    for (i,j) in production_pairs:
+        rows = _add_rows(matrix, 'C_Max_Lenght_Run_Eq19', _time_keys((i,j), time_points), '<', model.P_Tau_Max[i,j])
+        for offset in range(0, model.P_Tau_Max[i,j] + 1):
+            _add_terms(matrix, rows[offset:], _col(matrix, 'V_X', (i,j), time_points[:len(time_points) - offset]), 1)
+
+
+def _build_unit_availability_eq21(model: ConcreteModel, matrix: dict) -> None:
+    """
+    Mirrors unit_availability_eq21.
+    """
+
+    time_points = np.arange(matrix['num_time_points'])
+
+    for j in model.S_Units:
+
+        if j in model.S_J_Units_Without_Transition_Tasks:
+            rows = _add_rows(matrix, 'C_Unit_Availability_Eq21', _time_keys((j,), time_points), '<', 1)
+        else:
+            rows = _add_rows(matrix, 'C_Unit_Availability_Eq21', _time_keys((j,), time_points), '=', 1)
+            _add_terms(matrix, rows, _col(matrix, 'V_X_Hat_Idle', j, time_points), 1)
+
+        for i in model.S_I_In_J[j]:
+            for offset in range(0, model.P_Tau[i,j]):
+                _add_terms(matrix, rows[offset:], _col(matrix, 'V_X', (i,j), time_points[:len(time_points) - offset]), 1)
+
+
+def _transition_tasks(model: ConcreteModel, j: Any, i: Any, transition_set: Any, direction: int) -> list:
+    """
+    Returns the transition tasks ii of transition_set linked to task i in unit j with the given direction.
+    """
+
+    return [ii for ii in transition_set if (j,i,ii) in model.P_Task_Transitions_Unit and model.P_Task_Transitions_Unit[j,i,ii] == direction]
+
+
+def _add_shifted_x(model: ConcreteModel, matrix: dict, rows: np.ndarray, ii: Any, j: Any, coef: float) -> None:
+    """
+    Adds coef * V_X[ii,j,n-P_Tau[ii,j]] to every row n >= P_Tau[ii,j].
+    """
+
+    time_points = np.arange(matrix['num_time_points'])
+    tau = model.P_Tau[ii,j]
+    _add_terms(matrix, rows[tau:], _col(matrix, 'V_X', (ii,j), time_points[:len(time_points) - tau]), coef)
+
+
+def _build_transitions_eq13_eq15_eq20(model: ConcreteModel, matrix: dict) -> None:
+    """
+    Mirrors track_idle_unit_eq13, track_direct_indirect_transitions_eq15 and track_start_production_task_after_transition_eq20.
+    """
+
+    time_points = np.arange(matrix['num_time_points'])
+
+    for j in model.S_J_Units_With_Shutdown_Tasks:
+        rhs = np.zeros(len(time_points))
+        rhs[0] = model.P_Unit_Initialization[j]
+        rows = _add_rows(matrix, 'C_Track_Idle_Unit_Eq13', _time_keys((j,), time_points), '=', rhs)
+        _add_terms(matrix, rows, _col(matrix, 'V_X_Hat_Idle', j, time_points), 1)
+        _add_terms(matrix, rows[1:], _col(matrix, 'V_X_Hat_Idle', j, time_points[:-1]), -1)
+        for i in model.S_I_Production_Tasks_With_Indirect_Transition:
+            for ii in _transition_tasks(model, j, i, model.S_I_Shutdown_Tasks, -1):
+                _add_shifted_x(model, matrix, rows, ii, j, -1)
+            for ii in _transition_tasks(model, j, i, model.S_I_Startup_Tasks, 1):
+                _add_terms(matrix, rows, _col(matrix, 'V_X', (ii,j), time_points), 1)
+
+    pairs_with_transition = [(i,j) for i in model.S_I_Production_Tasks_With_Transition for j in model.S_J_Executing_I[i]]
+
+    for (i,j) in pairs_with_transition:
+        rows = _add_rows(matrix, 'C_Track_Indirect_Direct_Eq15', _time_keys((i,j), time_points), '=', 0)
+        _add_terms(matrix, rows[1:], _col(matrix, 'V_X', (i,j), time_points[:-1]), 1)
+        _add_terms(matrix, rows, _col(matrix, 'V_X', (i,j), time_points), -1)
+        for ii in _transition_tasks(model, j, i, model.S_I_Startup_Tasks, 1) + _transition_tasks(model, j, i, model.S_I_Direct_Transition_Tasks, 1):
+            _add_shifted_x(model, matrix, rows, ii, j, 1)
+        for ii in _transition_tasks(model, j, i, model.S_I_Shutdown_Tasks, -1) + _transition_tasks(model, j, i, model.S_I_Direct_Transition_Tasks, -1):
+            _add_terms(matrix, rows, _col(matrix, 'V_X', (ii,j), time_points), -1)
+
+    for (i,j) in pairs_with_transition:
+        rows = _add_rows(matrix, 'C_Track_Start_Production_Task_After_Transition_Eq20', _time_keys((i,j), time_points), '>', 0)
+        _add_terms(matrix, rows, _col(matrix, 'V_X', (i,j), time_points), 1)
+        for ii in model.S_I_All_Transition_Tasks:
+            if (i,ii) in model.P_Task_Transitions and model.P_Task_Transitions_Unit[j,i,ii] == 1:
+                _add_shifted_x(model, matrix, rows, ii, j, -1)
+
+
+def _est_production_pairs(model: ConcreteModel, positive_est: bool) -> list:
+    """
+    Returns the production task-unit pairs (i,j) satisfying the est conditions of the constraints in constraints_est.py.
+    """
+
+    return [(i,j) for i in model.S_I_Production_Tasks for j in model.S_J_Executing_I[i]
+            if (i,j) in model.P_Task_Unit_Network
+            if (model.P_EST_Task[i,j] > 0 or not positive_est)
+            if model.P_EST_Task[i,j] <= len(model.S_Time)]
+
+
+def _build_x_ys_zero_est(model: ConcreteModel, matrix: dict) -> None:
+    """
+    Mirrors _constraint_set_x_to_zero_based_on_est and _constraint_set_ys_to_zero_based_on_est.
+    If EST_VARIABLE_ELIMINATION_FLAG is True, the columns of X, B, YS and YE are fixed to 0 instead (see load_constraint_set_to_zero_x_est and load_constraint_set_to_zero_ys_est).
+    """
+
+    for var_name, name in (('V_X', 'C_Set_X_To_Zero_Based_On_Est'), ('V_Y_Start', 'C_Set_YS_To_Zero_Based_On_Est')):
+        for (i,j) in _est_production_pairs(model, True):
+            time_points = np.arange(int(min(model.P_EST_Task[i,j], matrix['num_time_points'])))
+            if EST_VARIABLE_ELIMINATION_FLAG:
+                implied_var_name = 'V_B' if var_name == 'V_X' else 'V_Y_End'
+                matrix['col_ub'][_col(matrix, var_name, (i,j), time_points)] = 0
+                matrix['col_ub'][_col(matrix, implied_var_name, (i,j), time_points)] = 0
+                continue
+            rows = _add_rows(matrix, name, [(i,j)], '=', 0)
+            _add_terms(matrix, np.repeat(rows, len(time_points)), _col(matrix, var_name, (i,j), time_points), 1)
+
+
+def _build_x_ys_zero_lst(model: ConcreteModel, matrix: dict) -> None:
+    """
+    Mirrors _constraint_set_x_to_zero_based_on_lst and _constraint_set_ys_to_zero_based_on_lst.
+    If EST_VARIABLE_ELIMINATION_FLAG is True, the columns of X, B, YS and YE are fixed to 0 instead (see load_constraint_set_to_zero_x_ys_lst).
+    """
+
+    pairs = [(i,j) for i in model.S_I_Production_Tasks for j in model.S_J_Executing_I[i] if (i,j) in model.P_Task_Unit_Network]
+
+    for var_name, name, shift in (('V_X', 'C_Set_X_To_Zero_Based_On_Lst', model.P_Tau_Max), ('V_Y_Start', 'C_Set_YS_To_Zero_Based_On_Lst', None)):
+        for (i,j) in pairs:
+            first_zero = model.P_LST_Task[i,j] + (shift[i,j] if shift is not None else 1)
+            if first_zero > max(model.S_Time):
+                continue
+            time_points = np.arange(int(max(first_zero, 0)), matrix['num_time_points'])
+            if EST_VARIABLE_ELIMINATION_FLAG:
+                matrix['col_ub'][_col(matrix, var_name, (i,j), time_points)] = 0
+                if var_name == 'V_X':
+                    matrix['col_ub'][_col(matrix, 'V_B', (i,j), time_points)] = 0
+                    matrix['col_ub'][_col(matrix, 'V_Y_End', (i,j), time_points[1:])] = 0
+                continue
+            rows = _add_rows(matrix, name, [(i,j)], '=', 0)
+            _add_terms(matrix, np.repeat(rows, len(time_points)), _col(matrix, var_name, (i,j), time_points), 1)
+
+
+def _build_ub_task(model: ConcreteModel, matrix: dict, var_name: str, name: str, upper_bound: Any, positive_est: bool) -> None:
+    """
+    Mirrors _constraint_ub_ys_task_ppc (var_name = 'V_Y_Start') and _constraint_ub_x_task_opt (var_name = 'V_X').
+    """
+
+    for (i,j) in _est_production_pairs(model, positive_est):
+        rows = _add_rows(matrix, name, [(i,j)], '<', upper_bound[i,j])
+        time_points = np.arange(model.P_EST_Task[i,j], matrix['num_time_points'])
+        _add_terms(matrix, np.repeat(rows, len(time_points)), _col(matrix, var_name, (i,j), time_points), 1)
+
+
+def _build_ub_unit(model: ConcreteModel, matrix: dict, var_name: str, name: str, upper_bound: Any, positive_est: bool) -> None:
+    """
+    Mirrors _constraint_ub_ys_unit_opt (var_name = 'V_Y_Start') and _constraint_ub_x_unit_opt (var_name = 'V_X').
+    """
+
+    for j in model.S_Units:
+
+        if not (model.P_EST_Unit[j] <= len(model.S_Time) and (model.P_EST_Unit[j] > 0 or not positive_est)):
+            continue
+
+        rows = _add_rows(matrix, name, [(j,)], '<', upper_bound[j])
+        for i in model.S_I_Production_Tasks:
+            if (i,j) in model.P_Task_Unit_Network:
+                time_points = np.arange(model.P_EST_Task[i,j], matrix['num_time_points'])
+                _add_terms(matrix, np.repeat(rows, len(time_points)), _col(matrix, var_name, (i,j), time_points), 1)
+
+
+def _build_clique_group_k(model: ConcreteModel, matrix: dict, var_name: str, name: str) -> None:
+    """
+    Mirrors _constraint_clique_x_group_ppc (var_name = 'V_X') and _constraint_clique_ys_group_ppc (var_name = 'V_Y_Start').
+    """
+
+    for k in model.S_Materials:
+
+        if not (0 < model.P_EST_Group[k] <= len(model.S_Time)):
+            continue
+
+        time_points = np.arange(min(model.P_EST_Group[k], matrix['num_time_points']))
+        rows = _add_rows(matrix, name, _time_keys((k,), time_points), '<', len(model.S_I_Consuming_K[k]) - 1)
+        for i in (model.S_I_Production_Tasks & model.S_I_Consuming_K[k]):
+            for j in model.S_J_Executing_I[i]:
+                _add_terms(matrix, rows, _col(matrix, var_name, (i,j), time_points), 1)
+
+
+def _finalize_matrix(matrix: dict) -> None:
+    """
+    Concatenates the appended blocks into the COO arrays 'rows', 'cols', 'vals' and the row arrays 'sense' and 'rhs'.
+    """
+
+    for key, dtype in (('rows', np.int64), ('cols', np.int64), ('vals', float), ('sense', '<U1'), ('rhs', float)):
+        matrix[key] = np.concatenate(matrix[key]).astype(dtype) if matrix[key] else np.zeros(0, dtype = dtype)
+
+
+def create_matrix_model(stn_data: dict, planning_horizon: int, formulation_number: int) -> tuple[dict, str]:
+    """
+    Builds formulation formulation_number (F1-F12, same numbering as main.py) as sparse COO arrays.
+    The model is max objective @ x subject to A x (sense) rhs, col_lb <= x <= col_ub, with x binary where col_binary is True.
+
+    Args:
+        - stn_data (dict): a dictionary with the state-task network instance data.
+        - planning_horizon (int): planning horizon.
+        - formulation_number (int): number of the formulation (0 = F1, ..., 11 = F12).
+
+    Returns:
+        - dict: the matrix model ('rows', 'cols', 'vals', 'sense', 'rhs', 'objective', 'col_lb', 'col_ub', 'col_binary') with the column map 'columns' keyed by variable name and index, and the row map 'row_blocks' keyed by constraint name.
+        - str: the formulation name.
+    """
+
+    if formulation_number not in MATRIX_FORMULATIONS:
+        raise Exception(f"Formulation number {formulation_number} is not recognized.")
+
+    formulation_name, families = MATRIX_FORMULATIONS[formulation_number]
+
+    # Sets and parameters are shared with the Pyomo formulations, variables and constraints are not created
+    if families:
+        context = create_preprocessing_context(stn_data, planning_horizon, variables = False)
+        model = context["model"]
+    else:
+        model = ConcreteModel()
+        create_main_sets_parameters(model, stn_data, planning_horizon)
+        create_basic_parameters(model, stn_data, planning_horizon)
+
+    # Same preprocessing as the create_model_f* functions
+    if "UB_X_Task" in families:
+        compute_upper_bound_x_task(stn_data, planning_horizon, context)
+    if "UB_X_Unit" in families:
+        compute_upper_bound_x_unit(stn_data, planning_horizon, context)
+    if "UB_YS_Unit" in families:
+        compute_upper_bound_y_unit(stn_data, planning_horizon, context)
+    if "Clique_X_Group_K" in families or "Clique_YS_Group_K" in families:
+        compute_est_group_tasks(model, stn_data)
+    for formulation_id in ("UB_YS_Task", "UB_YS_Unit", "UB_X_Task", "UB_X_Unit"):
+        if formulation_id in families:
+            create_parameters_tightening_constraints(model, stn_data, formulation_id)
+    if "Clique_X_Group_K" in families or "Clique_YS_Group_K" in families:
+        create_parameters_tightening_constraints(model, stn_data, "EST_Group_K")
+    if families and not hasattr(model, 'P_EST_Task'):
+        create_parameters_tightening_constraints(model, stn_data, "")
+
+    matrix = _init_matrix(model)
+    _fix_variables_end_of_horizon(model, matrix, planning_horizon)
+    _build_objective(model, matrix, stn_data)
+
+    # Base constraints
+    _build_unit_capacity_eq2(model, matrix)
+    _build_material_eq3_eq4(model, matrix)
+    _build_run_logic_eq16_eq22(model, matrix)
+    _build_run_length_eq18_eq19(model, matrix)
+    _build_unit_availability_eq21(model, matrix)
+    _build_transitions_eq13_eq15_eq20(model, matrix)
+
+    # Tightening constraints
+    if "X_YS_Zero_EST" in families:
+        _build_x_ys_zero_est(model, matrix)
+    if "X_YS_Zero_EST" in families and hasattr(model, 'P_LST_Task'):
+        _build_x_ys_zero_lst(model, matrix)
+    if "UB_YS_Task" in families:
+        _build_ub_task(model, matrix, 'V_Y_Start', 'C_Upper_Bound_YS_Task_PPC', model.P_UB_YS_Task_PPC, True)
+    if "UB_YS_Unit" in families:
+        _build_ub_unit(model, matrix, 'V_Y_Start', 'C_Upper_Bound_YS_Unit_OPT', model.P_UB_YS_Unit_OPT, True)
+    if "UB_X_Task" in families:
+        _build_ub_task(model, matrix, 'V_X', 'C_Upper_Bound_X_Task_OPT', model.P_UB_X_Task_OPT, False)
+    if "UB_X_Unit" in families:
+        _build_ub_unit(model, matrix, 'V_X', 'C_Upper_Bound_X_Unit_OPT', model.P_UB_X_Unit_OPT, False)
+    if "Clique_X_Group_K" in families:
+        _build_clique_group_k(model, matrix, 'V_X', 'C_Limit_X_Group_PPC')
+    if "Clique_YS_Group_K" in families:
+        _build_clique_group_k(model, matrix, 'V_Y_Start', 'C_Limit_YS_Group_PPC')
+
+    _finalize_matrix(matrix)
+
+    return matrix, formulation_name
@@ -0,0 +1,247 @@
+import numpy as np
+import time
+from src.utils.output_policy import is_verbose
+from src.models.model_solve import SOLVER_SETTINGS, MIP_GAP_BASE, TIME_LIMIT
+
+
+# Gurobi status codes mapped to the Pyomo termination condition names stored in the results
+GUROBI_TERMINATION_CONDITIONS = {2: 'optimal', 3: 'infeasible', 4: 'infeasibleOrUnbounded', 5: 'unbounded', 8: 'maxIterations', 9: 'maxTimeLimit', 11: 'userInterrupt'}
+
+# HiGHS model status names mapped to the Pyomo termination condition names stored in the results
+HIGHS_TERMINATION_CONDITIONS = {'kOptimal': 'optimal', 'kInfeasible': 'infeasible', 'kUnboundedOrInfeasible': 'infeasibleOrUnbounded', 'kUnbounded': 'unbounded', 'kIterationLimit': 'maxIterations', 'kTimeLimit': 'maxTimeLimit', 'kInterrupt': 'userInterrupt'}
+
+
+def compute_num_variables_constraints_matrix(matrix: dict) -> list[int]:
+    """
+    Computes the number of constraints and variables of a matrix model (same order as compute_num_variables_constraints).
+    """
+
+    return [matrix['num_cols'], int(np.sum(matrix['col_binary'])), matrix['num_rows']]
+
+
+def write_matrix_model_mps(matrix: dict, file_path: str) -> None:
+    """
+    Writes a matrix model built by create_matrix_model to a free MPS file in bulk.
+    Columns are named C<index> and rows R<index>, following matrix['columns'] and matrix['row_blocks'].
+
+    Args:
+        - matrix (dict): a matrix model built by create_matrix_model.
+        - file_path (str): path of the MPS file.
+    """
+
+    num_cols = matrix['num_cols']
+
+    # Every column gets an objective entry (row -1) so that all columns are declared in the COLUMNS section
+    entry_rows = np.concatenate([np.full(num_cols, -1), matrix['rows']])
+    entry_cols = np.concatenate([np.arange(num_cols), matrix['cols']])
+    entry_vals = np.concatenate([matrix['objective'], matrix['vals']])
+    order = np.lexsort((entry_rows, entry_cols))
+
+    row_type = {'<': 'L', '>': 'G', '=': 'E'}
+    lines = ["NAME STN", "OBJSENSE", "    MAX", "ROWS", " N  OBJ"]
+    lines += [f" {row_type[sense]}  R{r}" for r, sense in enumerate(matrix['sense'])]
+    lines.append("COLUMNS")
+
+    is_integer_block = False
+    for c, r, v in zip(entry_cols[order], entry_rows[order], entry_vals[order]):
+        if matrix['col_binary'][c] != is_integer_block:
+            is_integer_block = not is_integer_block
+            lines.append(f"    MARKER 'MARKER' {'INTORG' if is_integer_block else 'INTEND'!r}")
+        lines.append(f"    C{c} {'OBJ' if r < 0 else f'R{r}'} {v:.17g}")
+    if is_integer_block:
+        lines.append("    MARKER 'MARKER' 'INTEND'")
+
+    lines.append("RHS")
+    lines += [f"    RHS R{r} {v:.17g}" for r, v in enumerate(matrix['rhs']) if v != 0]
+
+    lines.append("BOUNDS")
+    for c in range(num_cols):
+        lb, ub = matrix['col_lb'][c], matrix['col_ub'][c]
+        if lb == ub:
+            lines.append(f" FX BND C{c} {lb:.17g}")
+            continue
+        if lb != 0:
+            lines.append(f" LO BND C{c} {lb:.17g}")
+        if ub != np.inf:
+            lines.append(f" UP BND C{c} {ub:.17g}")
+    lines.append("ENDATA")
+
+    with open(file_path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def _solve_matrix_model_gurobi(matrix: dict, mip_gap_multiplier: int, relax: bool, root_node: bool = False) -> dict:
+    """
+    Hands the COO arrays of a matrix model to Gurobi through its matrix API and solves it.
+    If root_node is True, the MILP stops after the root node.
+    gurobipy and scipy are only imported here, so the rest of the pipeline does not depend on them.
+
+    Returns:
+        dict: objective, bound, time, status and termination condition of the solve.
+    """
+
+    import gurobipy as gp
+    from gurobipy import GRB
+    from scipy.sparse import csr_matrix
+
+    model = gp.Model()
+    model.Params.OutputFlag = 1 if is_verbose() else 0
+    vtype = np.where(matrix['col_binary'] if not relax else False, GRB.BINARY, GRB.CONTINUOUS)
+    x = model.addMVar(matrix['num_cols'], lb = matrix['col_lb'], ub = matrix['col_ub'], obj = matrix['objective'], vtype = vtype)
+    A = csr_matrix((matrix['vals'], (matrix['rows'], matrix['cols'])), shape = (matrix['num_rows'], matrix['num_cols']))
+    model.addMConstr(A, x, matrix['sense'], matrix['rhs'])
+    model.ModelSense = GRB.MAXIMIZE
+
+    model.Params.MIPGap = mip_gap_multiplier * MIP_GAP_BASE
+    model.Params.TimeLimit = TIME_LIMIT
+    if SOLVER_SETTINGS["threads"] is not None:
+        model.Params.Threads = SOLVER_SETTINGS["threads"]
+    if root_node:
+        model.Params.NodeLimit = 0
+    model.optimize()
+
+    has_solution = model.SolCount > 0
+
+    return {
+        'objective': model.ObjVal if has_solution else None,
+        'bound': model.ObjVal if relax and has_solution else (model.ObjBound if has_solution else None),
+        'time': model.Runtime,
+        'status': 'ok' if has_solution else 'warning',
+        'termination_condition': GUROBI_TERMINATION_CONDITIONS.get(model.Status, str(model.Status)),
+    }
+
+
+def _solve_matrix_model_highs(matrix: dict, mip_gap_multiplier: int, relax: bool, root_node: bool = False) -> dict:
+    """
+    Hands the COO arrays of a matrix model to HiGHS through highspy (column-wise, duplicate entries summed) and solves it.
+    If root_node is True, the MILP stops after the root node. highspy is only imported here.
+
+    Returns:
+        dict: objective, bound, time, status and termination condition of the solve (same record as _solve_matrix_model_gurobi).
+    """
+
+    import highspy
+
+    num_cols = matrix['num_cols']
+    sense = np.asarray(matrix['sense'])
+    rhs = np.asarray(matrix['rhs'], dtype = float)
+
+    # Sorted by column, then row, with duplicate entries summed
+    order = np.lexsort((matrix['rows'], matrix['cols']))
+    cols, rows, vals = np.asarray(matrix['cols'])[order], np.asarray(matrix['rows'])[order], np.asarray(matrix['vals'], dtype = float)[order]
+    is_first = np.ones(len(cols), dtype = bool)
+    is_first[1:] = (cols[1:] != cols[:-1]) | (rows[1:] != rows[:-1])
+    first = np.flatnonzero(is_first)
+    vals = np.add.reduceat(vals, first) if len(first) > 0 else vals
+    cols, rows = cols[first], rows[first]
+
+    lp = highspy.HighsLp()
+    lp.num_col_ = num_cols
+    lp.num_row_ = matrix['num_rows']
+    lp.sense_ = highspy.ObjSense.kMaximize
+    lp.col_cost_ = np.asarray(matrix['objective'], dtype = float)
+    lp.col_lower_ = np.asarray(matrix['col_lb'], dtype = float)
+    lp.col_upper_ = np.asarray(matrix['col_ub'], dtype = float)
+    lp.row_lower_ = np.where(sense == '<', -np.inf, rhs)
+    lp.row_upper_ = np.where(sense == '>', np.inf, rhs)
+    lp.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+    lp.a_matrix_.start_ = np.searchsorted(cols, np.arange(num_cols + 1)).astype(np.int32)
+    lp.a_matrix_.index_ = rows.astype(np.int32)
+    lp.a_matrix_.value_ = vals
+    if not relax:
+        lp.integrality_ = [highspy.HighsVarType.kInteger if is_binary else highspy.HighsVarType.kContinuous for is_binary in matrix['col_binary']]
+
+    model = highspy.Highs()
+    model.setOptionValue('output_flag', is_verbose())
+    model.passModel(lp)
+    model.setOptionValue('mip_rel_gap', mip_gap_multiplier * MIP_GAP_BASE)
+    model.setOptionValue('time_limit', float(TIME_LIMIT))
+    if SOLVER_SETTINGS["threads"] is not None:
+        model.setOptionValue('threads', SOLVER_SETTINGS["threads"])
+    if root_node:
+        model.setOptionValue('mip_max_nodes', 1)
+    model.run()
+
+    info = model.getInfo()
+    status = str(model.getModelStatus()).split('.')[-1]
+    has_solution = info.primal_solution_status == 2
+    bound = info.objective_function_value if relax or info.mip_node_count == -1 else info.mip_dual_bound
+
+    return {
+        'objective': info.objective_function_value if has_solution else None,
+        'bound': bound if has_solution or (not relax and np.isfinite(bound)) else None,
+        'time': model.getRunTime(),
+        'status': 'ok' if has_solution else 'warning',
+        'termination_condition': HIGHS_TERMINATION_CONDITIONS.get(status, status),
+    }
+
+
+# Matrix solvers by solver backend (see set_solver_backend)
+MATRIX_SOLVERS = {"gurobi": _solve_matrix_model_gurobi, "highs": _solve_matrix_model_highs}
+
+
+def _solve_matrix_model(matrix: dict, mip_gap_multiplier: int, relax: bool, root_node: bool = False) -> dict:
+    """
+    Solves a matrix model with the solver backend of the process (see MATRIX_SOLVERS).
+    """
+
+    if SOLVER_SETTINGS["backend"] not in MATRIX_SOLVERS:
+        raise Exception(f"Solver backend {SOLVER_SETTINGS['backend']} is not supported by the matrix backend.")
+
+    return MATRIX_SOLVERS[SOLVER_SETTINGS["backend"]](matrix, mip_gap_multiplier, relax, root_node)
+
+
+def solve_and_analyze_matrix_model(matrix: dict, mip_gap_multiplier: int) -> tuple[dict, list, dict]:
+    """
+    Solves a matrix model and its LP relaxation. Counterpart of solve_and_analyze_model for the matrix backend.
+
+    Args:
+        - matrix (dict): a matrix model built by create_matrix_model.
+        - mip_gap_multiplier (int): multiplier to increase the mip gap.
+
+    Returns:
+        Tuple[
+            dict: results from solving the MILP,
+            list: model analytics (number of variables, constraints, etc.),
+            dict: results from solving the LP relaxation
+        ]
+    """
+
+    results_milp = _solve_matrix_model(matrix, mip_gap_multiplier, relax = False)
+    model_analytics_milp = compute_num_variables_constraints_matrix(matrix)
+    results_lp = _solve_matrix_model(matrix, mip_gap_multiplier, relax = True)
+
+    return results_milp, model_analytics_milp, results_lp
+
+
+def solve_and_analyze_matrix_model_relaxation(matrix: dict, mip_gap_multiplier: int, root_node: bool) -> tuple[dict, list, dict, dict]:
+    """
+    Solves only the LP relaxation of a matrix model and, optionally, the root node. Counterpart of solve_and_analyze_model_relaxation.
+
+    Args:
+        - matrix (dict): a matrix model built by create_matrix_model.
+        - mip_gap_multiplier (int): multiplier to increase the mip gap.
+        - root_node (bool): if True, the MILP is also solved up to the end of the root node.
+
+    Returns:
+        Tuple[
+            dict: results from solving the LP relaxation,
+            list: model analytics (number of variables, constraints, etc.),
+            dict: results from solving the root node (None if root_node is False),
+            dict: solve times in seconds {"LP": ..., "Root": ...}
+        ]
+    """
+
+    timings = {"LP": None, "Root": None}
+    results_root = None
+
+    start = time.perf_counter()
+    results_lp = _solve_matrix_model(matrix, mip_gap_multiplier, relax = True)
+    timings["LP"] = time.perf_counter() - start
+
+    if root_node:
+        start = time.perf_counter()
+        results_root = _solve_matrix_model(matrix, mip_gap_multiplier, relax = False, root_node = True)
+        timings["Root"] = time.perf_counter() - start
+
+    return results_lp, compute_num_variables_constraints_matrix(matrix), results_root, timings
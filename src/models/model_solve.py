@@ -1,21 +1,117 @@
 from pyomo.environ import *
 from pyomo.opt import SolverResults
+from contextlib import contextmanager
+import time
 from src.utils.utils import compute_num_variables_constraints
-from src.visualization.plot_results import plot_gantt_chart
+from src.visualization.plot_results import render_gantt_charts
+from src.utils.output_policy import is_verbose
 from src.utils.utils import print_model_constraints, print_objective_value
+from src.models.solver_backends import get_solver_backend, set_backend_option, normalize_solver_results
+from src.methods.warm_start import load_warm_start, WARM_START_FLAG
 
-def define_solver() -> Any:
+# Solver settings of the current process, changed with set_solver_threads and set_solver_backend. Threads = None keeps the solver default (all cores)
+SOLVER_SETTINGS = {"threads": None, "backend": "gurobi"}
+
+MIP_GAP_BASE = 0.0001  # Base MIP gap, multiplied by mip_gap_multiplier
+TIME_LIMIT = 15 * 3600  # Time limit in seconds
+
+
+def set_solver_threads(threads: int) -> None:
     """ 
-    Defines Gurobi as the solver.
+    Sets the number of threads of the solvers created in this process (e.g., one budget per worker of run_sweep.py, so that workers x threads <= cores).
     
     Args:
+        - threads (int): number of solver threads, or None for the solver default.
+    
+    Returns:
         - none.
+    """
+    
+    SOLVER_SETTINGS["threads"] = threads
+
+
+def set_solver_backend(backend: str) -> None:
+    """ 
+    Sets the solver backend of the solvers created in this process (e.g., "highs" to run the pipeline without a Gurobi license).
+    
+    Args:
+        - backend (str): name of the backend (see SOLVER_BACKENDS in src/models/solver_backends.py).
+    
+    Returns:
+        - none.
+    """
+    
+    get_solver_backend(backend)
+    SOLVER_SETTINGS["backend"] = backend
+
+
+def set_solver_option(solver: Any, option: str, value: Any) -> None:
+    """ 
+    Sets a generic option (mip_gap, time_limit, threads or node_limit) under the option name of the solver backend of the process.
+    Options the backend does not have are skipped.
+    
+    Args:
+        - solver (Any): Pyomo solver instance created by define_solver.
+        - option (str): generic option name.
+        - value (Any): option value.
+    
+    Returns:
+        - none.
+    """
+    
+    set_backend_option(solver, SOLVER_SETTINGS["backend"], option, value)
+
+
+def define_solver(persistent: bool = False) -> Any:
+    """ 
+    Defines the solver of the solver backend of the process (see set_solver_backend), Gurobi by default. The thread budget of the process (see set_solver_threads) is set as the threads option.
+    
+    Args:
+        - persistent (bool): if True, the persistent interface of the backend is used (e.g., gurobi_persistent), if it has one.
+    
+    Returns:
+        - solver (Any): Pyomo SolverFactory instance.
+    """
+    
+    backend = get_solver_backend(SOLVER_SETTINGS["backend"])
+    solver = SolverFactory(backend["persistent_solver_name"] if persistent else backend["solver_name"])
+    
+    if SOLVER_SETTINGS["threads"] is not None:
+        set_solver_option(solver, "threads", SOLVER_SETTINGS["threads"])
+    
+    return solver
+
+
+def is_persistent_solver(solver: Any) -> bool:
+    """ 
+    Checks if the solver keeps a model instance between solves (e.g., gurobi_persistent or appsi solvers).
+    
+    Args:
+        - solver (Any): Pyomo solver instance.
     
     Returns:
-        - solver (Any): Pyomo SolverFactory instance configured for Gurobi.
+        - bool: True if the solver is persistent.
     """
     
-    return SolverFactory('gurobi')
+    return hasattr(solver, 'set_instance')
+
+
+def update_persistent_solver_variables(solver: Any, variables: list) -> None:
+    """ 
+    Pushes changes in bounds and domains of the given variables to the model loaded in a persistent solver.
+    appsi solvers (e.g., appsi_highs) detect these changes by themselves on the next solve, so nothing is done for them.
+    
+    Args:
+        - solver (Any): persistent Pyomo solver instance.
+        - variables (list): variables (VarData) that were modified.
+    
+    Returns:
+        - none.
+    """
+    
+    if hasattr(solver, 'update_var'):
+        for var in variables:
+            solver.update_var(var)
 
 
 def set_solver_options_milp(solver: Any, mip_gap_multiplier) -> None: 
@@ -23,60 +119,224 @@ def set_solver_options_milp(solver: Any, mip_gap_multiplier) -> None:
     Sets solver options for MILP optimization.
     
     Args:
-        - solver (Any): Pyomo solver instance (e.g., Gurobi).
+        - solver (Any): Pyomo solver instance created by define_solver.
         - mip_gap_multiplier (int): multiplier to increase the mip gap.
     
     Returns:
         - none.
     """  
     
-    solver.options['MIPGap'] = mip_gap_multiplier * 0.0001  # Set MIP gap
-    solver.options['TimeLimit'] = 15 * 3600  # Set time limit
+    set_solver_option(solver, "mip_gap", mip_gap_multiplier * MIP_GAP_BASE)  # Set MIP gap
+    set_solver_option(solver, "time_limit", TIME_LIMIT)  # Set time limit
 
 
-def activate_model_lp_relaxation(model: ConcreteModel) -> None:    
+def set_variables_domain(variables: list, domain: Any) -> None:    
     """ 
-    Relaxes all binary and integer variables in the model to continuous variables.
+    Sets the domain of a list of variables (VarData), in bulk on the indexed component when the list covers all of its indices.
+    
+    Args:
+        - variables (list): variables (VarData) of a single component.
+        - domain (Any): Pyomo domain (e.g., Reals, Binary).
+    
+    Returns:
+        - none.
+    """   
+    
+    var = variables[0].parent_component()
+    
+    if var.is_indexed() and len(variables) == len(var):
+        var.domain = domain
+    else:
+        for vardata in variables:
+            vardata.domain = domain
+
+
+def relax_model_variables(model: ConcreteModel, var_names: list[str] = None, time_cutoff: int = None) -> dict:    
+    """ 
+    Relaxes binary and integer variables of the model to continuous variables, keeping their bounds (e.g., 0 and 1 for binaries).
+    The original domains are recorded grouped by variable and domain, so they can be restored with restore_model_variables.
+    
+    Args:
+        - model (ConcreteModel): Pyomo model instance.
+        - var_names (list[str]): names of the variables to relax (e.g., ["V_Y_End"]). If None, all variables are relaxed.
+        - time_cutoff (int): if given, only indices whose time point (last index) is greater than time_cutoff are relaxed.
+    
+    Returns:
+        - dict: {(variable name, domain name): (domain, [relaxed VarData])}, the record of relaxed variables.
+    """   
+    
+    relaxed_record = {}
+    
+    for var in model.component_objects(Var, active=True):
+        
+        if var_names is not None and var.name not in var_names:
+            continue
+        
+        # Group the selected indices by domain, checking integrality once per domain
+        groups = {}
+        for index, vardata in var.items():
+            time_point = index[-1] if isinstance(index, tuple) else index
+            if time_cutoff is not None and time_point <= time_cutoff:
+                continue
+            domain = vardata.domain
+            if id(domain) not in groups:
+                groups[id(domain)] = (domain, [], domain.get_interval()[2] == 1)
+            groups[id(domain)][1].append(vardata)
+        
+        for domain, group, is_integer in groups.values():
+            if is_integer:
+                relaxed_record[(var.name, domain.name)] = (domain, group)
+    
+    for domain, group in relaxed_record.values():
+        set_variables_domain(group, Reals)
+        
+        # Bounds implied only by the discrete domain (e.g., Binary without explicit bounds) become explicit bounds
+        domain_lb, domain_ub = domain.bounds()
+        for vardata in group:
+            lb, ub = vardata.bounds
+            if domain_lb is not None and (lb is None or lb < domain_lb):
+                vardata.setlb(domain_lb)
+            if domain_ub is not None and (ub is None or ub > domain_ub):
+                vardata.setub(domain_ub)
+    
+    return relaxed_record
+
+
+def restore_model_variables(relaxed_record: dict) -> None:    
+    """ 
+    Restores the domains of variables relaxed by relax_model_variables.
+    
+    Args:
+        - relaxed_record (dict): record returned by relax_model_variables.
+    
+    Returns:
+        - none.
+    """   
+    
+    for domain, group in relaxed_record.values():
+        set_variables_domain(group, domain)
+
+
+@contextmanager
+def relaxed_model_variables(model: ConcreteModel, var_names: list[str] = None, time_cutoff: int = None, solver: Any = None):    
+    """ 
+    Context manager that relaxes binary and integer variables (see relax_model_variables) and restores them on exit.
+    Changes are pushed to the solver if it is persistent, so several (partial) relaxations can be solved from one built model.
+    
+    Example:
+        with relaxed_model_variables(model, var_names = ["V_Y_End"], solver = solver):
+            results = solve_model(solver, model)
     
     Args:
         - model (ConcreteModel): Pyomo model instance.
+        - var_names (list[str]): names of the variables to relax. If None, all variables are relaxed.
+        - time_cutoff (int): if given, only indices whose time point is greater than time_cutoff are relaxed.
+        - solver (Any): Pyomo solver instance holding the model, if it is persistent.
+    
+    Yields:
+        - dict: the record of relaxed variables.
+    """   
+    
+    relaxed_record = relax_model_variables(model, var_names, time_cutoff)
+    relaxed_variables = [vardata for _, group in relaxed_record.values() for vardata in group]
+    
+    if solver is not None and is_persistent_solver(solver):
+        update_persistent_solver_variables(solver, relaxed_variables)
+    
+    try:
+        yield relaxed_record
+    finally:
+        restore_model_variables(relaxed_record)
+        if solver is not None and is_persistent_solver(solver):
+            update_persistent_solver_variables(solver, relaxed_variables)
+
+
+def set_solver_options_root_node(solver: Any) -> None: 
+    """ 
+    Sets solver options to stop the MILP after the root node (cuts and heuristics included).
+    Backends without a node limit (e.g., GLPK) solve the MILP until the time limit.
+    
+    Args:
+        - solver (Any): Pyomo solver instance created by define_solver.
     
     Returns:
         - none.
+    """  
+    
+    root_node_limit = get_solver_backend(SOLVER_SETTINGS["backend"])["root_node_limit"]
+    
+    if root_node_limit is not None:
+        set_solver_option(solver, "node_limit", root_node_limit)  # Stop after the root node
+
+
+def activate_model_lp_relaxation(model: ConcreteModel) -> list:    
+    """ 
+    Relaxes all binary and integer variables in the model to continuous variables.
+    The relaxation is permanent; use relaxed_model_variables to restore the MILP afterwards.
+    
+    Args:
+        - model (ConcreteModel): Pyomo model instance.
+    
+    Returns:
+        - list: relaxed variables (VarData), to be updated in a persistent solver.
     """   
     
-    for var in model.component_objects(Var, active=True):            
-        for index in var:                
-            if var[index].domain == Binary:
-                var[index].setlb(0)
-                var[index].setub(1)
-                var[index].domain = Reals                
-            elif var[index].domain == Integers:
-                var[index].domain = Reals     
+    relaxed_record = relax_model_variables(model)
+    
+    return [vardata for _, group in relaxed_record.values() for vardata in group]
                 
                 
-def solve_model(solver: Any, model: ConcreteModel) -> SolverResults:
+def solve_model(solver: Any, model: ConcreteModel, load_solutions: bool = True, warm_start: bool = False) -> SolverResults:
     """
     Solves the given Pyomo model using the provided solver.
 
     Args:
         - solver (Any): a Pyomo solver instance (e.g., SolverFactory("gurobi")).
         - model (ConcreteModel): the Pyomo model to be solved.
+        - load_solutions (bool): if False, the solution is not loaded into the model (e.g., when only the bound is needed).
+        - warm_start (bool): if True, the current values of the variables are passed as a MIP start, if the solver backend of the process supports it.
 
     Returns:
         - SolverResults: results of the solver execution.
     """
     
-    results = solver.solve(model, tee = True)
-    results.write()
+    if warm_start and get_solver_backend(SOLVER_SETTINGS["backend"])["warm_start"]:
+        results = solver.solve(model, tee = is_verbose(), load_solutions = load_solutions, warmstart = True)
+    else:
+        results = solver.solve(model, tee = is_verbose(), load_solutions = load_solutions)
+    if is_verbose():
+        results.write()
     
     return results    
 
 
-def solve_and_analyze_model(solver: Any, model_milp: ConcreteModel, planning_horizon: int, mip_gap_multiplier: int, stn_data: dict) -> tuple[SolverResults, dict, SolverResults]:
+def solve_model_record(solver: Any, model: ConcreteModel, load_solutions: bool = True, warm_start: bool = False) -> dict:
+    """
+    Solves the given Pyomo model (see solve_model) and normalizes its results (see normalize_solver_results), so they do not depend on the solver backend.
+
+    Args:
+        - solver (Any): a Pyomo solver instance created by define_solver.
+        - model (ConcreteModel): the Pyomo model to be solved.
+        - load_solutions (bool): if False, the solution is not loaded into the model.
+        - warm_start (bool): if True, the current values of the variables are passed as a MIP start (see solve_model).
+
+    Returns:
+        - dict: objective, bound, time, status and termination condition of the solve.
+    """
+    
+    start = time.perf_counter()
+    results = solve_model(solver, model, load_solutions, warm_start)
+    
+    return normalize_solver_results(results, time.perf_counter() - start)
+
+
+def solve_and_analyze_model(solver: Any, model_milp: ConcreteModel, planning_horizon: int, mip_gap_multiplier: int, stn_data: dict) -> tuple[dict, list, dict]:
     """
     Solves the MILP model, analyzes it, and solves its LP relaxation.
-    There is also the possibility to print Gantt charts, model constraints and the value of the objective function.
+    If WARM_START_FLAG is True, the MILP starts from the schedule of the greedy heuristic (see load_warm_start in src/methods/warm_start.py).
+    With a persistent solver, the model is loaded once and the LP relaxation is solved after flipping the variable domains in place.
+    The MILP domains are restored after the LP relaxation is solved.
+    Gantt charts, model constraints and the value of the objective function are printed according to the output policy (see src/utils/output_policy.py).
 
     Args:
         - solver (Any): a Pyomo solver instance.
@@ -87,28 +347,74 @@ def solve_and_analyze_model(solver: Any, model_milp: ConcreteModel, planning_hor
 
     Returns:
         Tuple[
-            SolverResults: results from solving the MILP,
-            dict: model analytics (number of variables, constraints, etc.),
-            SolverResults: results from solving the LP relaxation
+            dict: results from solving the MILP (see solve_model_record),
+            list: model analytics (number of variables, constraints, etc.),
+            dict: results from solving the LP relaxation
         ]
     """
     
     
     set_solver_options_milp(solver, mip_gap_multiplier)
     
-    results_milp: SolverResults = solve_model(solver, model_milp)   
+    if is_persistent_solver(solver):
+        solver.set_instance(model_milp)
+    
+    warm_start = WARM_START_FLAG and load_warm_start(model_milp, stn_data) is not None
+    
+    results_milp = solve_model_record(solver, model_milp, warm_start = warm_start)   
     model_analytics_milp = compute_num_variables_constraints(model_milp)
-    plot_gantt_chart(planning_horizon, model_milp, "X")
-    plot_gantt_chart(planning_horizon, model_milp, "Y")
-    plot_gantt_chart(planning_horizon, model_milp, "B")
-    #print_model_constraints(model_milp)
-    print_objective_value(model_milp, stn_data)
-    
-    activate_model_lp_relaxation(model_milp)
-    results_lp: SolverResults = solve_model(solver, model_milp)
-    plot_gantt_chart(planning_horizon, model_milp, "X")
-    plot_gantt_chart(planning_horizon, model_milp, "Y")
-    plot_gantt_chart(planning_horizon, model_milp, "B")
-    print_objective_value(model_milp, stn_data)
-    
-    return results_milp, model_analytics_milp, results_lp
\ No newline at end of file
+    render_gantt_charts(planning_horizon, model_milp, ["X", "Y", "B"], "milp")
+    if is_verbose():
+        #print_model_constraints(model_milp)
+        print_objective_value(model_milp, stn_data)
+    
+    with relaxed_model_variables(model_milp, solver = solver):
+        results_lp = solve_model_record(solver, model_milp)
+        render_gantt_charts(planning_horizon, model_milp, ["X", "Y", "B"], "lp")
+        if is_verbose():
+            print_objective_value(model_milp, stn_data)
+    
+    return results_milp, model_analytics_milp, results_lp
+
+
+def solve_and_analyze_model_relaxation(solver: Any, model_milp: ConcreteModel, mip_gap_multiplier: int, root_node: bool) -> tuple[dict, list, dict, dict]:
+    """
+    Solves only the LP relaxation of the model and, optionally, the root node of the MILP (used to screen the strength of formulations).
+
+    Args:
+        - solver (Any): a Pyomo solver instance.
+        - model_milp (ConcreteModel): the MILP Pyomo model.
+        - mip_gap_multiplier (int): multiplier to increase the mip gap.
+        - root_node (bool): if True, the MILP is also solved up to the end of the root node.
+
+    Returns:
+        Tuple[
+            dict: results from solving the LP relaxation (see solve_model_record),
+            list: model analytics (number of variables, constraints, etc.),
+            dict: results from solving the root node (None if root_node is False),
+            dict: solve times in seconds {"LP": ..., "Root": ...}
+        ]
+    """
+    
+    timings = {"LP": None, "Root": None}
+    results_root = None
+    
+    set_solver_options_milp(solver, mip_gap_multiplier)
+    
+    if is_persistent_solver(solver):
+        solver.set_instance(model_milp)
+    
+    model_analytics_milp = compute_num_variables_constraints(model_milp)
+    
+    with relaxed_model_variables(model_milp, solver = solver):
+        start = time.perf_counter()
+        results_lp = solve_model_record(solver, model_milp)
+        timings["LP"] = time.perf_counter() - start
+    
+    if root_node:
+        set_solver_options_root_node(solver)
+        start = time.perf_counter()
+        results_root = solve_model_record(solver, model_milp, load_solutions = False)
+        timings["Root"] = time.perf_counter() - start
+    
+    return results_lp, model_analytics_milp, results_root, timings
@@ -1,5 +1,6 @@
 from pyomo.environ import *
 from src.models.variables import RUNS_NEED_TO_FINISH_FLAG
+from src.utils.output_policy import is_verbose
 
 ADD_TIME_POINT = 1  # Used for computing the number of time periods
 
@@ -55,6 +56,10 @@ def est_task_initialization(EST: dict) -> dict:
     est = {(i,j): EST[(j,i)] for (j,i) in EST}
     return est
 
+def lst_task_initialization(LST: dict) -> dict:
+    lst = {(i,j): LST[(j,i)] for (j,i) in LST}
+    return lst
+
 def est_unit_initialization(model: ConcreteModel, j: Any) -> dict:
     est_unit = min(model.P_EST_Task[i,j] for i in model.S_I_Production_Tasks if (i,j) in model.P_Task_Unit_Network)
     return est_unit
@@ -116,7 +121,8 @@ def ub_ys_task_initialization(model: ConcreteModel) -> dict:
         else:
             upper_bound_ys_task[i,j] = ceil( number_time_points  / ( tau_min +  tau_startup + tau_shutdown ) )
         
-        print(f"Production task = {i}, Time Points = {number_time_points}, tau_startup = {tau_startup}, tau_shutdown = {tau_shutdown}, Upper Bound YS = {upper_bound_ys_task[i,j]}, Remaining Time Points = {number_time_points - upper_bound_ys_task[i,j] * ( tau_min +  tau_startup + tau_shutdown )}")
+        if is_verbose():
+            print(f"Production task = {i}, Time Points = {number_time_points}, tau_startup = {tau_startup}, tau_shutdown = {tau_shutdown}, Upper Bound YS = {upper_bound_ys_task[i,j]}, Remaining Time Points = {number_time_points - upper_bound_ys_task[i,j] * ( tau_min +  tau_startup + tau_shutdown )}")
     
     return upper_bound_ys_task        
                
@@ -187,6 +193,9 @@ def create_parameters_tightening_constraints(model: ConcreteModel, stn_data: dic
         
     model.P_EST_Task = Param(model.S_Tasks, model.S_Units, initialize = est_task_initialization(est))
     model.P_EST_Unit = Param(model.S_Units, initialize = est_unit_initialization)
+    
+    if 'LST' in stn_data and not hasattr(model, 'P_LST_Task'):
+        model.P_LST_Task = Param(model.S_Tasks, model.S_Units, initialize = lst_task_initialization(stn_data['LST']))
         
     if formulation_id == "UB_YS_Task":
         
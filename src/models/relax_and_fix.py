@@ -0,0 +1,137 @@
+from pyomo.environ import *
+from src.utils.utils import compute_num_variables_constraints
+from src.visualization.plot_results import render_gantt_charts
+from src.utils.output_policy import is_verbose
+from src.models.model_solve import (set_solver_options_milp, is_persistent_solver, update_persistent_solver_variables,
+                                    relaxed_model_variables, solve_model_record)
+from src.models.rolling_horizon import _group_by_time_point
+
+# Relax-and-fix (see solve_relax_and_fix): each bucket covers RELAX_AND_FIX_BUCKET_LENGTH time points, and the binaries of the first RELAX_AND_FIX_FIX_LENGTH of them are fixed before the next bucket
+RELAX_AND_FIX_BUCKET_LENGTH = 20
+RELAX_AND_FIX_FIX_LENGTH = 10
+
+# Binary variables relaxed after the bucket and fixed once the bucket is solved
+RELAX_AND_FIX_VARIABLES = ["V_X", "V_Y_Start", "V_Y_End", "V_X_Hat_Idle"]
+
+
+def _fix_bucket(solver: Any, variables_by_time: dict, first: int, last: int) -> list:
+    """
+    Fixes the binary variables from time point first to last - 1 to their (rounded) values in the solution of the bucket, and pushes them to the solver if it is persistent.
+
+    Returns:
+        - list: the variables fixed.
+    """
+
+    fixed = [var for n in range(first, last) for var in variables_by_time.get(n, []) if not var.fixed and var.value is not None]
+
+    for var in fixed:
+        var.fix(round(var.value))
+
+    if is_persistent_solver(solver):
+        update_persistent_solver_variables(solver, fixed)
+
+    return fixed
+
+
+def solve_relax_and_fix(solver: Any, model: ConcreteModel, bucket_length: int = RELAX_AND_FIX_BUCKET_LENGTH, fix_length: int = RELAX_AND_FIX_FIX_LENGTH) -> tuple[dict, list]:
+    """
+    Solves the MILP with a relax-and-fix heuristic over buckets of the planning horizon [s, s + bucket_length), with s = 0, fix_length, 2 * fix_length, ...
+    In each bucket, the binaries of RELAX_AND_FIX_VARIABLES before s are fixed to the solution of the previous buckets, those in the bucket are binary, and those after it are relaxed (see relaxed_model_variables).
+    The binaries of [s, s + fix_length) are then fixed and the bucket advances (with fix_length < bucket_length, consecutive buckets overlap). The batches and inventories are continuous, so they are optimized again in each bucket.
+    The model is modified in place (with a persistent solver, it is loaded once), so it works with every formulation. The last bucket has no relaxed variables, so its solution is a schedule of the MILP.
+    The variables fixed by the heuristic are unfixed at the end, keeping the values of the solution.
+
+    Args:
+        - solver (Any): a Pyomo solver instance.
+        - model (ConcreteModel): the MILP Pyomo model.
+        - bucket_length (int): number of time points of each bucket.
+        - fix_length (int): number of time points fixed after each bucket (at most bucket_length).
+
+    Returns:
+        Tuple[
+            dict: results of the heuristic (see solve_model_record), with the objective of the last bucket and the sum of the solve times of all buckets,
+            list: results of each bucket
+        ]
+    """
+
+    if not 1 <= fix_length <= bucket_length:
+        raise Exception(f"The fix length ({fix_length}) must be between 1 and the bucket length ({bucket_length}).")
+
+    planning_horizon = max(model.S_Time)
+    variables_by_time = _group_by_time_point([model.component(name) for name in RELAX_AND_FIX_VARIABLES])
+
+    results_buckets = []
+    fixed = []
+    bucket_start = 0
+
+    while True:
+
+        bucket_end = min(bucket_start + bucket_length, planning_horizon + 1)
+
+        with relaxed_model_variables(model, var_names = RELAX_AND_FIX_VARIABLES, time_cutoff = bucket_end - 1, solver = solver):
+            results_bucket = solve_model_record(solver, model)
+
+        results_bucket['window'] = (bucket_start, bucket_end - 1)
+        results_buckets.append(results_bucket)
+
+        if is_verbose():
+            print(f"Relax-and-fix bucket [{bucket_start}, {bucket_end - 1}]: objective {results_bucket['objective']}, {results_bucket['termination_condition']}.")
+
+        if results_bucket['objective'] is None or bucket_end > planning_horizon:
+            break
+
+        fixed += _fix_bucket(solver, variables_by_time, bucket_start, bucket_start + fix_length)
+        bucket_start += fix_length
+
+    for var in fixed:
+        var.unfix()
+
+    if is_persistent_solver(solver):
+        update_persistent_solver_variables(solver, fixed)
+
+    results_relax_and_fix = {
+        'objective': results_buckets[-1]['objective'],
+        'bound': None,
+        'time': sum(results_bucket['time'] for results_bucket in results_buckets),
+        'status': results_buckets[-1]['status'],
+        'termination_condition': results_buckets[-1]['termination_condition'],
+    }
+
+    return results_relax_and_fix, results_buckets
+
+
+def solve_and_analyze_model_relax_and_fix(solver: Any, model_milp: ConcreteModel, planning_horizon: int, mip_gap_multiplier: int) -> tuple[dict, list, dict, list]:
+    """
+    Solves the LP relaxation of the model and then the MILP with relax-and-fix (see solve_relax_and_fix).
+    The LP relaxation is an upper bound of the optimal profit, so it is the bound of the results and the relative gap measures the optimality loss of the heuristic.
+
+    Args:
+        - solver (Any): a Pyomo solver instance.
+        - model_milp (ConcreteModel): the MILP Pyomo model.
+        - planning_horizon (int): size of the planning horizon.
+        - mip_gap_multiplier (int): multiplier to increase the mip gap of each bucket.
+
+    Returns:
+        Tuple[
+            dict: results of relax-and-fix (see solve_relax_and_fix), with the LP relaxation as bound,
+            list: model analytics (number of variables, constraints, etc.),
+            dict: results from solving the LP relaxation,
+            list: results of each bucket
+        ]
+    """
+
+    set_solver_options_milp(solver, mip_gap_multiplier)
+
+    if is_persistent_solver(solver):
+        solver.set_instance(model_milp)
+
+    model_analytics_milp = compute_num_variables_constraints(model_milp)
+
+    with relaxed_model_variables(model_milp, solver = solver):
+        results_lp = solve_model_record(solver, model_milp)
+
+    results_relax_and_fix, results_buckets = solve_relax_and_fix(solver, model_milp)
+    results_relax_and_fix['bound'] = results_lp['objective']
+    render_gantt_charts(planning_horizon, model_milp, ["X", "Y", "B"], "relax_and_fix")
+
+    return results_relax_and_fix, model_analytics_milp, results_lp, results_buckets
@@ -0,0 +1,208 @@
+from pyomo.environ import *
+import numpy as np
+from src.utils.utils import compute_num_variables_constraints
+from src.visualization.plot_results import render_gantt_charts
+from src.utils.output_policy import is_verbose
+from src.models.model_solve import set_solver_options_milp, is_persistent_solver, relaxed_model_variables, solve_model_record
+
+# Rolling horizon (see solve_and_analyze_model_rolling_horizon): each window covers ROLLING_WINDOW_LENGTH time points, and the first ROLLING_COMMIT_LENGTH of them are fixed before the next window
+ROLLING_WINDOW_LENGTH = 20
+ROLLING_COMMIT_LENGTH = 10
+
+# Task-unit variables fixed to 0 after the window and fixed to their values once committed, and the variables that are only fixed once committed
+TASK_UNIT_VARIABLES = ["V_X", "V_Y_Start", "V_Y_End", "V_B"]
+COMMITTED_VARIABLES = TASK_UNIT_VARIABLES + ["V_X_Hat_Idle"]
+
+
+def _get_time_point(index: Any) -> int:
+    """
+    Returns the time point of a variable or constraint index (its last element), or None if the index has no time point (e.g., the est constraints indexed by (i,j)).
+    """
+
+    time_point = index[-1] if isinstance(index, tuple) else index
+
+    return int(time_point) if isinstance(time_point, (int, np.integer)) else None
+
+
+def _group_by_time_point(components: list) -> dict:
+    """
+    Groups the data objects of the given indexed components by time point: {n: [data objects]}.
+    """
+
+    groups = {}
+
+    for component in components:
+        for index, data in component.items():
+            time_point = _get_time_point(index)
+            if time_point is not None:
+                groups.setdefault(time_point, []).append(data)
+
+    return groups
+
+
+def _restrict_to_window(variables_by_time: dict, constraints_by_time: dict, window_end: int, planning_horizon: int) -> list:
+    """
+    Truncates the model at the end of the window: the constraints after window_end are deactivated and the task-unit variables after it are fixed to 0.
+    As at the end of the planning horizon (see init_variables), X is also fixed to 0 at window_end, so the runs end inside the window.
+    Variables already fixed (e.g., by init_variables or by an earlier commit) are not changed.
+
+    Returns:
+        - list: the variables and constraints changed, to be restored by _restore_window.
+    """
+
+    changed = []
+
+    if window_end >= planning_horizon:
+        return changed
+
+    for n, constraints in constraints_by_time.items():
+        if n > window_end:
+            for constraint in constraints:
+                if constraint.active:
+                    constraint.deactivate()
+                    changed.append(constraint)
+
+    for n, variables in variables_by_time.items():
+        for var in variables:
+            if (n > window_end or (n == window_end and var.parent_component().name == "V_X")) and not var.fixed:
+                var.fix(0)
+                changed.append(var)
+
+    return changed
+
+
+def _restore_window(changed: list) -> None:
+    """
+    Undoes _restrict_to_window: activates the constraints and unfixes the variables that were changed.
+    """
+
+    for component in changed:
+        if component.ctype is Constraint:
+            component.activate()
+        else:
+            component.unfix()
+
+
+def _commit_time_points(committed_by_time: dict, first: int, last: int) -> list:
+    """
+    Fixes the task-unit and idle variables from time point first to last - 1 to their values in the solution of the window (binaries are rounded).
+
+    Returns:
+        - list: the variables fixed.
+    """
+
+    committed = []
+
+    for n in range(first, last):
+        for var in committed_by_time.get(n, []):
+            if not var.fixed and var.value is not None:
+                var.fix(round(var.value) if var.is_binary() else max(var.value, 0))
+                committed.append(var)
+
+    return committed
+
+
+def solve_rolling_horizon(solver: Any, model: ConcreteModel, window_length: int = ROLLING_WINDOW_LENGTH, commit_length: int = ROLLING_COMMIT_LENGTH) -> tuple[dict, list]:
+    """
+    Solves the MILP in overlapping windows of the planning horizon [s, s + window_length], with s = 0, commit_length, 2 * commit_length, ...
+    In each window, the time points before s are fixed to the solution of the previous windows, and the model is truncated after the window (see _restrict_to_window),
+    so the solver only decides the window. The time points [s, s + commit_length) are then fixed (committed) and the window rolls forward.
+    The constraints linking consecutive time points stay active across the window boundaries, so the inventories (V_S) and the runs and idle states in progress (V_X, V_X_Hat_Idle) are carried into the next window.
+    The formulation (e.g., its est constraints and upper bounds) is built once for the whole planning horizon and reused by all windows.
+    The task-unit variables fixed by the rolling horizon are unfixed at the end, keeping the values of the solution.
+
+    Args:
+        - solver (Any): a Pyomo solver instance (not persistent, or an appsi solver, which detects the fixed variables and deactivated constraints by itself).
+        - model (ConcreteModel): the MILP Pyomo model.
+        - window_length (int): number of time points of each window.
+        - commit_length (int): number of time points committed after each window (at most window_length).
+
+    Returns:
+        Tuple[
+            dict: results of the whole planning horizon (see solve_model_record), with the objective of the schedule of all windows and the sum of their solve times,
+            list: results of each window
+        ]
+    """
+
+    if not 1 <= commit_length <= window_length:
+        raise Exception(f"The commit length ({commit_length}) must be between 1 and the window length ({window_length}).")
+
+    planning_horizon = max(model.S_Time)
+    variables_by_time = _group_by_time_point([model.component(name) for name in TASK_UNIT_VARIABLES])
+    committed_by_time = _group_by_time_point([model.component(name) for name in COMMITTED_VARIABLES])
+    constraints_by_time = _group_by_time_point(list(model.component_objects(Constraint, active = True)))
+
+    results_windows = []
+    committed = []
+    window_start = 0
+
+    while True:
+
+        window_end = min(window_start + window_length, planning_horizon)
+        changed = _restrict_to_window(variables_by_time, constraints_by_time, window_end, planning_horizon)
+        results_window = solve_model_record(solver, model)
+        _restore_window(changed)
+
+        results_window['window'] = (window_start, window_end)
+        results_windows.append(results_window)
+
+        if is_verbose():
+            print(f"Rolling horizon window [{window_start}, {window_end}]: objective {results_window['objective']}, {results_window['termination_condition']}.")
+
+        if results_window['objective'] is None or window_end >= planning_horizon:
+            break
+
+        committed += _commit_time_points(committed_by_time, window_start, window_start + commit_length)
+        window_start += commit_length
+
+    objective = results_windows[-1]['objective']
+
+    for var in committed:
+        var.unfix()
+
+    results_rolling = {
+        'objective': value(model.C_Objective) if objective is not None else None,
+        'bound': None,
+        'time': sum(results_window['time'] for results_window in results_windows),
+        'status': results_windows[-1]['status'],
+        'termination_condition': results_windows[-1]['termination_condition'],
+    }
+
+    return results_rolling, results_windows
+
+
+def solve_and_analyze_model_rolling_horizon(solver: Any, model_milp: ConcreteModel, planning_horizon: int, mip_gap_multiplier: int) -> tuple[dict, list, dict, list]:
+    """
+    Solves the LP relaxation of the whole planning horizon and then the MILP with a rolling horizon (see solve_rolling_horizon).
+    The LP relaxation is an upper bound of the optimal profit, so the bound of the results is the LP relaxation and the relative gap measures the optimality loss of the rolling horizon.
+
+    Args:
+        - solver (Any): a Pyomo solver instance.
+        - model_milp (ConcreteModel): the MILP Pyomo model.
+        - planning_horizon (int): size of the planning horizon.
+        - mip_gap_multiplier (int): multiplier to increase the mip gap of each window.
+
+    Returns:
+        Tuple[
+            dict: results of the rolling horizon (see solve_rolling_horizon), with the LP relaxation as bound,
+            list: model analytics (number of variables, constraints, etc.),
+            dict: results from solving the LP relaxation,
+            list: results of each window
+        ]
+    """
+
+    set_solver_options_milp(solver, mip_gap_multiplier)
+
+    if is_persistent_solver(solver) and hasattr(solver, 'update_var'):
+        raise Exception("The rolling horizon needs a solver that is not persistent or an appsi solver (see define_solver).")
+
+    model_analytics_milp = compute_num_variables_constraints(model_milp)
+
+    with relaxed_model_variables(model_milp, solver = solver):
+        results_lp = solve_model_record(solver, model_milp)
+
+    results_rolling, results_windows = solve_rolling_horizon(solver, model_milp)
+    results_rolling['bound'] = results_lp['objective']
+    render_gantt_charts(planning_horizon, model_milp, ["X", "Y", "B"], "rolling")
+
+    return results_rolling, model_analytics_milp, results_lp, results_windows
@@ -1,104 +1,119 @@
 from pyomo.environ import *
 import numpy as np 
+from src.data.compact_instance import create_compact_instance, csr_row
+from src.utils.output_policy import is_verbose
 
-def init_set_all_tasks(UNIT_TASKS):
-    tasks = set()
-    keys_unit_task = UNIT_TASKS.keys() 
-    for unit, task in keys_unit_task:
-        tasks.add(task)        
-    return tasks
-    
-def init_set_all_units(UNIT_TASKS):
-    units = set()
-    keys_unit_task = UNIT_TASKS.keys() 
-    for unit, task in keys_unit_task:
-        units.add(unit)        
-    return units
-    
-def init_set_units_executing_task(model, UNIT_TASKS):
-    S_J_Executing_I = {task: set() for task in model.S_Tasks}
-    keys_unit_task = UNIT_TASKS.keys()
-    for unit, task in keys_unit_task:
-        S_J_Executing_I[task].add(unit)
-    return S_J_Executing_I
+#######################################################################################################
+# The sets are views over the compact instance (see create_compact_instance), built once per model,  #
+# so no set rescans UNIT_TASKS or TASKS_TRANSITION_TASKS.                                            #
+#######################################################################################################
 
-def init_set_materials(STATES):
-    materials = set()
-    keys_materials = STATES.keys()
-    for material in keys_materials:
-        materials.add(material)
-    return materials
+def _names(names, ids):
+    #Names of the IDs, without duplicates and in order of first appearance (ordered data source of the Pyomo sets).
+    return list(dict.fromkeys(names[index] for index in ids))
 
-def init_task_unit_network(UNIT_TASKS):
+def init_set_units_executing_task(instance):
+    S_J_Executing_I = {i: _names(instance['units'], instance['pair_unit'][csr_row(instance['units_of_task'], task)]) for task, i in enumerate(instance['tasks'])}
+    return S_J_Executing_I
+
+def init_task_unit_network(instance):
     #Equivalent to ij.
-    task_unit_network = {(i,j): UNIT_TASKS[(j,i)]['direction'] for (j,i) in UNIT_TASKS} 
+    task_unit_network = {(instance['tasks'][i], instance['units'][j]): int(direction) for i, j, direction in zip(instance['pair_task'], instance['pair_unit'], instance['direction'])} 
     return task_unit_network
 
-def init_task_transitions(TASKS_TRANSITION_TASKS):
+def init_set_task_unit_network(instance):
+    #(i,j) pairs of the network, ordered by task and unit.
+    order = np.lexsort((instance['pair_unit'], instance['pair_task']))
+    S_Task_Unit_Network = [(instance['tasks'][instance['pair_task'][pair]], instance['units'][instance['pair_unit'][pair]]) for pair in order]
+    return S_Task_Unit_Network
+
+def init_set_task_unit_time(model):
+    #(i,j,n) indices of the task-unit variables and constraints: the network pairs at every time point.
+    S_Task_Unit_Time = [(i,j,n) for (i,j) in model.S_Task_Unit_Network for n in model.S_Time]
+    return S_Task_Unit_Time
+
+def init_task_transitions(instance):
     #Equivalent ipits.
-    task_transitions = {(i,ii): TASKS_TRANSITION_TASKS[(i,ii)]['direction'] for (i,ii) in TASKS_TRANSITION_TASKS} 
+    task_transitions = {(instance['tasks'][i], instance['tasks'][ii]): int(direction) for i, ii, direction in zip(instance['transition_task'], instance['transition_subtask'], instance['transition_direction'])} 
     return task_transitions
 
-def init_task_prod_consump(ST_ARCS, TS_ARCS):
+def init_task_prod_consump(instance):
     #Equivalent ik.
-    P_TASKS_CONSUMP = {(i,k): -1 for (k,i) in ST_ARCS} 
-    P_TASKS_PROD = {(i,k): 1 for (i,k) in TS_ARCS} 
+    P_TASKS_CONSUMP = {(instance['tasks'][i], instance['materials'][k]): -1 for k, i in zip(instance['consumed_material'], instance['consuming_task'])} 
+    P_TASKS_PROD = {(instance['tasks'][i], instance['materials'][k]): 1 for i, k in zip(instance['producing_task'], instance['produced_material'])} 
     task_prod_consump = P_TASKS_CONSUMP | P_TASKS_PROD 
     return task_prod_consump
 
-def init_task_transitions_unit(UNIT_TASKS, TASKS_TRANSITION_TASKS):
-    #Equivalent to jii.
-    P_TASKS_TRANSITIONS = {(i,ii): TASKS_TRANSITION_TASKS[(i,ii)]['direction'] for (i,ii) in TASKS_TRANSITION_TASKS} 
-    P_TASK_UNIT = {(i,j): UNIT_TASKS[(j,i)]['direction'] for (j,i) in UNIT_TASKS} 
-    task_transitions_unit = {(j,i,ii): P_TASKS_TRANSITIONS[i,ii] for (j,i) in UNIT_TASKS for (j,ii) in UNIT_TASKS if (i,j) in P_TASK_UNIT if (ii,j) in P_TASK_UNIT if (i,ii) in P_TASKS_TRANSITIONS}
+def init_task_transitions_unit(instance):
+    #Equivalent to jii. Units executing both the task and its transition task, from the units of the transition task.
+    task_transitions_unit = {}
+    for i, ii, direction in zip(instance['transition_task'], instance['transition_subtask'], instance['transition_direction']):
+        units_i = set(instance['pair_unit'][csr_row(instance['units_of_task'], i)])
+        for j in instance['pair_unit'][csr_row(instance['units_of_task'], ii)]:
+            if j in units_i:
+                task_transitions_unit[instance['units'][j], instance['tasks'][i], instance['tasks'][ii]] = int(direction)
     return task_transitions_unit
 
-def init_set_tasks_in_units(model, UNIT_TASKS):
-    S_I_In_J = {j: set() for j in model.S_Units}
-    keys_unit_task = UNIT_TASKS.keys()
-    for (unit,task) in keys_unit_task:
-        S_I_In_J[unit].add(task)
+def init_set_tasks_in_units(instance):
+    S_I_In_J = {j: _names(instance['tasks'], instance['pair_task'][csr_row(instance['tasks_of_unit'], unit)]) for unit, j in enumerate(instance['units'])}
     return S_I_In_J
 
-def init_set_continuos_tasks(UNIT_TASKS):
-    S_I_Continuos_Tasks = set([i for (j,i) in UNIT_TASKS])
-    return S_I_Continuos_Tasks
-
-def init_set_production_tasks(model, UNIT_TASKS, TASKS_TRANSITION_TASKS):
+def init_set_production_tasks(instance):
     #Equivalent to ip.
-    S_I_Production_Tasks = set([i for (j,i) in UNIT_TASKS if all ((ii,i) not in TASKS_TRANSITION_TASKS for ii in model.S_Tasks)]) 
+    transition_tasks = set(instance['transition_subtask'])
+    S_I_Production_Tasks = [i for task, i in enumerate(instance['tasks']) if task not in transition_tasks]
     return S_I_Production_Tasks
 
-def init_set_tasks_consuming_material(STATES, ST_ARCS):
-    S_I_CONSUMING_K = {k: set() for k in STATES}
-    for (k,i) in ST_ARCS:
-        S_I_CONSUMING_K[k].add(i)
+def init_set_tasks_consuming_material(instance):
+    S_I_CONSUMING_K = {k: _names(instance['tasks'], instance['consuming_task'][csr_row(instance['consumers'], material)]) for material, k in enumerate(instance['materials'])}
     return S_I_CONSUMING_K
 
-def init_set_tasks_producing_material(STATES, TS_ARCS):
-    S_I_PRODUCING_K = {k: set() for k in STATES}
-    for (i,k) in TS_ARCS:
-        S_I_PRODUCING_K[k].add(i)
+def init_set_tasks_producing_material(instance):
+    S_I_PRODUCING_K = {k: _names(instance['tasks'], instance['producing_task'][csr_row(instance['producers'], material)]) for material, k in enumerate(instance['materials'])}
     return S_I_PRODUCING_K    
 
-def init_set_materials_produced_task(model, TS_ARCS):
-    S_K_PRODUCED_BY_I = {i: set() for i in model.S_Tasks} 
-    for (i,k) in TS_ARCS:
-        S_K_PRODUCED_BY_I[i].add(k)
-    return S_K_PRODUCED_BY_I
+def init_set_materials_produced_task(instance):
+    S_K_PRODUCED_BY_I = {i: [] for i in instance['tasks']} 
+    for i, k in zip(instance['producing_task'], instance['produced_material']):
+        S_K_PRODUCED_BY_I[instance['tasks'][i]].append(instance['materials'][k])
+    return {i: list(dict.fromkeys(materials)) for i, materials in S_K_PRODUCED_BY_I.items()}
+
+def init_set_materials_consumed_task(instance):
+    S_K_CONSUMED_BY_I = {i: [] for i in instance['tasks']} 
+    for k, i in zip(instance['consumed_material'], instance['consuming_task']):
+        S_K_CONSUMED_BY_I[instance['tasks'][i]].append(instance['materials'][k])
+    return {i: list(dict.fromkeys(materials)) for i, materials in S_K_CONSUMED_BY_I.items()}  
+
+def _init_set_task_units_material(instance, tasks, materials, is_selected):
+    #(i,j,tau) of every selected task-unit pair of the arcs (tasks, materials), grouped by material.
+    S_IJ_K = {k: [] for k in instance['materials']}
+    for i, k in zip(tasks, materials):
+        if is_selected[i]:
+            for pair in csr_row(instance['units_of_task'], i):
+                S_IJ_K[instance['materials'][k]].append((instance['tasks'][i], instance['units'][instance['pair_unit'][pair]], int(instance['tau'][pair])))
+    return S_IJ_K
+
+def init_set_task_units_consuming_material(instance):
+    #(i,j,tau) of every task-unit pair consuming material k.
+    is_selected = np.ones(len(instance['tasks']), dtype = bool)
+    return _init_set_task_units_material(instance, instance['consuming_task'], instance['consumed_material'], is_selected)
+
+def init_set_production_task_units_producing_material(model, instance):
+    #(i,j,tau) of every production task-unit pair producing material k. Material is released tau periods after the batch.
+    is_selected = np.array([i in model.S_I_Production_Tasks for i in instance['tasks']], dtype = bool)
+    return _init_set_task_units_material(instance, instance['producing_task'], instance['produced_material'], is_selected)
 
-def init_set_materials_consumed_task(model, ST_ARCS):
-    S_K_CONSUMED_BY_I = {i: set() for i in model.S_Tasks} 
-    for (k,i) in ST_ARCS:
-        S_K_CONSUMED_BY_I[i].add(k)
-    return S_K_CONSUMED_BY_I  
+def init_set_transition_task_units_producing_material(model, instance):
+    #(i,j,tau) of every transition task-unit pair producing material k. Material is released during the tau periods after the batch.
+    is_selected = np.array([i in model.S_I_All_Transition_Tasks for i in instance['tasks']], dtype = bool)
+    return _init_set_task_units_material(instance, instance['producing_task'], instance['produced_material'], is_selected)
 
-def init_set_production_tasks_with_transitions(TASKS_TRANSITION_TASKS):
-    S_I_Production_Tasks_With_Transition = set([i for (i,ii) in TASKS_TRANSITION_TASKS]) 
+def init_set_production_tasks_with_transitions(instance):
+    S_I_Production_Tasks_With_Transition = _names(instance['tasks'], instance['transition_task'])
     return S_I_Production_Tasks_With_Transition
 
-def init_set_all_transitions(TASKS_TRANSITION_TASKS):
-    S_I_All_Transition_Tasks = set([ii for (i,ii) in TASKS_TRANSITION_TASKS]) 
+def init_set_all_transitions(instance):
+    S_I_All_Transition_Tasks = _names(instance['tasks'], instance['transition_subtask'])
     return S_I_All_Transition_Tasks
 
 def init_set_production_tasks_without_transition(model):
@@ -106,44 +121,49 @@ def init_set_production_tasks_without_transition(model):
     S_I_Production_Tasks_Without_Transition = model.S_Tasks - model.S_I_Production_Tasks_With_Transition - model.S_I_All_Transition_Tasks 
     return S_I_Production_Tasks_Without_Transition
 
-def init_set_direct_transition_tasks(TASKS_TRANSITION_TASKS):
+def init_set_production_tasks_with_direct_transition(instance):
+    #Equivalent to ip_d.
+    S_I_Production_Tasks_With_Direct_Transition = _names(instance['tasks'], instance['transition_task'][instance['is_direct']])
+    return S_I_Production_Tasks_With_Direct_Transition
+
+def init_set_production_tasks_with_indirect_transition(instance):
+    #Equivalent to ip_i.
+    S_I_Production_Tasks_With_Indirect_Transition = _names(instance['tasks'], instance['transition_task'][~instance['is_direct']])
+    return S_I_Production_Tasks_With_Indirect_Transition
+
+def init_set_direct_transition_tasks(instance):
     #Equivalent to i_ts_d.
-    S_I_Direct_Transition_Tasks = set([i for (ii,i) in TASKS_TRANSITION_TASKS if (TASKS_TRANSITION_TASKS[(ii,i)]['isDirect'] == True)]) 
+    S_I_Direct_Transition_Tasks = _names(instance['tasks'], instance['transition_subtask'][instance['is_direct']])
     return S_I_Direct_Transition_Tasks
 
-def init_set_indirect_transition_tasks(TASKS_TRANSITION_TASKS):
+def init_set_indirect_transition_tasks(instance):
     #Equivalent to i_ts_i.
-    S_I_Indirect_Transition_Tasks = set([i for (ii,i) in TASKS_TRANSITION_TASKS if (TASKS_TRANSITION_TASKS[(ii,i)]['isDirect'] == False)]) 
+    S_I_Indirect_Transition_Tasks = _names(instance['tasks'], instance['transition_subtask'][~instance['is_direct']])
     return S_I_Indirect_Transition_Tasks
 
-def init_set_startup_tasks(TASKS_TRANSITION_TASKS):
+def init_set_startup_tasks(instance):
     #Equivalent to i_ts_su.
-    S_I_Startup_Tasks = set([i for (ii,i) in TASKS_TRANSITION_TASKS if (TASKS_TRANSITION_TASKS[(ii,i)]['isDirect'] == False and TASKS_TRANSITION_TASKS[(ii,i)]['isSU'] == True) ]) 
+    S_I_Startup_Tasks = _names(instance['tasks'], instance['transition_subtask'][~instance['is_direct'] & instance['is_startup']])
     return S_I_Startup_Tasks
 
-def init_set_shutdown_tasks(TASKS_TRANSITION_TASKS):
+def init_set_shutdown_tasks(instance):
     #Equivalent to i_ts_su.
-    S_I_Shutdown_Tasks = set([i for (ii,i) in TASKS_TRANSITION_TASKS if (TASKS_TRANSITION_TASKS[(ii,i)]['isDirect'] == False and TASKS_TRANSITION_TASKS[(ii,i)]['isSD'] == True) ]) 
+    S_I_Shutdown_Tasks = _names(instance['tasks'], instance['transition_subtask'][~instance['is_direct'] & instance['is_shutdown']])
     return S_I_Shutdown_Tasks
 
-def init_set_production_tasks_with_direct_transition(TASKS_TRANSITION_TASKS):
-    #Equivalent to ip_d.
-    S_I_Production_Tasks_With_Direct_Transition = set([i for (i,ii) in TASKS_TRANSITION_TASKS if (TASKS_TRANSITION_TASKS[(i,ii)]['isDirect'] == True)]) 
-    return S_I_Production_Tasks_With_Direct_Transition
-
-def init_set_production_tasks_with_indirect_transition(TASKS_TRANSITION_TASKS):
-    #Equivalent to ip_i.
-    S_I_Production_Tasks_With_Indirect_Transition = set([i for (i,ii) in TASKS_TRANSITION_TASKS if (TASKS_TRANSITION_TASKS[(i,ii)]['isDirect'] == False)]) 
-    return S_I_Production_Tasks_With_Indirect_Transition
+def _init_set_units_executing_tasks(instance, tasks):
+    #Units executing any of the tasks.
+    is_selected = np.array([i in tasks for i in instance['tasks']], dtype = bool)
+    return _names(instance['units'], instance['pair_unit'][is_selected[instance['pair_task']]])
 
-def init_set_units_with_direct_transition_tasks(model, UNIT_TASKS):
+def init_set_units_with_direct_transition_tasks(model, instance):
     #Equivalent to j_d.
-    S_J_Units_With_Direct_Transition_Tasks = set([j for (j,i) in UNIT_TASKS if i in model.S_I_Production_Tasks_With_Direct_Transition]) 
+    S_J_Units_With_Direct_Transition_Tasks = _init_set_units_executing_tasks(instance, model.S_I_Production_Tasks_With_Direct_Transition)
     return S_J_Units_With_Direct_Transition_Tasks
 
-def init_set_units_with_shutdown_tasks(model, UNIT_TASKS):
+def init_set_units_with_shutdown_tasks(model, instance):
     #Equivalent to j_i.
-    S_J_Units_With_Shutdown_Tasks = set([j for (j,i) in UNIT_TASKS if i in model.S_I_Indirect_Transition_Tasks]) 
+    S_J_Units_With_Shutdown_Tasks = _init_set_units_executing_tasks(instance, model.S_I_Indirect_Transition_Tasks)
     return S_J_Units_With_Shutdown_Tasks
 
 def init_set_units_without_transition_tasks(model):
@@ -151,95 +171,101 @@ def init_set_units_without_transition_tasks(model):
     #S_J_Units_Without_Transition_Tasks = model.S_Units - model.S_J_Units_With_Direct_Transition_Tasks - model.S_J_Units_With_Shutdown_Tasks 
     return (model.S_Units - model.S_J_Units_With_Direct_Transition_Tasks - model.S_J_Units_With_Shutdown_Tasks)
 
-def init_set_raw_material(STATES):
-    S_K_RawMaterials = set([k for k in STATES if STATES[k]['isRM'] == True])    
+def init_set_raw_material(instance):
+    S_K_RawMaterials = _names(instance['materials'], np.flatnonzero(instance['is_raw_material']))
     return S_K_RawMaterials
 
-def init_set_final_products(STATES):
+def init_set_final_products(instance):
     #Equivalent rmp.
-    S_K_Final_Products = set([k for k in STATES if STATES[k]['isProd'] == True])
+    S_K_Final_Products = _names(instance['materials'], np.flatnonzero(instance['is_final_product']))
     return S_K_Final_Products
 
-def init_set_intermidiates(STATES):
+def init_set_intermidiates(instance):
     #Equivalent rmi.
-    S_K_Intermediates = set([k for k in STATES if STATES[k]['isIntermed'] == True])
+    S_K_Intermediates = _names(instance['materials'], np.flatnonzero(instance['is_intermediate']))
     return S_K_Intermediates
 
 
 def create_main_sets_parameters(model, STN, H):
     
-    STATES = STN['STATES']
-    ST_ARCS = STN['ST_ARCS']
-    TS_ARCS = STN['TS_ARCS']
-    UNIT_TASKS = STN['UNIT_TASKS']
-    TASKS_TRANSITION_TASKS = STN['TASKS_TRANSITION_TASKS']
+    instance = create_compact_instance(STN)
         
-    model.S_Tasks = Set(initialize = init_set_all_tasks(UNIT_TASKS))
-    model.S_Units = Set(initialize = init_set_all_units(UNIT_TASKS))
+    model.S_Tasks = Set(initialize = instance['tasks'])
+    model.S_Units = Set(initialize = instance['units'])
     model.S_Time = Set(initialize = np.array(range(0, H+1)))
-    model.S_Materials = Set(initialize = init_set_materials(STATES))    
-    model.S_J_Executing_I = Set(model.S_Tasks, initialize = init_set_units_executing_task(model, UNIT_TASKS))
-    model.S_I_In_J = Set(model.S_Units, initialize = init_set_tasks_in_units(model, UNIT_TASKS))    
-    model.S_I_Continuos_Tasks = Set(initialize = init_set_continuos_tasks(UNIT_TASKS))
-    model.S_I_Production_Tasks = Set(initialize = init_set_production_tasks(model, UNIT_TASKS, TASKS_TRANSITION_TASKS))    
-    model.S_I_Consuming_K = Set(model.S_Materials, initialize = init_set_tasks_consuming_material(STATES, ST_ARCS))    
-    model.S_I_Producing_K = Set(model.S_Materials, initialize = init_set_tasks_producing_material(STATES, TS_ARCS))    
-    model.S_K_Produced_I = Set(model.S_Tasks, initialize = init_set_materials_produced_task(model, TS_ARCS))
-    model.S_K_Consumed_I = Set(model.S_Tasks, initialize = init_set_materials_consumed_task(model, ST_ARCS))    
-    model.S_I_Production_Tasks_With_Transition = Set(initialize = init_set_production_tasks_with_transitions(TASKS_TRANSITION_TASKS))
-    model.S_I_Production_Tasks_With_Direct_Transition = Set(initialize = init_set_production_tasks_with_direct_transition(TASKS_TRANSITION_TASKS)) 
-    model.S_I_Production_Tasks_With_Indirect_Transition = Set(initialize = init_set_production_tasks_with_indirect_transition(TASKS_TRANSITION_TASKS))
-    model.S_I_All_Transition_Tasks = Set(initialize = init_set_all_transitions(TASKS_TRANSITION_TASKS))
+    model.S_Materials = Set(initialize = instance['materials'])    
+    model.S_J_Executing_I = Set(model.S_Tasks, initialize = init_set_units_executing_task(instance))
+    model.S_Task_Unit_Network = Set(dimen = 2, initialize = init_set_task_unit_network(instance))
+    model.S_Task_Unit_Time = Set(dimen = 3, initialize = init_set_task_unit_time(model))
+    model.S_I_In_J = Set(model.S_Units, initialize = init_set_tasks_in_units(instance))    
+    model.S_I_Continuos_Tasks = Set(initialize = instance['tasks'])
+    model.S_I_Production_Tasks = Set(initialize = init_set_production_tasks(instance))    
+    model.S_I_Consuming_K = Set(model.S_Materials, initialize = init_set_tasks_consuming_material(instance))    
+    model.S_I_Producing_K = Set(model.S_Materials, initialize = init_set_tasks_producing_material(instance))    
+    model.S_K_Produced_I = Set(model.S_Tasks, initialize = init_set_materials_produced_task(instance))
+    model.S_K_Consumed_I = Set(model.S_Tasks, initialize = init_set_materials_consumed_task(instance))    
+    model.S_I_Production_Tasks_With_Transition = Set(initialize = init_set_production_tasks_with_transitions(instance))
+    model.S_I_Production_Tasks_With_Direct_Transition = Set(initialize = init_set_production_tasks_with_direct_transition(instance)) 
+    model.S_I_Production_Tasks_With_Indirect_Transition = Set(initialize = init_set_production_tasks_with_indirect_transition(instance))
+    model.S_I_All_Transition_Tasks = Set(initialize = init_set_all_transitions(instance))
     model.S_I_Production_Tasks_Without_Transition = Set(initialize = init_set_production_tasks_without_transition(model))
-    model.S_I_Direct_Transition_Tasks = Set(initialize = init_set_direct_transition_tasks(TASKS_TRANSITION_TASKS))
-    model.S_I_Indirect_Transition_Tasks = Set(initialize = init_set_indirect_transition_tasks(TASKS_TRANSITION_TASKS))
-    model.S_I_Startup_Tasks = Set(initialize = init_set_startup_tasks(TASKS_TRANSITION_TASKS))
-    model.S_I_Shutdown_Tasks = Set(initialize = init_set_shutdown_tasks(TASKS_TRANSITION_TASKS))
+    model.S_I_Direct_Transition_Tasks = Set(initialize = init_set_direct_transition_tasks(instance))
+    model.S_I_Indirect_Transition_Tasks = Set(initialize = init_set_indirect_transition_tasks(instance))
+    model.S_I_Startup_Tasks = Set(initialize = init_set_startup_tasks(instance))
+    model.S_I_Shutdown_Tasks = Set(initialize = init_set_shutdown_tasks(instance))
+    model.S_IJ_Consuming_K = Set(model.S_Materials, dimen = 3, initialize = init_set_task_units_consuming_material(instance))
+    model.S_IJ_Production_Producing_K = Set(model.S_Materials, dimen = 3, initialize = init_set_production_task_units_producing_material(model, instance))
+    model.S_IJ_Transition_Producing_K = Set(model.S_Materials, dimen = 3, initialize = init_set_transition_task_units_producing_material(model, instance))
     
-    model.S_J_Units_With_Direct_Transition_Tasks = Set(initialize = init_set_units_with_direct_transition_tasks(model, UNIT_TASKS))  
-    model.S_J_Units_With_Shutdown_Tasks = Set(initialize = init_set_units_with_shutdown_tasks(model, UNIT_TASKS))  
+    model.S_J_Units_With_Direct_Transition_Tasks = Set(initialize = init_set_units_with_direct_transition_tasks(model, instance))  
+    model.S_J_Units_With_Shutdown_Tasks = Set(initialize = init_set_units_with_shutdown_tasks(model, instance))  
     model.S_J_Units_Without_Transition_Tasks = Set(initialize = init_set_units_without_transition_tasks(model))
     model.S_J_Units_With_Indirect_Direct_Tasks = Set(initialize = model.S_J_Units_With_Direct_Transition_Tasks & model.S_J_Units_With_Shutdown_Tasks)
-    model.S_Raw_Materials = Set(initialize = init_set_raw_material(STATES))
-    model.S_Final_Products = Set(initialize = init_set_final_products(STATES)) 
-    model.S_Intermediates = Set(initialize = init_set_intermidiates(STATES)) 
+    model.S_Raw_Materials = Set(initialize = init_set_raw_material(instance))
+    model.S_Final_Products = Set(initialize = init_set_final_products(instance)) 
+    model.S_Intermediates = Set(initialize = init_set_intermidiates(instance)) 
     
-    model.P_Task_Unit_Network = Param(model.S_Tasks, model.S_Units, initialize = init_task_unit_network(UNIT_TASKS))
-    model.P_Task_Transitions = Param(model.S_Tasks, model.S_Tasks, initialize = init_task_transitions(TASKS_TRANSITION_TASKS))
-    model.P_Task_Production_Comsumption = Param(model.S_Tasks, model.S_Materials, initialize = init_task_prod_consump(ST_ARCS, TS_ARCS))
-    model.P_Task_Transitions_Unit = Param(model.S_Units, model.S_Tasks, model.S_Tasks, initialize = init_task_transitions_unit(UNIT_TASKS, TASKS_TRANSITION_TASKS))      
+    model.P_Task_Unit_Network = Param(model.S_Tasks, model.S_Units, initialize = init_task_unit_network(instance))
+    model.P_Task_Transitions = Param(model.S_Tasks, model.S_Tasks, initialize = init_task_transitions(instance))
+    model.P_Task_Production_Comsumption = Param(model.S_Tasks, model.S_Materials, initialize = init_task_prod_consump(instance))
+    model.P_Task_Transitions_Unit = Param(model.S_Units, model.S_Tasks, model.S_Tasks, initialize = init_task_transitions_unit(instance))      
 
         
-    print(f"S_Tasks: {model.S_Tasks.data()}")
-    print(f"S_Units: {model.S_Units.data()}")
-    print(f"S_Time: {model.S_Time.data()}")
-    print(f"S_Materials: {model.S_Materials.data()}") 
-    print(f"S_J_Executing_I: {model.S_J_Executing_I.data()}")
-    print(f"S_I_In_J: {model.S_I_In_J.data()}")   
-    print(f"S_I_Continuos_Tasks: {model.S_I_Continuos_Tasks.data()}")
-    print(f"S_I_Production_Tasks: {model.S_I_Production_Tasks.data()}")    
-    print(f"S_I_Consuming_K: {model.S_I_Consuming_K.data()}") 
-    print(f"S_I_Producing_K: {model.S_I_Producing_K.data()}") 
-    print(f"S_K_Produced_I: {model.S_K_Produced_I.data()}")
-    print(f"S_K_Consumed_I: {model.S_K_Consumed_I.data()}")
-    print(f"S_I_Production_Tasks_With_Transition: {model.S_I_Production_Tasks_With_Transition.data()}")
-    print(f"S_I_Production_Tasks_With_Direct_Transition: {model.S_I_Production_Tasks_With_Direct_Transition.data()}") 
-    print(f"S_I_Production_Tasks_With_Indirect_Transition: {model.S_I_Production_Tasks_With_Indirect_Transition.data()}")
-    print(f"S_I_All_Transition_Tasks: {model.S_I_All_Transition_Tasks.data()}")
-    print(f"S_I_Production_Tasks_Without_Transition: {model.S_I_Production_Tasks_Without_Transition.data()}")
-    print(f"S_I_Direct_Transition_Tasks: {model.S_I_Direct_Transition_Tasks.data()}")
-    print(f"S_I_Indirect_Transition_Tasks: {model.S_I_Indirect_Transition_Tasks.data()}")
-    print(f"S_I_Startup_Tasks: {model.S_I_Startup_Tasks.data()}")
-    print(f"S_I_Shutdown_Tasks: {model.S_I_Shutdown_Tasks.data()}")
-    print(f"S_J_Units_With_Direct_Transition_Tasks: {model.S_J_Units_With_Direct_Transition_Tasks.data()}") 
-    print(f"S_J_Units_With_Shutdown_Tasks: {model.S_J_Units_With_Shutdown_Tasks.data()}") 
-    print(f"S_J_Units_Without_Transition_Tasks: {model.S_J_Units_Without_Transition_Tasks.data()}")
-    print(f"S_J_Units_With_Indirect_Direct_Tasks: {model.S_J_Units_With_Indirect_Direct_Tasks.data()}")
-    print(f"S_Raw_Materials: {model.S_Raw_Materials.data()}")
-    print(f"S_Final_Products: {model.S_Final_Products.data()}") 
-    print(f"S_Intermediates: {model.S_Intermediates.data()}")
+    if is_verbose():
+        print(f"S_Tasks: {model.S_Tasks.data()}")
+        print(f"S_Units: {model.S_Units.data()}")
+        print(f"S_Time: {model.S_Time.data()}")
+        print(f"S_Materials: {model.S_Materials.data()}") 
+        print(f"S_J_Executing_I: {model.S_J_Executing_I.data()}")
+        print(f"S_Task_Unit_Network: {model.S_Task_Unit_Network.data()}")
+        print(f"S_I_In_J: {model.S_I_In_J.data()}")   
+        print(f"S_I_Continuos_Tasks: {model.S_I_Continuos_Tasks.data()}")
+        print(f"S_I_Production_Tasks: {model.S_I_Production_Tasks.data()}")    
+        print(f"S_I_Consuming_K: {model.S_I_Consuming_K.data()}") 
+        print(f"S_I_Producing_K: {model.S_I_Producing_K.data()}") 
+        print(f"S_K_Produced_I: {model.S_K_Produced_I.data()}")
+        print(f"S_K_Consumed_I: {model.S_K_Consumed_I.data()}")
+        print(f"S_I_Production_Tasks_With_Transition: {model.S_I_Production_Tasks_With_Transition.data()}")
+        print(f"S_I_Production_Tasks_With_Direct_Transition: {model.S_I_Production_Tasks_With_Direct_Transition.data()}") 
+        print(f"S_I_Production_Tasks_With_Indirect_Transition: {model.S_I_Production_Tasks_With_Indirect_Transition.data()}")
+        print(f"S_I_All_Transition_Tasks: {model.S_I_All_Transition_Tasks.data()}")
+        print(f"S_I_Production_Tasks_Without_Transition: {model.S_I_Production_Tasks_Without_Transition.data()}")
+        print(f"S_I_Direct_Transition_Tasks: {model.S_I_Direct_Transition_Tasks.data()}")
+        print(f"S_I_Indirect_Transition_Tasks: {model.S_I_Indirect_Transition_Tasks.data()}")
+        print(f"S_I_Startup_Tasks: {model.S_I_Startup_Tasks.data()}")
+        print(f"S_I_Shutdown_Tasks: {model.S_I_Shutdown_Tasks.data()}")
+        print(f"S_IJ_Consuming_K: {model.S_IJ_Consuming_K.data()}")
+        print(f"S_IJ_Production_Producing_K: {model.S_IJ_Production_Producing_K.data()}")
+        print(f"S_IJ_Transition_Producing_K: {model.S_IJ_Transition_Producing_K.data()}")
+        print(f"S_J_Units_With_Direct_Transition_Tasks: {model.S_J_Units_With_Direct_Transition_Tasks.data()}") 
+        print(f"S_J_Units_With_Shutdown_Tasks: {model.S_J_Units_With_Shutdown_Tasks.data()}") 
+        print(f"S_J_Units_Without_Transition_Tasks: {model.S_J_Units_Without_Transition_Tasks.data()}")
+        print(f"S_J_Units_With_Indirect_Direct_Tasks: {model.S_J_Units_With_Indirect_Direct_Tasks.data()}")
+        print(f"S_Raw_Materials: {model.S_Raw_Materials.data()}")
+        print(f"S_Final_Products: {model.S_Final_Products.data()}") 
+        print(f"S_Intermediates: {model.S_Intermediates.data()}")
         
-    model.P_Task_Unit_Network.pprint()
-    model.P_Task_Transitions.pprint()
-    model.P_Task_Production_Comsumption.pprint() 
-    model.P_Task_Transitions_Unit.pprint()
\ No newline at end of file
+        model.P_Task_Unit_Network.pprint()
+        model.P_Task_Transitions.pprint()
+        model.P_Task_Production_Comsumption.pprint() 
+        model.P_Task_Transitions_Unit.pprint()
\ No newline at end of file
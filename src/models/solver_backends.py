@@ -0,0 +1,149 @@
+import math
+from pyomo.opt import SolverResults
+
+
+# Solver backends by name:
+#   - "solver_name" and "persistent_solver_name": names in the Pyomo SolverFactory. The persistent interface keeps the MILP loaded, so the LP relaxation is solved in place.
+#     Backends without a persistent interface use the same solver for both.
+#   - "options": option names of the backend for the generic options (None if the backend has no such option).
+#   - "root_node_limit": value of the node_limit option that stops the MILP after the root node (HiGHS counts the root node, the others count the nodes after it).
+#   - "warm_start": True if the Pyomo interface of the backend passes the values of the variables to the solver as a MIP start (see WARM_START_FLAG in src/methods/warm_start.py).
+SOLVER_BACKENDS = {
+    "gurobi": {
+        "solver_name": "gurobi",
+        "persistent_solver_name": "gurobi_persistent",
+        "options": {"mip_gap": "MIPGap", "time_limit": "TimeLimit", "threads": "Threads", "node_limit": "NodeLimit"},
+        "root_node_limit": 0,
+        "warm_start": True,
+    },
+    "highs": {
+        "solver_name": "appsi_highs",
+        "persistent_solver_name": "appsi_highs",
+        "options": {"mip_gap": "mip_rel_gap", "time_limit": "time_limit", "threads": "threads", "node_limit": "mip_max_nodes"},
+        "root_node_limit": 1,
+        "warm_start": False,
+    },
+    "cbc": {
+        "solver_name": "cbc",
+        "persistent_solver_name": "cbc",
+        "options": {"mip_gap": "ratioGap", "time_limit": "seconds", "threads": "threads", "node_limit": "maxNodes"},
+        "root_node_limit": 0,
+        "warm_start": True,
+    },
+    "glpk": {
+        "solver_name": "glpk",
+        "persistent_solver_name": "glpk",
+        "options": {"mip_gap": "mipgap", "time_limit": "tmlim", "threads": None, "node_limit": None},
+        "root_node_limit": None,
+        "warm_start": False,
+    },
+}
+
+
+def get_solver_backend(backend: str) -> dict:
+    """
+    Returns the settings of a solver backend (see SOLVER_BACKENDS).
+
+    Args:
+        - backend (str): name of the backend (e.g., "gurobi", "highs").
+
+    Returns:
+        - dict: the settings of the backend.
+    """
+
+    if backend not in SOLVER_BACKENDS:
+        raise Exception(f"Solver backend {backend} is not recognized.")
+
+    return SOLVER_BACKENDS[backend]
+
+
+def set_backend_option(solver, backend: str, option: str, value) -> bool:
+    """
+    Sets a generic option (mip_gap, time_limit, threads or node_limit) on a solver of the given backend, under the option name of the backend.
+
+    Args:
+        - solver (Any): Pyomo solver instance.
+        - backend (str): name of the backend of the solver.
+        - option (str): generic option name.
+        - value (Any): option value.
+
+    Returns:
+        - bool: False if the backend has no such option (the option is not set).
+    """
+
+    option_name = get_solver_backend(backend)["options"][option]
+
+    if option_name is None:
+        return False
+
+    solver.options[option_name] = value
+
+    return True
+
+
+def _finite_or_none(value) -> float:
+    """
+    Returns the value as a float, or None if it is missing or not finite (e.g., the bound of a solve without a solution).
+    """
+
+    if value is None:
+        return None
+
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+
+    return value if math.isfinite(value) else None
+
+
+def normalize_solver_results(results: SolverResults, wall_time: float) -> dict:
+    """
+    Normalizes the Pyomo results of any backend into the record used by the matrix backend (see _solve_matrix_model_gurobi), so results are compared across backends in one format.
+
+    Args:
+        - results (SolverResults): results of a Pyomo solve.
+        - wall_time (float): measured solve time in seconds, used if the solver does not report it.
+
+    Returns:
+        - dict: objective (best solution), bound, time, status and termination condition of the solve.
+    """
+
+    objective, bound = results.problem.lower_bound, results.problem.upper_bound
+
+    if str(results.problem.sense) == "minimize":
+        objective, bound = bound, objective
+
+    solver_time = _finite_or_none(getattr(results.solver, "time", None))
+
+    return {
+        'objective': _finite_or_none(objective),
+        'bound': _finite_or_none(bound),
+        'time': solver_time if solver_time is not None else wall_time,
+        'status': str(results.solver.status),
+        'termination_condition': str(results.solver.termination_condition),
+    }
+
+
+def get_node_count(solver, backend: str) -> int:
+    """
+    Returns the number of branch and bound nodes explored by the last MILP solve of a persistent solver of the given backend (used to compare node throughput, see benchmark_cut_separation.py).
+
+    Args:
+        - solver (Any): persistent Pyomo solver instance (gurobi_persistent or appsi_highs).
+        - backend (str): name of the backend of the solver.
+
+    Returns:
+        - int: number of nodes, or None if the backend does not report it (e.g., solvers that are not persistent).
+    """
+
+    solver_model = getattr(solver, "_solver_model", None)
+
+    if solver_model is None:
+        return None
+    elif backend == "gurobi":
+        return int(solver_model.NodeCount)
+    elif backend == "highs":
+        return int(solver_model.getInfo().mip_node_count)
+
+    return None
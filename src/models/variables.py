@@ -7,22 +7,23 @@ RUNS_NEED_TO_FINISH_FLAG = True
 def create_variables(model: ConcreteModel) -> None:
     """ 
     Creates model variables.
+    Task-unit variables are only created for the pairs (i,j) of the network (S_Task_Unit_Time).
     
     Args:
         model: a Pyomo ConcreteModel object.
     """
     
     # Binary: V_X[i,j,n] = 1 if unit j processes (sub)task i at time point n.
-    model.V_X = Var(model.S_Tasks, model.S_Units, model.S_Time, bounds = (0, 1), domain = Binary)
+    model.V_X = Var(model.S_Task_Unit_Time, bounds = (0, 1), domain = Binary)
 
     # Binary: V_Y_End[i,j,n] = 1 if a run of a continuous task in unit j ends at time point n.
-    model.V_Y_End = Var(model.S_Tasks, model.S_Units, model.S_Time, bounds = (0, 1), domain = Binary)
+    model.V_Y_End = Var(model.S_Task_Unit_Time, bounds = (0, 1), domain = Binary)
 
     # Binary: V_Y_Start[i,j,n] = 1 if a run of a continuous task in unit j starts at time point n.
-    model.V_Y_Start = Var(model.S_Tasks, model.S_Units, model.S_Time, bounds = (0, 1), domain = Binary)
+    model.V_Y_Start = Var(model.S_Task_Unit_Time, bounds = (0, 1), domain = Binary)
 
     # Continuous: V_B[i,j,n] is the batch size assigned to task i in unit j at time n.
-    model.V_B = Var(model.S_Tasks, model.S_Units, model.S_Time, domain = NonNegativeReals)
+    model.V_B = Var(model.S_Task_Unit_Time, domain = NonNegativeReals)
 
     # Continuous: V_S[k,n] is the inventory of material k in time n.
     model.V_S = Var(model.S_Materials, model.S_Time, domain = NonNegativeReals)
@@ -0,0 +1,82 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Output policies:
+#   - "headless": batch runs, no plots, no solver logs and no debug prints (default).
+#   - "verbose": debug prints, solver logs and interactive (blocking) Gantt charts.
+#   - "artifacts": headless, but Gantt charts are rendered to files in the background after each solve.
+OUTPUT_POLICIES = ["headless", "verbose", "artifacts"]
+
+# Folder where charts are written in the "artifacts" policy
+ARTIFACTS_FOLDER = "src/results/artifacts"
+
+# Current output settings, changed with set_output_policy
+_OUTPUT_SETTINGS = {"policy": "headless", "run_name": "run"}
+
+# Background renderer for the "artifacts" policy, created on first use
+_RENDERER = {"executor": None, "futures": []}
+
+
+def set_output_policy(policy: str, run_name: str = "run") -> None:
+    """
+    Sets the output policy of the current process.
+
+    Args:
+        - policy (str): one of OUTPUT_POLICIES.
+        - run_name (str): prefix of the files written in the "artifacts" policy (e.g., run_00001).
+    """
+
+    if policy not in OUTPUT_POLICIES:
+        raise Exception(f"Output policy {policy} is not recognized.")
+
+    _OUTPUT_SETTINGS["policy"] = policy
+    _OUTPUT_SETTINGS["run_name"] = run_name
+
+
+def is_verbose() -> bool:
+    """
+    Returns:
+        - bool: True if debug prints, solver logs and interactive charts are enabled.
+    """
+
+    return _OUTPUT_SETTINGS["policy"] == "verbose"
+
+
+def is_artifacts() -> bool:
+    """
+    Returns:
+        - bool: True if charts are rendered to files.
+    """
+
+    return _OUTPUT_SETTINGS["policy"] == "artifacts"
+
+
+def submit_artifact(render_function, file_name: str, *args) -> None:
+    """
+    Renders an artifact in a background thread, as render_function(*args, file_path).
+    The arguments must not depend on the Pyomo model, which may change while the artifact is rendered.
+
+    Args:
+        - render_function (callable): function that writes the artifact to file_path.
+        - file_name (str): name of the file, prefixed with the run name.
+        - args: arguments of render_function.
+    """
+
+    if _RENDERER["executor"] is None:
+        os.makedirs(ARTIFACTS_FOLDER, exist_ok = True)
+        _RENDERER["executor"] = ThreadPoolExecutor(max_workers = 1)
+
+    file_path = os.path.join(ARTIFACTS_FOLDER, f"{_OUTPUT_SETTINGS['run_name']}_{file_name}")
+    _RENDERER["futures"].append(_RENDERER["executor"].submit(render_function, *args, file_path))
+
+
+def wait_for_artifacts() -> None:
+    """
+    Waits until all submitted artifacts are written. Errors while rendering are raised here.
+    """
+
+    futures, _RENDERER["futures"] = _RENDERER["futures"], []
+
+    for future in futures:
+        future.result()
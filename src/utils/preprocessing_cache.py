@@ -0,0 +1,140 @@
+import hashlib
+import os
+import pickle
+import tempfile
+from src.models.variables import RUNS_NEED_TO_FINISH_FLAG
+
+
+# If True, the results of the preprocessing methods (EST, EST_GROUP and upper bounds) are cached on disk and reused by other runs of the same instance
+PREPROCESSING_CACHE_FLAG = True
+
+# Folder of the cache files, one file per instance and result (e.g., <key>_UPPER_BOUND_X_TASK.pkl). It is src/results/cache of the package, wherever the process runs from
+CACHE_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "results", "cache")
+
+# Size of the cache folder above which the least recently used files are deleted
+CACHE_MAX_SIZE_MB = 100
+
+# Increase when a preprocessing method changes, so that results computed by the previous version are not reused
+CACHE_VERSION = 3
+
+# Keys of the network data that define an instance. Results of the preprocessing methods are added to the same dictionary, so they are not part of the key
+STN_BASE_KEYS = ['STATES', 'STATES_SHIPMENT', 'ST_ARCS', 'TS_ARCS', 'TASKS_TRANSITION_TASKS', 'UNIT_TASKS']
+
+
+def _canonical(data) -> str:
+    """
+    Writes a dictionary (or list, or value) as a string that does not depend on the insertion order of the keys.
+    """
+
+    if isinstance(data, dict):
+        return "{" + ",".join(sorted(f"{key!r}:{_canonical(value)}" for key, value in data.items())) + "}"
+    if isinstance(data, (list, tuple)):
+        return "[" + ",".join(_canonical(value) for value in data) + "]"
+
+    return repr(data)
+
+
+def preprocessing_cache_key(stn_data: dict, planning_horizon: int) -> str:
+    """
+    Computes the key of an instance in the cache: a hash of the network data (tau and beta factors included), the planning horizon and the settings of the preprocessing methods.
+
+    Args:
+        - stn_data (dict): a dictionary with the state-task network instance data.
+        - planning_horizon (int): planning horizon.
+
+    Returns:
+        - str: hexadecimal key.
+    """
+
+    instance = _canonical([{key: stn_data[key] for key in STN_BASE_KEYS}, int(planning_horizon), RUNS_NEED_TO_FINISH_FLAG, CACHE_VERSION])
+
+    return hashlib.sha256(instance.encode()).hexdigest()
+
+
+def load_cached_results(stn_data: dict, planning_horizon: int, names: list[str]) -> bool:
+    """
+    Loads results of the preprocessing methods (e.g., ['EST', 'UPPER_BOUND_X_TASK']) from the cache into stn_data.
+    Nothing is loaded unless all of them are in the cache.
+
+    Args:
+        - stn_data (dict): a dictionary with the state-task network instance data.
+        - planning_horizon (int): planning horizon.
+        - names (list[str]): keys of stn_data to load.
+
+    Returns:
+        - bool: True if the results were loaded.
+    """
+
+    if not PREPROCESSING_CACHE_FLAG:
+        return False
+
+    key = preprocessing_cache_key(stn_data, planning_horizon)
+    results = {}
+
+    for name in names:
+        file_path = os.path.join(CACHE_FOLDER, f"{key}_{name}.pkl")
+        try:
+            with open(file_path, "rb") as f:
+                results[name] = pickle.load(f)
+            os.utime(file_path)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return False
+
+    stn_data.update(results)
+
+    return True
+
+
+def store_cached_results(stn_data: dict, planning_horizon: int, names: list[str]) -> None:
+    """
+    Stores results of the preprocessing methods from stn_data in the cache.
+    Each file is written to a temporary file and renamed, so concurrent runs (e.g., SLURM tasks) never read a partial file.
+
+    Args:
+        - stn_data (dict): a dictionary with the state-task network instance data.
+        - planning_horizon (int): planning horizon.
+        - names (list[str]): keys of stn_data to store.
+    """
+
+    if not PREPROCESSING_CACHE_FLAG:
+        return
+
+    os.makedirs(CACHE_FOLDER, exist_ok = True)
+    key = preprocessing_cache_key(stn_data, planning_horizon)
+
+    for name in names:
+        with tempfile.NamedTemporaryFile(dir = CACHE_FOLDER, suffix = ".tmp", delete = False) as f:
+            pickle.dump(stn_data[name], f)
+        os.chmod(f.name, 0o644)
+        os.replace(f.name, os.path.join(CACHE_FOLDER, f"{key}_{name}.pkl"))
+
+    evict_cached_results()
+
+
+def evict_cached_results(max_size_mb: float = CACHE_MAX_SIZE_MB) -> None:
+    """
+    Deletes the least recently used cache files (by modification time, which is updated on every load) until the cache is below max_size_mb.
+
+    Args:
+        - max_size_mb (float): maximum size of the cache folder in MB.
+    """
+
+    files = []
+    for entry in os.scandir(CACHE_FOLDER):
+        if entry.name.endswith(".pkl"):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+
+    size = sum(file_size for _, file_size, _ in files)
+
+    for _, file_size, file_path in sorted(files):
+        if size <= max_size_mb * 1024 * 1024:
+            break
+        try:
+            os.remove(file_path)
+        except FileNotFoundError:
+            pass
+        size -= file_size
@@ -89,10 +89,10 @@ def print_model_constraints(model: ConcreteModel) -> None:
         
 def compute_num_variables_constraints(model: ConcreteModel) -> list[int]:
     """ 
-    Computes the number of constraints and variables.
+    Computes the number of constraints and variables. Only the active rows are counted (e.g., without the rows deactivated by CUT_SEPARATION_FLAG).
     """
     
-    num_constraints = sum(len(constraint) for constraint in model.component_objects(Constraint, active=True))
+    num_constraints = sum(1 for _ in model.component_data_objects(Constraint, active=True))
     num_total_vars = sum(len(var) for var in model.component_objects(Var, active=True))
     num_binary_vars = sum(1 for v in model.component_objects(Var, active=True) for index in v if v[index].domain == Binary)
         
@@ -1,59 +1,185 @@
 import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.figure import Figure
 from pyomo.environ import *
+from src.utils.output_policy import is_verbose, is_artifacts, submit_artifact
+
+
+GANTT_MIN_VALUE = 0.0001  # Values above this are drawn as bars
+GANTT_MAX_LABELED_BARS = 300  # Above this number of bars, values are not written on the bars
+GANTT_FILE_FORMAT = "png"  # Format of chart files in the "artifacts" output policy (png or svg)
+GANTT_MERGE_PANELS = True  # If True, the X, Y and B charts of a solve are written to one multi-panel file
+GANTT_BAR_HEIGHT = 0.8  # Height of a bar, as a fraction of the distance between lanes
+GANTT_COLORS = {"X": ['b'], "Y": ['g', 'r'], "B": ['b']}  # Colors of the bars (Y: Y_Start and Y_End)
+
+
+def _gantt_chart_lanes(model: ConcreteModel) -> tuple[dict, list, list]:
+    """
+    Computes the lanes of a Gantt chart: one per unit-task pair, with an empty lane between units.
+
+    Returns:
+        Tuple[dict: (i,j) -> lane position, list: lane positions, list: lane labels]
+    """
+
+    lanes = {}
+    idx = 1
+    for j in sorted(model.S_Units):
+        idx -= 1
+        for i in sorted(model.S_I_In_J[j]):
+            idx -= 1
+            lanes[i,j] = idx
+
+    return lanes, list(lanes.values()), ["{0:s} -> {1:s}".format(j,i) for (i,j) in lanes]
+
+
+def _gantt_chart_bars(lanes: dict, tau: dict, bar_values: dict, label_values: dict) -> dict:
+    """
+    Collects, in one pass over the values of a variable, the bars of the active (i,j,t) of the lanes.
+
+    Args:
+        - lanes (dict): (i,j) -> lane position.
+        - tau (dict): (i,j) -> duration of a bar.
+        - bar_values (dict): (i,j,t) -> value that decides if the bar is drawn.
+        - label_values (dict): (i,j,t) -> value written on the bar.
+
+    Returns:
+        - dict: numpy arrays "lane", "start", "width" and "value" of the bars.
+    """
+
+    active = [(i,j,t) for (i,j,t), value in bar_values.items() if value is not None and value > GANTT_MIN_VALUE and (i,j) in lanes]
+
+    return {
+        "lane": np.array([lanes[i,j] for (i,j,t) in active], dtype = float),
+        "start": np.array([t for (i,j,t) in active], dtype = float),
+        "width": np.array([tau[i,j] for (i,j,t) in active], dtype = float),
+        "value": np.array([label_values[i,j,t] if label_values[i,j,t] is not None else 0 for (i,j,t) in active], dtype = float),
+    }
+
+
+def extract_gantt_chart_data(planning_horizon: int, model: ConcreteModel, var: str) -> dict:
+    """
+    Reads the bars of a Gantt chart from the model in one pass, so that the chart can be drawn after the model changes (e.g., in a background thread).
+
+    Args:
+        - planning_horizon (int): planning horizon.
+        - model (ConcreteModel): a Pyomo model instance.
+        - var (str): defined which variable to print (e.g., X, Y, B)
+
+    Returns:
+        - dict: {"planning_horizon": int, "var": str, "ticks": list, "labels": list, "bars": list of bar arrays, one per color in GANTT_COLORS[var]}.
+    """
+
+    lanes, ticks, labels = _gantt_chart_lanes(model)
+    tau = {(i,j): model.P_Tau[i,j] for (i,j) in lanes}
+
+    if var == "X":
+        values_X = model.V_X.extract_values()
+        bars = [_gantt_chart_bars(lanes, tau, values_X, values_X)]
+    elif var == "Y":
+        values_YS = model.V_Y_Start.extract_values()
+        values_YE = model.V_Y_End.extract_values()
+        bars = [_gantt_chart_bars(lanes, tau, values_YS, values_YS), _gantt_chart_bars(lanes, tau, values_YE, values_YE)]
+    elif var == "B":
+        bars = [_gantt_chart_bars(lanes, tau, model.V_X.extract_values(), model.V_B.extract_values())]
+    else:
+        raise Exception(f"Variable {var} is not recognized.")
+
+    return {"planning_horizon": planning_horizon, "var": var, "ticks": ticks, "labels": labels, "bars": bars}
+
+
+def draw_gantt_chart(ax, chart_data: dict) -> None:
+    """
+    Draws a Gantt chart extracted with extract_gantt_chart_data on a matplotlib Axes, with one broken_barh per lane and color.
+    Values are written on the bars unless there are more than GANTT_MAX_LABELED_BARS bars.
+
+    Args:
+        - ax (Axes): matplotlib axes.
+        - chart_data (dict): bars and lanes of the chart.
+    """
+
+    planning_horizon = chart_data["planning_horizon"]
+    gap = (planning_horizon+1)/500
+    height = GANTT_BAR_HEIGHT
+
+    for idx in chart_data["ticks"]:
+        ax.broken_barh([(0, planning_horizon+5)], (idx - height/2, height), color = 'y', alpha = .3)
+
+    num_bars = sum(len(bars["lane"]) for bars in chart_data["bars"])
+
+    for color, bars in zip(GANTT_COLORS[chart_data["var"]], chart_data["bars"]):
+        starts = bars["start"] + gap
+        widths = bars["width"] - 2*gap
+        for idx in np.unique(bars["lane"]):
+            in_lane = bars["lane"] == idx
+            ax.broken_barh(list(zip(starts[in_lane], widths[in_lane])), (idx - height/2, height), color = color)
+
+        if num_bars <= GANTT_MAX_LABELED_BARS:
+            for idx, center, value in zip(bars["lane"], bars["start"] + bars["width"]/2, bars["value"]):
+                ax.text(center, idx, "{0:.2f}".format(value), color='white', weight='bold', ha='center', va='center')
+
+    ax.set_xlim(0,planning_horizon+1)
+    ax.set_yticks(chart_data["ticks"])
+    ax.set_yticklabels(chart_data["labels"])
+    ax.set_title(chart_data["var"], loc = 'left')
+
+
+def save_gantt_charts(charts_data: list[dict], file_path: str) -> None:
+    """
+    Writes one or more Gantt charts (e.g., X, Y and B) to a file, one panel per chart sharing the time axis.
+    The format (png, svg, ...) follows the extension of file_path. It does not use pyplot, so it can run in a background thread.
+
+    Args:
+        - charts_data (list[dict]): bars and lanes of the charts (see extract_gantt_chart_data).
+        - file_path (str): path of the image file.
+    """
+
+    fig = Figure(figsize=(12,6*len(charts_data)))
+    axes = fig.subplots(len(charts_data), 1, sharex = True, squeeze = False)[:,0]
+
+    for ax, chart_data in zip(axes, charts_data):
+        draw_gantt_chart(ax, chart_data)
+
+    fig.tight_layout()
+    fig.savefig(file_path)
 
 
 def plot_gantt_chart(planning_horizon: int, model: ConcreteModel, var: str) -> None:
     """
-    Prints differents variables in a Gannt chart. 
-    
+    Prints differents variables in a Gannt chart.
+
     Args:
         - planning_horizon (int): planning horizon.
         - model (ConcreteModel): a Pyomo model instance.
         - var (str): defined which variable to print (e.g., X, Y, B)
     """
-    
-    
+
     plt.figure(figsize=(12,6))
-    gap = (planning_horizon+1)/500
-    idx = 1
-    lbls = []
-    ticks = []
-    for j in sorted(model.S_Units):
-        idx -= 1
-        for i in sorted(model.S_I_In_J[j]):
-            idx -= 1
-            ticks.append(idx)
-            lbls.append("{0:s} -> {1:s}".format(j,i))
-            plt.plot([0,planning_horizon+5],[idx,idx],lw=20,alpha=.3,color='y')            
-            if var == "X":
-                for t in model.S_Time:
-                    if model.V_X[i,j,t]() > 0.0001:
-                        plt.plot([t+gap, t + model.P_Tau[i,j]-gap], [idx,idx],'b', lw=20, solid_capstyle='butt')
-                        txt = "{0:.2f}".format(model.V_X[i,j,t]())
-                        plt.text(t + model.P_Tau[i,j]/2, idx, txt, color='white', weight='bold', ha='center', va='center')
-            
-            elif var == "Y":                
-                for t in model.S_Time:
-                    val_YS = model.V_Y_Start[i, j, t]()
-                    val_YE = model.V_Y_End[i,j,t]()
-                    if val_YS is not None and val_YS > 0.0001:
-                        plt.plot([t+gap, t + model.P_Tau[i,j]-gap], [idx,idx],'g', lw=20, solid_capstyle='butt')
-                        txt = "{0:.2f}".format(model.V_Y_Start[i,j,t]())
-                        plt.text(t + model.P_Tau[i,j]/2, idx, txt, color='white', weight='bold', ha='center', va='center')
-                    if val_YE is not None and val_YE > 0.0001:
-                        plt.plot([t+gap, t + model.P_Tau[i,j]-gap], [idx,idx],'r', lw=20, solid_capstyle='butt')
-                        txt = "{0:.2f}".format(model.V_Y_End[i,j,t]())
-                        plt.text(t + model.P_Tau[i,j]/2, idx, txt, color='white', weight='bold', ha='center', va='center')  
-            
-            elif var == "B":
-                for t in model.S_Time:
-                    if model.V_X[i,j,t]() > 0.0001:
-                        plt.plot([t+gap, t + model.P_Tau[i,j]-gap], [idx,idx],'b', lw=20, solid_capstyle='butt')
-                        txt = "{0:.2f}".format(model.V_B[i,j,t]())
-                        plt.text(t + model.P_Tau[i,j]/2, idx, txt, color='white', weight='bold', ha='center', va='center')
-            
-    plt.xlim(0,planning_horizon+1)
-    plt.gca().set_yticks(ticks)
-    plt.gca().set_yticklabels(lbls) 
+    draw_gantt_chart(plt.gca(), extract_gantt_chart_data(planning_horizon, model, var))
     plt.tight_layout()
-    plt.show(block=True)
\ No newline at end of file
+    plt.show(block=True)
+
+
+def render_gantt_charts(planning_horizon: int, model: ConcreteModel, variables: list[str], stage: str) -> None:
+    """
+    Renders Gantt charts of the current solution according to the output policy (see src/utils/output_policy.py):
+    shown interactively if verbose, written to files in the background if artifacts, and skipped if headless.
+    Files are written in GANTT_FILE_FORMAT, one multi-panel file per stage if GANTT_MERGE_PANELS is True.
+
+    Args:
+        - planning_horizon (int): planning horizon.
+        - model (ConcreteModel): a Pyomo model instance with a solution loaded.
+        - variables (list[str]): variables to chart (e.g., ["X", "Y", "B"]).
+        - stage (str): name of the solve the solution comes from (e.g., milp, lp), used in the file names.
+    """
+
+    if is_verbose():
+        for var in variables:
+            plot_gantt_chart(planning_horizon, model, var)
+
+    elif is_artifacts():
+        charts_data = [extract_gantt_chart_data(planning_horizon, model, var) for var in variables]
+        if GANTT_MERGE_PANELS:
+            submit_artifact(save_gantt_charts, f"{stage}_{''.join(variables)}.{GANTT_FILE_FORMAT}", charts_data)
+        else:
+            for var, chart_data in zip(variables, charts_data):
+                submit_artifact(save_gantt_charts, f"{stage}_{var}.{GANTT_FILE_FORMAT}", [chart_data])
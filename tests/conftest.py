@@ -0,0 +1,11 @@
+import pytest
+import src.utils.preprocessing_cache as preprocessing_cache
+
+
+@pytest.fixture(autouse = True)
+def disable_preprocessing_cache(monkeypatch):
+    """
+    Computes the preprocessing results (EST and bounds) in every test instead of reading them from the cache of earlier runs.
+    """
+
+    monkeypatch.setattr(preprocessing_cache, "PREPROCESSING_CACHE_FLAG", False)
@@ -0,0 +1,70 @@
+import io
+import contextlib
+import pytest
+from pyomo.environ import *
+import src.models.variables as variables
+import src.models.parameters as parameters
+import src.methods.upper_bound_ys_x_unit_opt as upper_bound_ys_x_unit_opt
+from src.data.instance_generation import load_network
+from src.methods.preprocessing_context import create_preprocessing_context
+from src.models.base_model_build import load_model_sets_parameters_variables, load_basic_model_constraints_objective
+from src.models.parameters import create_parameters_tightening_constraints
+from src.models.constraints_est import load_constraint_set_to_zero_x_est, load_constraint_set_to_zero_ys_est
+from src.models.model_solve import solve_model, define_solver, SOLVER_SETTINGS
+
+
+NETWORKS = ["network_1", "network_2", "network_4"]
+PLANNING_HORIZONS = [20, 25]
+MODEL_TYPES = ["bound_production_operations_x_unit", "bound_startups_ys_unit"]
+
+
+def _load_network_est(network: str, planning_horizon: int) -> dict:
+    """
+    Loads a network and computes its EST (see create_preprocessing_context).
+    """
+
+    stn_data = load_network(network, 1.2, 0.8, 0, planning_horizon)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        create_preprocessing_context(stn_data, planning_horizon, variables = False)
+
+    return stn_data
+
+
+def _solve_network_bounds(stn_data: dict, planning_horizon: int, model_type: str) -> dict:
+    """
+    Solves the bound model of the whole network (built with load_constraints_basic_model_for_operations_x_y_unit) in one MILP, as before the per-unit decomposition.
+    Without material constraints the units are independent, so an optimal solution is optimal for every unit.
+    """
+
+    model = ConcreteModel()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        load_model_sets_parameters_variables(model, stn_data, planning_horizon)
+        load_basic_model_constraints_objective(model, stn_data, planning_horizon, model_type)
+        create_parameters_tightening_constraints(model, stn_data, "")
+        load_constraint_set_to_zero_x_est(model)
+        load_constraint_set_to_zero_ys_est(model)
+        solve_model(define_solver(), model)
+
+    variable = model.V_X if model_type == 'bound_production_operations_x_unit' else model.V_Y_Start
+
+    return {j: sum(variable[i,j,n].value for i in model.S_I_Production_Tasks for n in model.S_Time if (i,j) in model.P_Task_Unit_Network) for j in model.S_Units}
+
+
+@pytest.mark.parametrize("runs_need_to_finish", [True, False])
+@pytest.mark.parametrize("model_type", MODEL_TYPES)
+@pytest.mark.parametrize("planning_horizon", PLANNING_HORIZONS)
+@pytest.mark.parametrize("network", NETWORKS)
+def test_unit_bounds_match_network_milp(monkeypatch, network, planning_horizon, model_type, runs_need_to_finish):
+
+    monkeypatch.setitem(SOLVER_SETTINGS, "backend", "highs")
+    for module in (variables, parameters, upper_bound_ys_x_unit_opt):
+        monkeypatch.setattr(module, "RUNS_NEED_TO_FINISH_FLAG", runs_need_to_finish)
+
+    stn_data = _load_network_est(network, planning_horizon)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        bounds = upper_bound_ys_x_unit_opt.compute_unit_bounds(stn_data, planning_horizon, model_type)
+
+    assert bounds == pytest.approx(_solve_network_bounds(stn_data, planning_horizon, model_type))
@@ -0,0 +1,90 @@
+import io
+import contextlib
+import pytest
+from pyomo.environ import *
+from pyomo.repn import generate_standard_repn
+from src.data.instance_generation import load_network
+from src.models.formulation_build import create_model_f1_base_formulation
+
+
+NETWORKS = ["network_1", "network_2", "network_4", "network_indirect_transitions", "network_all_transitions"]
+PLANNING_HORIZONS = [10, 25]
+
+
+def _min_lenght_run_eq18_scan(model, i, j, n):
+    """
+    Rule of eq18 before the window rewrite (scans S_Time for the time points of the window).
+    """
+
+    if (i,j) in model.P_Task_Unit_Network and i in model.S_I_Production_Tasks:
+        return model.V_X[i,j,n] >= sum(model.V_Y_Start[i,j,nprime]
+                                       for nprime in model.S_Time
+                                       if (nprime >= n - model.P_Tau_Min[i,j] + 1 and nprime <= n))
+    else:
+        return Constraint.Skip
+
+
+def _max_lenght_run_eq19_scan(model, i, j, n):
+    """
+    Rule of eq19 before the window rewrite (scans S_Time for the time points of the window).
+    """
+
+    if (i,j) in model.P_Task_Unit_Network and i in model.S_I_Production_Tasks:
+        return sum(model.V_X[i,j,nprime]
+                   for nprime in model.S_Time
+                   if (nprime >= n - model.P_Tau_Max[i,j] and nprime <= n)) <= model.P_Tau_Max[i,j]
+    else:
+        return Constraint.Skip
+
+
+def _unit_availability_eq21_scan(model, j, n):
+    """
+    Rule of eq21 before the window rewrite (scans all tasks and S_Time).
+    """
+
+    operations = sum(
+        model.V_X[i,j,nprime]
+        for i in model.S_Tasks
+        if (i,j) in model.P_Task_Unit_Network
+        for nprime in model.S_Time
+        if ((nprime >= n - model.P_Tau[i,j] + 1) and (nprime <= n)))
+
+    if j in model.S_J_Units_Without_Transition_Tasks:
+        return operations <= 1
+    else:
+        return operations + model.V_X_Hat_Idle[j,n] == 1
+
+
+def _rows(constraint: Constraint) -> dict:
+    """
+    Returns the rows of a constraint as {index: (variable name -> coefficient, lower bound, upper bound)}, with the constant of the body moved to the bounds.
+    """
+
+    rows = {}
+
+    for index, row in constraint.items():
+        repn = generate_standard_repn(row.body)
+        coefficients = {var.name: coefficient for var, coefficient in zip(repn.linear_vars, repn.linear_coefs)}
+        lower = value(row.lower) - repn.constant if row.has_lb() else None
+        upper = value(row.upper) - repn.constant if row.has_ub() else None
+        rows[index] = (coefficients, lower, upper)
+
+    return rows
+
+
+@pytest.mark.parametrize("network", NETWORKS)
+@pytest.mark.parametrize("planning_horizon", PLANNING_HORIZONS)
+def test_window_constraints_match_scan_rules(network, planning_horizon):
+
+    stn_data = load_network(network, 1.2, 0.8, 0, planning_horizon)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        model, _ = create_model_f1_base_formulation(stn_data, planning_horizon)
+
+    model.C_Min_Lenght_Run_Eq18_Scan = Constraint(model.S_Task_Unit_Time, rule = _min_lenght_run_eq18_scan)
+    model.C_Max_Lenght_Run_Eq19_Scan = Constraint(model.S_Task_Unit_Time, rule = _max_lenght_run_eq19_scan)
+    model.C_Unit_Availability_Eq21_Scan = Constraint(model.S_Units, model.S_Time, rule = _unit_availability_eq21_scan)
+
+    assert _rows(model.C_Min_Lenght_Run_Eq18) == _rows(model.C_Min_Lenght_Run_Eq18_Scan)
+    assert _rows(model.C_Max_Lenght_Run_Eq19) == _rows(model.C_Max_Lenght_Run_Eq19_Scan)
+    assert _rows(model.C_Unit_Availability_Eq21) == _rows(model.C_Unit_Availability_Eq21_Scan)